@@ -1,27 +1,119 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
+from flask import (Flask, render_template, request, jsonify, redirect, url_for, send_file, Response, stream_with_context,
+                   make_response, g, has_request_context)
 from flask_sqlalchemy import SQLAlchemy
-import folium
-from folium import plugins
+import sqlalchemy as sa
+import click
+from sqlalchemy import event
 import json
+import functools
+from html import escape as escape_html
 import csv
 import io
 import tempfile
 import os
-from shapely.geometry import Point, LineString, Polygon
+import shutil
+import zlib
+import codecs
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
+import shapely
+from shapely import STRtree
+from shapely.geometry import Point, LineString, Polygon, GeometryCollection, shape
 from shapely.ops import unary_union, transform
-import geopandas as gpd
-import pandas as pd
 import math
+import sys
+import bisect
+import time
+import threading
+from collections import OrderedDict, Counter, namedtuple
+from itertools import chain
+import numpy as np
 import pyproj
-from pyproj import Transformer
-import simplekml
-import geojson
-import ezdxf
+from pyproj import Transformer, Geod
 from datetime import datetime
+import polygon_metrics
+# pandas, geopandas, pyogrio, folium, simplekml, ezdxf and mapbox_vector_tile are imported
+# by the functions that use them: they are only needed for imports, exports, tiles and
+# /map, and together take most of the startup time and memory of a worker
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///topography.db'
+# TOPOGRAPHY_DATABASE_URL points the app at another database, e.g. a scratch file for benchmarks
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('TOPOGRAPHY_DATABASE_URL', 'sqlite:///topography.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# create_app() creates or upgrades the schema; set TOPOGRAPHY_INIT_SCHEMA=0 when `flask init-db` runs at deploy time
+app.config['INIT_SCHEMA_ON_STARTUP'] = os.environ.get('TOPOGRAPHY_INIT_SCHEMA', '1') != '0'
+app.config['GEODESIC_BATCH_MAX_ROWS'] = 1000000
+app.config['DISTANCE_MATRIX_MAX_POINTS'] = 1000
+app.config['LIST_PAGE_DEFAULT_LIMIT'] = 1000
+app.config['LIST_PAGE_MAX_LIMIT'] = 10000
+# Streaming imports commit every IMPORT_BATCH_SIZE features and report at most IMPORT_MAX_ERRORS failures
+app.config['IMPORT_BATCH_SIZE'] = 1000
+app.config['IMPORT_MAX_ERRORS'] = 100
+# Largest number of create/update/delete items accepted by one batch request
+app.config['BATCH_MAX_ITEMS'] = 10000
+# Change log rows kept for /api/changes; clients further behind must reload the full lists
+app.config['CHANGE_LOG_MAX_ENTRIES'] = 100000
+app.config['CHANGES_PAGE_MAX_ENTRIES'] = 10000
+app.config['IMPORT_CSV_CHUNK_ROWS'] = 20000
+# GeoParquet and GeoPackage imports insert this many features per transaction
+app.config['IMPORT_FRAME_CHUNK_ROWS'] = 20000
+# Background import jobs: concurrent imports, queued-or-running limit and how long finished jobs are kept
+app.config['IMPORT_WORKERS'] = 2
+app.config['IMPORT_MAX_PENDING'] = 8
+app.config['IMPORT_JOB_RETENTION_SECONDS'] = 3600
+# An import event stream holds a request worker, so it ends after this many seconds and the client reconnects
+app.config['IMPORT_EVENTS_MAX_SECONDS'] = 30
+# Polygon metrics for imports and recomputation: worker processes and the batch size (vertices) worth sending to them
+app.config['POLYGON_METRICS_WORKERS'] = os.cpu_count() or 1
+app.config['POLYGON_METRICS_PARALLEL_MIN_VERTICES'] = 200000
+# KML/DXF export jobs: worker threads, artifact directory and cache eviction limits
+app.config['EXPORT_WORKERS'] = 2
+app.config['EXPORT_DIR'] = os.path.join(tempfile.gettempdir(), 'topography_exports')
+app.config['EXPORT_CACHE_MAX_BYTES'] = 512 * 1024 * 1024
+app.config['EXPORT_CACHE_MAX_AGE_SECONDS'] = 3600
+# Synchronous export endpoints wait this long for the file, then answer 202 with the job to poll
+app.config['EXPORT_SYNC_WAIT_SECONDS'] = 25
+# /map switches to clustered, compact rendering above these sizes (override with ?mode=)
+app.config['MAP_LARGE_DATASET_FEATURES'] = 2000
+app.config['MAP_LARGE_DATASET_VERTICES'] = 20000
+app.config['MAP_VERTEX_MARKER_MAX_VERTICES'] = 50
+# Default polygon simplification (metres) for the large-dataset map; ?tolerance= or ?zoom= overrides
+app.config['MAP_LARGE_POLYGON_TOLERANCE_M'] = 2.0
+# Mode used by /map above those sizes: 'large' (clustered, all features) or 'tiles' (vector tiles)
+app.config['MAP_LARGE_DATASET_MODE'] = 'large'
+# Vector tiles: tile coordinate extent, clip buffer and simplification tolerance in tile units
+app.config['TILE_EXTENT'] = 4096
+app.config['TILE_BUFFER'] = 64
+app.config['TILE_SIMPLIFY_TOLERANCE'] = 8
+app.config['TILE_MAX_ZOOM'] = 22
+app.config['TILE_CACHE_MAX_TILES'] = 2048
+# Sampling profiler (also switched at runtime through /api/profiler): requests slower than
+# PROFILER_SLOW_REQUEST_SECONDS have their sampled stacks written to PROFILER_DIR
+app.config['PROFILER_ENABLED'] = os.environ.get('TOPOGRAPHY_PROFILER') == '1'
+app.config['PROFILER_SLOW_REQUEST_SECONDS'] = 1.0
+app.config['PROFILER_SAMPLE_INTERVAL'] = 0.005
+app.config['PROFILER_DIR'] = os.path.join(tempfile.gettempdir(), 'topography_profiles')
+app.config['PROFILER_MAX_PROFILES'] = 50
+
+# Storage profile: 'default' keeps SQLite's stock settings, 'performance' enables
+# WAL, tuned pragmas, a connection pool and R*Tree bounding-box indexes
+app.config['STORAGE_PROFILE'] = os.environ.get('TOPOGRAPHY_STORAGE_PROFILE', 'default')
+app.config['SQLITE_PRAGMAS'] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,  # 64 MB
+    'temp_store': 'MEMORY',
+    'mmap_size': 268435456,
+    'busy_timeout': 30000,
+}
+if app.config['STORAGE_PROFILE'] == 'performance':
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_pre_ping': True,
+        'connect_args': {'timeout': 30, 'check_same_thread': False},
+    }
 db = SQLAlchemy(app)
 
 # Database Models
@@ -33,6 +125,13 @@ class ReferencePoint(db.Model):
     longitude = db.Column(db.Float, nullable=False)
     elevation = db.Column(db.Float)
     point_type = db.Column(db.String(50), default='waypoint')
+    # UTM position, set whenever latitude or longitude is written (NULL where projection fails)
+    utm_zone = db.Column(db.Integer)
+    utm_hemisphere = db.Column(db.String(1))
+    utm_easting = db.Column(db.Float)
+    utm_northing = db.Column(db.Float)
+    
+    __table_args__ = (db.Index('ix_reference_point_utm_zone', 'utm_zone', 'utm_hemisphere'),)
     
     def to_dict(self):
         return {
@@ -42,54 +141,558 @@ class ReferencePoint(db.Model):
             'latitude': self.latitude,
             'longitude': self.longitude,
             'elevation': self.elevation,
-            'point_type': self.point_type
+            'point_type': self.point_type,
+            'utm_zone': self.utm_zone,
+            'utm_hemisphere': self.utm_hemisphere,
+            'utm_easting': self.utm_easting,
+            'utm_northing': self.utm_northing
         }
 
+POINT_UTM_COLUMNS = ('utm_zone', 'utm_hemisphere', 'utm_easting', 'utm_northing')
+POINT_UTM_ATTRIBUTES = tuple(getattr(ReferencePoint, name) for name in POINT_UTM_COLUMNS)
+
+def pack_vertices(coordinates):
+    """Pack [[lat, lon], ...] coordinates into a little-endian float64 buffer"""
+    array = np.asarray(coordinates, dtype='<f8')
+    if array.size == 0:
+        return b''
+    if array.ndim != 2 or array.shape[1] < 2:
+        raise ValueError('Coordinates must be a list of [lat, lon] pairs')
+    return np.ascontiguousarray(array[:, :2]).tobytes()
+
+def unpack_vertices(buffer):
+    """Return a read-only (N, 2) [lat, lon] view over a packed vertex buffer without copying"""
+    return np.frombuffer(buffer or b'', dtype='<f8').reshape(-1, 2)
+
+def vertices_json(buffer):
+    """JSON text of a packed vertex buffer as [[lat, lon], ...], without building nested lists
+    
+    The flat float list is formatted by a single %-operation; %r gives the same
+    shortest round-trip text as json.dumps for the finite floats stored here.
+    """
+    flat = np.frombuffer(buffer or b'', dtype='<f8').tolist()
+    return '[' + ','.join(['[%r,%r]'] * (len(flat) // 2)) % tuple(flat) + ']'
+
+# Precomputed simplification levels (metres) for polygons with many vertices
+POLYGON_LOD_TOLERANCES_M = (0.5, 2.0, 10.0, 50.0, 250.0)
+POLYGON_LOD_MIN_VERTICES = 64
+METRES_PER_DEGREE_LAT = 111320.0
+
+def simplify_ring(array, tolerance_m):
+    """Topology-preserving simplification of an open [lat, lon] ring by a tolerance in metres
+    
+    Longitudes are scaled by cos(latitude) so the tolerance is roughly isotropic.
+    """
+    scale = max(math.cos(math.radians(float(array[:, 0].mean()))), 1e-6)
+    ring = shapely.linearrings(np.column_stack([array[:, 1] * scale, array[:, 0]]))
+    simplified = shapely.get_coordinates(shapely.simplify(ring, tolerance_m / METRES_PER_DEGREE_LAT))[:-1]
+    return np.column_stack([simplified[:, 1], simplified[:, 0] / scale])
+
+def polygon_lod_levels(array):
+    """Return [(tolerance_m, ring), ...] for the levels that actually drop vertices"""
+    levels = []
+    if len(array) < POLYGON_LOD_MIN_VERTICES:
+        return levels
+    previous_count = len(array)
+    for tolerance_m in POLYGON_LOD_TOLERANCES_M:
+        ring = simplify_ring(array, tolerance_m)
+        if len(ring) < previous_count:
+            levels.append((tolerance_m, ring))
+            previous_count = len(ring)
+    return levels
+
 class SurveyPolygon(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    coordinates = db.Column(db.Text, nullable=False)  # JSON string of coordinates
+    vertices = db.Column(db.LargeBinary, nullable=False)  # Packed float64 (lat, lon) pairs
+    vertex_count = db.Column(db.Integer, nullable=False, default=0)
+    min_lat = db.Column(db.Float)
+    min_lon = db.Column(db.Float)
+    max_lat = db.Column(db.Float)
+    max_lon = db.Column(db.Float)
     area_sqm = db.Column(db.Float)
     perimeter_m = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     polygon_type = db.Column(db.String(50), default='survey_area')
+    levels = db.relationship('SurveyPolygonLevel', cascade='all, delete-orphan', order_by='SurveyPolygonLevel.tolerance_m')
+    
+    @property
+    def coordinate_array(self):
+        """(N, 2) array of [lat, lon] vertices backed directly by the stored buffer"""
+        return unpack_vertices(self.vertices)
+    
+    @property
+    def coordinates(self):
+        return self.coordinate_array.tolist()
+    
+    @coordinates.setter
+    def coordinates(self, coordinates):
+        self.vertices = pack_vertices(coordinates)
+        array = unpack_vertices(self.vertices)
+        self.vertex_count = len(array)
+        if len(array):
+            self.min_lat, self.min_lon = array.min(axis=0).tolist()
+            self.max_lat, self.max_lon = array.max(axis=0).tolist()
+        else:
+            self.min_lat = self.min_lon = self.max_lat = self.max_lon = None
+        self.levels = [
+            SurveyPolygonLevel(tolerance_m=tolerance_m, vertices=pack_vertices(ring), vertex_count=len(ring))
+            for tolerance_m, ring in polygon_lod_levels(array)
+        ]
     
     def to_dict(self):
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
-            'coordinates': json.loads(self.coordinates),
+            'coordinates': self.coordinates,
+            'vertex_count': self.vertex_count,
+            'bbox': [self.min_lon, self.min_lat, self.max_lon, self.max_lat],
             'area_sqm': self.area_sqm,
             'perimeter_m': self.perimeter_m,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'polygon_type': self.polygon_type
         }
 
-# Create tables
+class SurveyPolygonLevel(db.Model):
+    """A simplified copy of a polygon's ring; area and perimeter always use the full ring"""
+    polygon_id = db.Column(db.Integer, db.ForeignKey('survey_polygon.id', ondelete='CASCADE'), primary_key=True)
+    tolerance_m = db.Column(db.Float, primary_key=True)
+    vertices = db.Column(db.LargeBinary, nullable=False)
+    vertex_count = db.Column(db.Integer, nullable=False)
+
+class DatasetChange(db.Model):
+    """Change log: one row per created, updated or deleted point or polygon
+    
+    The autoincrementing version of the newest row is the dataset version.
+    """
+    __table_args__ = {'sqlite_autoincrement': True}
+    version = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # 'point' or 'polygon'
+    item_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(10), nullable=False)  # 'created', 'updated' or 'deleted'
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+def lod_level(tolerance_m):
+    """Snap a tolerance to the coarsest stored level within it; None means full resolution"""
+    levels = [level for level in POLYGON_LOD_TOLERANCES_M if tolerance_m is not None and level <= tolerance_m]
+    return levels[-1] if levels else None
+
+def polygon_level_value(column, tolerance_m):
+    """Scalar subquery for a column of the coarsest stored level within tolerance_m; NULL without one"""
+    return (
+        sa.select(column)
+        .where(SurveyPolygonLevel.polygon_id == SurveyPolygon.id, SurveyPolygonLevel.tolerance_m <= tolerance_m)
+        .order_by(SurveyPolygonLevel.tolerance_m.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+def polygon_lod_vertices(tolerance_m):
+    """Column expression for the coarsest stored ring within tolerance_m, else the full-resolution vertices"""
+    if lod_level(tolerance_m) is None:
+        return SurveyPolygon.vertices
+    level = polygon_level_value(SurveyPolygonLevel.vertices, tolerance_m)
+    return sa.func.coalesce(level, SurveyPolygon.vertices, type_=db.LargeBinary).label('vertices')
+
+def polygon_lod_columns(tolerance_m):
+    """Vertices and vertex count of the ring served at tolerance_m
+    
+    With a tolerance, ``tolerance_m`` is the stored level used (NULL when the
+    full ring is served) and ``source_vertex_count`` the full-resolution count.
+    """
+    if tolerance_m is None:
+        return [SurveyPolygon.vertices, SurveyPolygon.vertex_count]
+    if lod_level(tolerance_m) is None:
+        level_vertex_count, level_tolerance = sa.null(), sa.null()
+    else:
+        level_vertex_count = polygon_level_value(SurveyPolygonLevel.vertex_count, tolerance_m)
+        level_tolerance = polygon_level_value(SurveyPolygonLevel.tolerance_m, tolerance_m)
+    return [polygon_lod_vertices(tolerance_m),
+            sa.func.coalesce(level_vertex_count, SurveyPolygon.vertex_count).label('vertex_count'),
+            level_tolerance.label('tolerance_m'), SurveyPolygon.vertex_count.label('source_vertex_count')]
+
+def backfill_polygon_levels():
+    """Compute simplification levels for large polygons stored before levels existed"""
+    level_table = SurveyPolygonLevel.__table__
+    last_id = 0
+    with db.engine.begin() as connection:
+        while True:
+            rows = connection.execute(
+                sa.select(SurveyPolygon.id, SurveyPolygon.vertices)
+                .where(SurveyPolygon.id > last_id, SurveyPolygon.vertex_count >= POLYGON_LOD_MIN_VERTICES,
+                       ~sa.exists().where(level_table.c.polygon_id == SurveyPolygon.id))
+                .order_by(SurveyPolygon.id)
+                .limit(500)
+            ).all()
+            if not rows:
+                break
+            levels = [
+                {'polygon_id': polygon_id, 'tolerance_m': tolerance_m, 'vertices': pack_vertices(ring), 'vertex_count': len(ring)}
+                for polygon_id, vertices in rows
+                for tolerance_m, ring in polygon_lod_levels(unpack_vertices(vertices))
+            ]
+            if levels:
+                connection.execute(level_table.insert(), levels)
+            last_id = rows[-1][0]
+
+def backfill_point_utm(connection):
+    """Fill the UTM columns of points stored before they existed, logging them as updated
+    
+    Runs once, in the transaction of the migration that adds the columns; every
+    later write sets them, so points that cannot be projected stay NULL for good.
+    A failed backfill rolls back together with the columns and runs again.
+    """
+    table = ReferencePoint.__table__
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, table.c.latitude, table.c.longitude)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(5000)
+        ).all()
+        if not rows:
+            break
+        values = point_utm_values([row[1] for row in rows], [row[2] for row in rows])
+        connection.execute(table.update().where(table.c.id == sa.bindparam('point_id')),
+                           [{'point_id': row[0], **utm} for row, utm in zip(rows, values)])
+        # New fields in every response: bump the dataset version so ETags and change feeds see them
+        log_changes(connection, [{'kind': 'point', 'item_id': row[0], 'action': 'updated'}
+                                 for row, utm in zip(rows, values) if utm['utm_zone'] is not None])
+        last_id = rows[-1][0]
+
+def upgrade_schema():
+    """Migrate databases created by older versions to the current schema"""
+    with db.engine.begin() as connection:
+        upgrade_polygon_vertices(connection)
+        upgrade_point_utm(connection)
+
+def upgrade_point_utm(connection):
+    """Add the UTM columns and their index to reference_point and backfill them once"""
+    columns = {row[1] for row in connection.exec_driver_sql('PRAGMA table_info(reference_point)')}
+    if 'utm_zone' in columns:
+        return
+    
+    # pysqlite sends BEGIN only before DML and would commit the ALTERs on their own;
+    # open the transaction first so the columns are only kept together with their values
+    if not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN')
+    for name, column_type in [('utm_zone', 'INTEGER'), ('utm_hemisphere', 'VARCHAR(1)'),
+                              ('utm_easting', 'FLOAT'), ('utm_northing', 'FLOAT')]:
+        connection.exec_driver_sql(f'ALTER TABLE reference_point ADD COLUMN {name} {column_type}')
+    connection.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_reference_point_utm_zone ON reference_point (utm_zone, utm_hemisphere)'
+    )
+    backfill_point_utm(connection)
+
+def upgrade_polygon_vertices(connection):
+    """Migrate databases created before polygons were stored as packed vertex buffers
+    
+    Adds the vertex and bounding-box columns, converts the JSON ``coordinates``
+    text in batches and then drops the old column.
+    """
+    columns = {row[1] for row in connection.exec_driver_sql('PRAGMA table_info(survey_polygon)')}
+    if 'coordinates' not in columns:
+        return
+    
+    for name, column_type in [('vertices', 'BLOB'), ('vertex_count', 'INTEGER NOT NULL DEFAULT 0'),
+                              ('min_lat', 'FLOAT'), ('min_lon', 'FLOAT'), ('max_lat', 'FLOAT'), ('max_lon', 'FLOAT')]:
+        if name not in columns:
+            connection.exec_driver_sql(f'ALTER TABLE survey_polygon ADD COLUMN {name} {column_type}')
+    
+    last_id = 0
+    while True:
+        rows = connection.exec_driver_sql(
+            'SELECT id, coordinates FROM survey_polygon WHERE id > ? ORDER BY id LIMIT 1000', (last_id,)
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        for polygon_id, coordinates in rows:
+            array = unpack_vertices(pack_vertices(json.loads(coordinates)))
+            mins = array.min(axis=0).tolist() if len(array) else [None, None]
+            maxs = array.max(axis=0).tolist() if len(array) else [None, None]
+            updates.append((array.tobytes(), len(array), mins[0], mins[1], maxs[0], maxs[1], polygon_id))
+        connection.exec_driver_sql(
+            'UPDATE survey_polygon SET vertices = ?, vertex_count = ?, min_lat = ?, min_lon = ?, '
+            'max_lat = ?, max_lon = ? WHERE id = ?', updates
+        )
+        last_id = rows[-1][0]
+    
+    # Triggers that read the JSON column must go before it can be dropped
+    for trigger in ('survey_polygon_rtree_insert', 'survey_polygon_rtree_update'):
+        connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {trigger}')
+    connection.exec_driver_sql('ALTER TABLE survey_polygon DROP COLUMN coordinates')
+
+# SQLite R*Tree bounding-box indexes, kept in sync with the tables by triggers
+rtree_metadata = sa.MetaData()
+point_rtree = sa.Table(
+    'reference_point_rtree', rtree_metadata,
+    sa.Column('id', sa.Integer), sa.Column('min_lon', sa.Float), sa.Column('max_lon', sa.Float),
+    sa.Column('min_lat', sa.Float), sa.Column('max_lat', sa.Float)
+)
+polygon_rtree = sa.Table(
+    'survey_polygon_rtree', rtree_metadata,
+    sa.Column('id', sa.Integer), sa.Column('min_lon', sa.Float), sa.Column('max_lon', sa.Float),
+    sa.Column('min_lat', sa.Float), sa.Column('max_lat', sa.Float)
+)
+
+POLYGON_BBOX_SELECT = """
+    SELECT NEW.id, NEW.min_lon, NEW.max_lon, NEW.min_lat, NEW.max_lat WHERE NEW.vertex_count > 0"""
+
+SPATIAL_RTREE_DDL = [
+    'CREATE VIRTUAL TABLE IF NOT EXISTS reference_point_rtree USING rtree(id, min_lon, max_lon, min_lat, max_lat)',
+    """CREATE TRIGGER IF NOT EXISTS reference_point_rtree_insert AFTER INSERT ON reference_point BEGIN
+        INSERT OR REPLACE INTO reference_point_rtree VALUES (NEW.id, NEW.longitude, NEW.longitude, NEW.latitude, NEW.latitude);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reference_point_rtree_update AFTER UPDATE OF id, latitude, longitude ON reference_point BEGIN
+        DELETE FROM reference_point_rtree WHERE id = OLD.id;
+        INSERT OR REPLACE INTO reference_point_rtree VALUES (NEW.id, NEW.longitude, NEW.longitude, NEW.latitude, NEW.latitude);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reference_point_rtree_delete AFTER DELETE ON reference_point BEGIN
+        DELETE FROM reference_point_rtree WHERE id = OLD.id;
+    END""",
+    'CREATE VIRTUAL TABLE IF NOT EXISTS survey_polygon_rtree USING rtree(id, min_lon, max_lon, min_lat, max_lat)',
+    f"""CREATE TRIGGER IF NOT EXISTS survey_polygon_rtree_insert AFTER INSERT ON survey_polygon BEGIN
+        INSERT OR REPLACE INTO survey_polygon_rtree {POLYGON_BBOX_SELECT};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS survey_polygon_rtree_update AFTER UPDATE OF id, vertices ON survey_polygon BEGIN
+        DELETE FROM survey_polygon_rtree WHERE id = OLD.id;
+        INSERT OR REPLACE INTO survey_polygon_rtree {POLYGON_BBOX_SELECT};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS survey_polygon_rtree_delete AFTER DELETE ON survey_polygon BEGIN
+        DELETE FROM survey_polygon_rtree WHERE id = OLD.id;
+    END""",
+]
+
+SPATIAL_RTREE_BACKFILL = [
+    'DELETE FROM reference_point_rtree',
+    'INSERT INTO reference_point_rtree SELECT id, longitude, longitude, latitude, latitude FROM reference_point',
+    'DELETE FROM survey_polygon_rtree',
+    """INSERT INTO survey_polygon_rtree
+    SELECT id, min_lon, max_lon, min_lat, max_lat FROM survey_polygon WHERE vertex_count > 0""",
+]
+
+rtree_enabled = False
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the configured pragmas to every new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    for name, value in app.config['SQLITE_PRAGMAS'].items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+def spatial_rtree_count(connection):
+    """Number of the two R*Tree tables that exist"""
+    return connection.execute(sa.text(
+        "SELECT count(*) FROM sqlite_master WHERE name IN ('reference_point_rtree', 'survey_polygon_rtree')"
+    )).scalar()
+
+def init_spatial_rtree():
+    """Create the R*Tree tables and triggers, backfilling them the first time they are created"""
+    with db.engine.begin() as connection:
+        existing = spatial_rtree_count(connection)
+        for statement in SPATIAL_RTREE_DDL:
+            connection.exec_driver_sql(statement)
+        if existing < 2:
+            for statement in SPATIAL_RTREE_BACKFILL:
+                connection.exec_driver_sql(statement)
+
+# Pragmas must be in place before the first connection; nothing here touches the database
 with app.app_context():
+    use_sqlite_profile = app.config['STORAGE_PROFILE'] == 'performance' and db.engine.dialect.name == 'sqlite'
+    if use_sqlite_profile:
+        event.listen(db.engine, 'connect', apply_sqlite_pragmas)
+
+def init_db():
+    """Create missing tables, migrate older schemas and backfill derived data
+    
+    Safe to run repeatedly. create_app() calls it unless INIT_SCHEMA_ON_STARTUP is
+    off, and ``flask --app app init-db`` runs it on its own.
+    """
+    global rtree_enabled
     db.create_all()
+    upgrade_schema()
+    backfill_polygon_levels()
+    if use_sqlite_profile:
+        try:
+            init_spatial_rtree()
+            rtree_enabled = True
+        except sa.exc.OperationalError as e:
+            # SQLite builds without the R*Tree module fall back to the in-memory index
+            app.logger.warning('SQLite R*Tree index unavailable: %s', e)
+
+def detect_spatial_rtree():
+    """Use R*Tree filters if init_db has already created the tables, for workers that skip it"""
+    global rtree_enabled
+    if use_sqlite_profile:
+        with db.engine.connect() as connection:
+            rtree_enabled = spatial_rtree_count(connection) == 2
+
+database_prepared = False
+database_prepare_lock = threading.Lock()
+
+def prepare_database():
+    """Run init_db, or only detect_spatial_rtree when INIT_SCHEMA_ON_STARTUP is off, once per process"""
+    global database_prepared
+    with database_prepare_lock:
+        if database_prepared:
+            return
+        if app.config['INIT_SCHEMA_ON_STARTUP']:
+            init_db()
+        else:
+            detect_spatial_rtree()
+        database_prepared = True
+
+@app.before_request
+def _prepare_database():
+    # create_app() has normally done this already; servers that load the module-level
+    # ``app`` directly (``gunicorn app:app``, ``flask --app app run``) get it on the first request
+    if not database_prepared:
+        prepare_database()
+
+# Coordinate transformation
+WGS84_EPSG = 4326
+TRANSFORMER_CACHE_SIZE = 128
+
+class TransformerRegistry:
+    """Thread-safe LRU cache of pyproj transformers keyed by (source EPSG, target EPSG)"""
+    
+    def __init__(self, maxsize=TRANSFORMER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._transformers = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, source_epsg, target_epsg):
+        """Return a cached (lon, lat ordered) transformer, creating it on first use"""
+        key = (int(source_epsg), int(target_epsg))
+        with self._lock:
+            transformer = self._transformers.get(key)
+            if transformer is not None:
+                self._transformers.move_to_end(key)
+                self.hits += 1
+                return transformer
+            
+            self.misses += 1
+            transformer = Transformer.from_crs(f"EPSG:{key[0]}", f"EPSG:{key[1]}", always_xy=True)
+            self._transformers[key] = transformer
+            while len(self._transformers) > self.maxsize:
+                self._transformers.popitem(last=False)
+                self.evictions += 1
+            return transformer
+    
+    def clear(self):
+        with self._lock:
+            self._transformers.clear()
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._transformers),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else None
+            }
+
+transformer_registry = TransformerRegistry()
+WGS84_GEOD = Geod(ellps='WGS84')
 
 # Utility functions
+def utm_zone_for(lon):
+    """Return the UTM zone number (1-60) for a longitude"""
+    return min(max(int((lon + 180) / 6) + 1, 1), 60)
+
+def utm_epsg(zone, north):
+    """Return the WGS84 / UTM EPSG code for a zone and hemisphere"""
+    return (32600 if north else 32700) + int(zone)
+
+def lat_lon_to_utm_arrays(lats, lons):
+    """Convert latitude/longitude arrays to UTM zone, hemisphere, easting and northing arrays
+    
+    Coordinates are grouped by UTM zone so each zone is projected with a single
+    vectorized transformer call.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    
+    zones = np.clip(np.floor((np.nan_to_num(lons) + 180) / 6).astype(int) + 1, 1, 60)
+    north = lats >= 0
+    epsg_codes = np.where(north, 32600, 32700) + zones
+    eastings = np.full(lats.shape, np.nan)
+    northings = np.full(lats.shape, np.nan)
+    
+    for code in np.unique(epsg_codes):
+        mask = epsg_codes == code
+        transformer = transformer_registry.get(WGS84_EPSG, code)
+        eastings[mask], northings[mask] = transformer.transform(lons[mask], lats[mask])
+    
+    return zones, north, eastings, northings
+
+def format_utm(zone, north, easting, northing):
+    """Format UTM coordinates the way they are displayed in popups and exports"""
+    if not (math.isfinite(easting) and math.isfinite(northing)):
+        return "UTM conversion failed"
+    return f"Zone {zone}{'N' if north else 'S'}: {easting:.2f}E, {northing:.2f}N"
+
+def lat_lon_to_utm_strings(lats, lons):
+    """Convert many latitude/longitude pairs to formatted UTM strings in one pass"""
+    try:
+        zones, north, eastings, northings = lat_lon_to_utm_arrays(lats, lons)
+    except Exception:
+        return ["UTM conversion failed"] * len(lats)
+    return [format_utm(*values) for values in zip(zones.tolist(), north.tolist(), eastings.tolist(), northings.tolist())]
+
 def lat_lon_to_utm(lat, lon):
     """Convert latitude/longitude to UTM coordinates"""
-    try:
-        # Determine UTM zone
-        utm_zone = int((lon + 180) / 6) + 1
-        hemisphere = 'north' if lat >= 0 else 'south'
-        
-        # Create transformer
-        transformer = Transformer.from_crs(
-            "EPSG:4326",  # WGS84
-            f"EPSG:326{utm_zone:02d}" if hemisphere == 'north' else f"EPSG:327{utm_zone:02d}",
-            always_xy=True
-        )
-        
-        x, y = transformer.transform(lon, lat)
-        return f"Zone {utm_zone}{hemisphere[0].upper()}: {x:.2f}E, {y:.2f}N"
-    except:
+    return lat_lon_to_utm_strings([lat], [lon])[0]
+
+def point_utm_values(lats, lons):
+    """reference_point UTM column values for many points; all None where the projection fails"""
+    zones, north, eastings, northings = lat_lon_to_utm_arrays(lats, lons)
+    return [
+        dict(zip(POINT_UTM_COLUMNS, (zone, 'N' if is_north else 'S', easting, northing)))
+        if math.isfinite(easting) and math.isfinite(northing) else dict.fromkeys(POINT_UTM_COLUMNS)
+        for zone, is_north, easting, northing in zip(zones.tolist(), north.tolist(), eastings.tolist(), northings.tolist())
+    ]
+
+def set_point_utm(rows):
+    """Add the UTM columns to reference_point insert or update value dicts, in place"""
+    values = point_utm_values([row['latitude'] for row in rows], [row['longitude'] for row in rows])
+    for row, utm in zip(rows, values):
+        row.update(utm)
+
+def stored_utm_label(point):
+    """format_utm text for a point (model or row) from its stored UTM columns"""
+    if point.utm_zone is None:
         return "UTM conversion failed"
+    return format_utm(point.utm_zone, point.utm_hemisphere == 'N', point.utm_easting, point.utm_northing)
+
+def and_present(*conditions):
+    """SQL AND of the conditions that are not None; None if all are"""
+    conditions = [condition for condition in conditions if condition is not None]
+    return sa.and_(*conditions) if conditions else None
+
+def utm_zone_filter():
+    """SQL condition on reference points for ?utm_zone=33N, 33S or 33 (either hemisphere); None without it"""
+    text = request.args.get('utm_zone', '').strip().upper()
+    if not text:
+        return None
+    hemisphere = text[-1] if text[-1] in 'NS' else None
+    zone = text[:-1] if hemisphere else text
+    if not zone.isdigit() or not 1 <= int(zone) <= 60:
+        raise ValueError('utm_zone must be a zone from 1 to 60, optionally followed by N or S')
+    condition = ReferencePoint.utm_zone == int(zone)
+    if hemisphere:
+        condition = sa.and_(condition, ReferencePoint.utm_hemisphere == hemisphere)
+    return condition
 
 def calculate_polygon_metrics(coordinates):
     """Calculate area and perimeter of a polygon"""
@@ -103,23 +706,15 @@ def calculate_polygon_metrics(coordinates):
     # Use more accurate geodesic calculations
     # Convert to UTM for area calculation
     first_point = coordinates[0]
-    utm_zone = int((first_point[1] + 180) / 6) + 1
-    hemisphere = 'north' if first_point[0] >= 0 else 'south'
+    utm_zone = utm_zone_for(first_point[1])
     
     try:
-        # Transform to UTM
-        transformer = Transformer.from_crs(
-            "EPSG:4326",
-            f"EPSG:326{utm_zone:02d}" if hemisphere == 'north' else f"EPSG:327{utm_zone:02d}",
-            always_xy=True
-        )
-        
-        utm_coords = []
-        for coord in coordinates:
-            x, y = transformer.transform(coord[1], coord[0])  # lon, lat
-            utm_coords.append((x, y))
+        # Transform every vertex to UTM in one call
+        transformer = transformer_registry.get(WGS84_EPSG, utm_epsg(utm_zone, first_point[0] >= 0))
+        coords = np.asarray(coordinates, dtype=float)
+        xs, ys = transformer.transform(coords[:, 1], coords[:, 0])  # lon, lat
         
-        utm_polygon = Polygon(utm_coords)
+        utm_polygon = Polygon(np.column_stack([xs, ys]))
         area_sqm = utm_polygon.area
         perimeter_m = utm_polygon.length
         
@@ -131,6 +726,102 @@ def calculate_polygon_metrics(coordinates):
         perimeter_m = polygon.length * 111320
         return area_sqm, perimeter_m
 
+def polygon_metrics_tasks(rings, max_vertices=None):
+    """Group measurable rings into (UTM EPSG code, ring indices) tasks
+    
+    Each ring belongs to the UTM zone of its first vertex, as in
+    calculate_polygon_metrics. Zones holding more than ``max_vertices`` vertices
+    are split into several tasks so they can be spread across workers.
+    """
+    measured = np.array([i for i, ring in enumerate(rings) if len(ring) >= 3], dtype=int)
+    if not len(measured):
+        return []
+    
+    firsts = np.array([rings[i][0] for i in measured], dtype=float)
+    zones = np.clip(((firsts[:, 1] + 180) / 6).astype(int) + 1, 1, 60)
+    epsg_codes = np.where(firsts[:, 0] >= 0, 32600, 32700) + zones
+    tasks = []
+    for code in np.unique(epsg_codes):
+        members = measured[epsg_codes == code]
+        if max_vertices is None:
+            tasks.append((int(code), members))
+            continue
+        parts = np.cumsum([len(rings[i]) for i in members]) // max_vertices
+        for part in np.split(members, np.flatnonzero(np.diff(parts)) + 1):
+            tasks.append((int(code), part))
+    return tasks
+
+def calculate_zone_metrics(epsg_code, coords, counts):
+    """Area and perimeter of consecutive [lat, lon] rings sharing one UTM zone, using the shared registry"""
+    return polygon_metrics.zone_metrics(transformer_registry.get(WGS84_EPSG, epsg_code), coords, counts)
+
+def zone_task_arguments(rings, code, members):
+    counts = [len(rings[i]) for i in members]
+    return code, np.concatenate([np.asarray(rings[i], dtype=float) for i in members]), counts
+
+def calculate_polygon_metrics_batch(rings):
+    """Area and perimeter arrays for many [lat, lon] vertex arrays
+    
+    Like calculate_polygon_metrics, each ring is projected into the UTM zone of
+    its first vertex, but all rings sharing a zone go through one transformer
+    call and are measured with vectorized shapely functions.
+    """
+    areas = np.zeros(len(rings))
+    perimeters = np.zeros(len(rings))
+    for code, members in polygon_metrics_tasks(rings):
+        areas[members], perimeters[members] = calculate_zone_metrics(*zone_task_arguments(rings, code, members))
+    return areas, perimeters
+
+_metrics_pool = None
+_metrics_pool_lock = threading.Lock()
+
+def metrics_process_pool():
+    """Return the shared metrics process pool, or None with a single worker
+    
+    Workers are spawned rather than forked: forking a process that runs request
+    and import threads can copy locks held by those threads (the connection pool,
+    logging, the transformer registry) and deadlock the child. Spawned workers
+    only import the polygon_metrics module, plus the main script as usual for
+    spawn, so scripts that measure polygons need an ``if __name__ == '__main__'`` guard.
+    """
+    global _metrics_pool
+    workers = app.config['POLYGON_METRICS_WORKERS']
+    if workers <= 1:
+        return None
+    with _metrics_pool_lock:
+        if _metrics_pool is None:
+            _metrics_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _metrics_pool
+
+def calculate_polygon_metrics_parallel(rings):
+    """calculate_polygon_metrics_batch spread across the metrics process pool
+    
+    Rings are grouped by UTM zone and split into roughly two tasks per worker so
+    each task reuses one transformer. Batches below
+    POLYGON_METRICS_PARALLEL_MIN_VERTICES are measured in-process, where the
+    cost of shipping vertices to workers would outweigh the gain.
+    """
+    total_vertices = sum(len(ring) for ring in rings)
+    pool = metrics_process_pool() if total_vertices >= app.config['POLYGON_METRICS_PARALLEL_MIN_VERTICES'] else None
+    if pool is None:
+        return calculate_polygon_metrics_batch(rings)
+    
+    areas = np.zeros(len(rings))
+    perimeters = np.zeros(len(rings))
+    task_vertices = max(total_vertices // (2 * app.config['POLYGON_METRICS_WORKERS']), 1)
+    tasks = polygon_metrics_tasks(rings, task_vertices)
+    futures = [(members, pool.submit(polygon_metrics.calculate_zone_metrics, *zone_task_arguments(rings, code, members)))
+               for code, members in tasks]
+    for members, future in futures:
+        areas[members], perimeters[members] = future.result()
+    return areas, perimeters
+
+def measure_polygons(polygons):
+    """Set area_sqm and perimeter_m on many SurveyPolygon objects in one batch"""
+    areas, perimeters = calculate_polygon_metrics_parallel([polygon.coordinate_array for polygon in polygons])
+    for polygon, area_sqm, perimeter_m in zip(polygons, areas.tolist(), perimeters.tolist()):
+        polygon.area_sqm, polygon.perimeter_m = area_sqm, perimeter_m
+
 def dms_to_decimal(degrees, minutes, seconds):
     """Convert degrees, minutes, seconds to decimal degrees"""
     return degrees + minutes/60.0 + seconds/3600.0
@@ -145,66 +836,1088 @@ def decimal_to_dms(decimal_degrees):
 
 def calculate_point_from_distance_azimuth(start_lat, start_lon, distance_m, azimuth_degrees):
     """Calculate new point from start point, distance (meters), and azimuth (degrees)"""
-    from geopy.distance import geodesic
+    # Azimuth is measured clockwise from north on the WGS84 ellipsoid
+    new_lon, new_lat, _ = WGS84_GEOD.fwd(start_lon, start_lat, azimuth_degrees, distance_m)
+    return new_lat, new_lon
+
+def calculate_points_from_distance_azimuth_arrays(start_lats, start_lons, distances, azimuths):
+    """Calculate destination points for many independent (start, distance, azimuth) rows at once"""
+    new_lons, new_lats, _ = WGS84_GEOD.fwd(
+        np.asarray(start_lons, dtype=float), np.asarray(start_lats, dtype=float),
+        np.asarray(azimuths, dtype=float), np.asarray(distances, dtype=float)
+    )
+    return new_lats, new_lons
+
+def calculate_chained_traverse(start_lats, start_lons, distances, azimuths):
+    """Calculate the vertices of one or more chained traverses
     
-    # Use geopy for accurate geodesic calculations
-    start_point = (start_lat, start_lon)
+    ``distances`` and ``azimuths`` are (traverses x legs) arrays. Each leg starts at
+    the previous leg's end point, so legs are stepped in order while every step
+    is solved for all traverses in a single vectorized call. Returns
+    (traverses x legs + 1) latitude and longitude arrays including the start vertex.
+    """
+    distances = np.atleast_2d(np.asarray(distances, dtype=float))
+    azimuths = np.atleast_2d(np.asarray(azimuths, dtype=float))
+    traverse_count, leg_count = distances.shape
     
-    # Calculate bearing (azimuth) - geopy uses bearing from north clockwise
-    bearing = azimuth_degrees
+    lats = np.empty((traverse_count, leg_count + 1))
+    lons = np.empty((traverse_count, leg_count + 1))
+    lats[:, 0] = start_lats
+    lons[:, 0] = start_lons
+    for leg in range(leg_count):
+        lons[:, leg + 1], lats[:, leg + 1], _ = WGS84_GEOD.fwd(
+            lons[:, leg], lats[:, leg], azimuths[:, leg], distances[:, leg]
+        )
+    return lats, lons
+
+def vertex_records(lats, lons):
+    """Build vertex dictionaries with geographic and UTM coordinates"""
+    zones, north, eastings, northings = lat_lon_to_utm_arrays(lats, lons)
+    records = []
+    for i, (lat, lon, zone, is_north, easting, northing) in enumerate(zip(
+        np.asarray(lats).tolist(), np.asarray(lons).tolist(), zones.tolist(),
+        north.tolist(), eastings.tolist(), northings.tolist()
+    )):
+        records.append({
+            'index': i,
+            'latitude': lat,
+            'longitude': lon,
+            'utm_zone': zone,
+            'utm_hemisphere': 'N' if is_north else 'S',
+            'utm_easting': easting,
+            'utm_northing': northing,
+            'utm_coordinates': format_utm(zone, is_north, easting, northing)
+        })
+    return records
+
+def calculate_azimuth_distance(lat1, lon1, lat2, lon2):
+    """Calculate azimuth and distance between two points
     
-    # Calculate destination point
-    destination = geodesic(meters=distance_m).destination(start_point, bearing)
+    Goes through calculate_azimuth_distance_arrays so the single-pair and batch
+    endpoints return the same WGS84 geodesic azimuth for the same pair.
+    """
+    azimuths, distances = calculate_azimuth_distance_arrays([lat1], [lon1], [lat2], [lon2])
+    return float(azimuths[0]), float(distances[0])
+
+def calculate_azimuth_distance_arrays(lats1, lons1, lats2, lons2):
+    """Calculate ellipsoidal azimuths and distances for many point pairs in one pass
     
-    return destination.latitude, destination.longitude
+    Azimuths are WGS84 geodesic forward azimuths normalized to 0-360 degrees.
+    """
+    azimuths, _, distances = WGS84_GEOD.inv(
+        np.asarray(lons1, dtype=float), np.asarray(lats1, dtype=float),
+        np.asarray(lons2, dtype=float), np.asarray(lats2, dtype=float)
+    )
+    return np.mod(azimuths, 360.0), distances
 
-def calculate_azimuth_distance(lat1, lon1, lat2, lon2):
-    """Calculate azimuth and distance between two points"""
-    from geopy.distance import geodesic
-    import math
+def decimal_to_dms_arrays(decimal_degrees):
+    """Convert an array of decimal degrees to degrees, minutes, seconds arrays"""
+    decimal_degrees = np.asarray(decimal_degrees, dtype=float)
+    degrees = np.trunc(decimal_degrees)
+    minutes_float = (decimal_degrees - degrees) * 60
+    minutes = np.trunc(minutes_float)
+    seconds = (minutes_float - minutes) * 60
+    return degrees.astype(int), minutes.astype(int), seconds
+
+def validate_lat_lon_arrays(lats, lons, label=''):
+    """Raise ValueError naming the first row with a non-finite or out-of-range coordinate"""
+    invalid = ~(np.isfinite(lats) & np.isfinite(lons) & (np.abs(lats) <= 90) & (np.abs(lons) <= 180))
+    if invalid.any():
+        row = int(np.argmax(invalid))
+        raise ValueError(f'Invalid {label}coordinates at row {row}: {lats[row]}, {lons[row]}')
+
+def read_batch_columns(columns, rows_key='rows'):
+    """Read equally sized float columns from an uploaded CSV file or a JSON body
+    
+    JSON bodies may be columnar ({"lat1": [...], ...}) or a list of rows under
+    ``rows_key``, given either as objects or as arrays in ``columns`` order.
+    """
+    if 'file' in request.files:
+        import pandas as pd
+        frame = pd.read_csv(request.files['file'].stream)
+        frame.columns = frame.columns.str.strip().str.lower()
+        missing = [name for name in columns if name not in frame.columns]
+        if missing:
+            raise ValueError(f'CSV is missing columns: {", ".join(missing)}')
+        values = {name: frame[name].to_numpy(dtype=float) for name in columns}
+    else:
+        data = request.get_json(silent=True) or {}
+        rows = data.get(rows_key)
+        if rows is not None:
+            if rows and isinstance(rows[0], dict):
+                values = {name: np.array([row[name] for row in rows], dtype=float) for name in columns}
+            else:
+                table = np.asarray(rows, dtype=float).reshape(-1, len(columns))
+                values = {name: table[:, i] for i, name in enumerate(columns)}
+        else:
+            missing = [name for name in columns if name not in data]
+            if missing:
+                raise ValueError(f'Missing fields: {", ".join(missing)}')
+            values = {name: np.asarray(data[name], dtype=float).ravel() for name in columns}
+    
+    lengths = {len(column) for column in values.values()}
+    if len(lengths) != 1:
+        raise ValueError('All columns must have the same length')
+    count = lengths.pop()
+    if count > app.config['GEODESIC_BATCH_MAX_ROWS']:
+        raise ValueError(f'Batch too large: {count} rows (limit {app.config["GEODESIC_BATCH_MAX_ROWS"]})')
+    return values
+
+def calculate_distance_matrix(lats, lons):
+    """Calculate the symmetric NxN geodesic distance matrix (meters) for a set of points"""
+    count = len(lats)
+    matrix = np.zeros((count, count))
+    if count < 2:
+        return matrix
+    
+    # Solve each unordered pair once and mirror it
+    rows, cols = np.triu_indices(count, k=1)
+    _, _, distances = WGS84_GEOD.inv(lons[rows], lats[rows], lons[cols], lats[cols])
+    matrix[rows, cols] = distances
+    matrix[cols, rows] = distances
+    return matrix
+
+# Spatial index
+EARTH_MIN_RADIUS_M = 6356752.0
+# Rough per-geometry footprint of a GEOS object plus its Python wrapper and tree node
+GEOMETRY_OVERHEAD_BYTES = 200
+
+SpatialIndexData = namedtuple('SpatialIndexData', 'ids geoms categories alive tree')
+
+def polygon_geometry(coordinates):
+    """Return a lon/lat shapely geometry for [[lat, lon], ...] polygon coordinates"""
+    lon_lat = np.asarray(coordinates, dtype=float).reshape(-1, 2)[:, ::-1]
+    if len(lon_lat) == 0:
+        return GeometryCollection()
+    if len(lon_lat) < 3:
+        return shapely.multipoints(lon_lat)
+    geometry = Polygon(lon_lat)
+    return geometry if geometry.is_valid else shapely.make_valid(geometry)
+
+def split_antimeridian_bbox(min_lon, min_lat, max_lon, max_lat):
+    """Split a lon/lat box extending past +/-180 degrees into boxes inside the valid range"""
+    if max_lon - min_lon >= 360:
+        return [(-180, min_lat, 180, max_lat)]
+    if min_lon < -180:
+        return [(min_lon + 360, min_lat, 180, max_lat), (-180, min_lat, max_lon, max_lat)]
+    if max_lon > 180:
+        return [(min_lon, min_lat, 180, max_lat), (-180, min_lat, max_lon - 360, max_lat)]
+    return [(min_lon, min_lat, max_lon, max_lat)]
+
+def bbox_geometry(min_lon, min_lat, max_lon, max_lat):
+    """Return a lon/lat (multi)polygon for a box that may extend past the antimeridian"""
+    boxes = split_antimeridian_bbox(min_lon, min_lat, max_lon, max_lat)
+    return shapely.multipolygons([shapely.box(*bounds) for bounds in boxes])
+
+class SpatialIndex:
+    """In-memory STRtree over the lon/lat geometries of one model
+    
+    An STRtree cannot be modified once built, so writes are applied as an
+    overlay: replaced or deleted rows are tombstoned in the tree and changed rows
+    live in a small delta set that is scanned with vectorized predicates. The
+    tree is rebuilt in memory, without touching the database, once the overlay
+    outgrows ``compact_ratio`` of the indexed rows.
+    """
+    
+    def __init__(self, name, load, compact_ratio=0.1, min_compact=256):
+        self.name = name
+        self.compact_ratio = compact_ratio
+        self.min_compact = min_compact
+        self.build_seconds = None
+        self.builds = 0
+        self.compactions = 0
+        self._load = load
+        self._data = None
+        self._delta = {}
+        self._delta_geoms = None
+        self._tombstones = 0
+        self._lock = threading.RLock()
+    
+    @property
+    def built(self):
+        """Whether the index is loaded; writers skip building geometries for an unbuilt index
+        
+        Checked after the write commits: an index built later reads the committed rows.
+        """
+        return self._data is not None
     
-    point1 = (lat1, lon1)
-    point2 = (lat2, lon2)
+    def invalidate(self):
+        """Drop the index; it is reloaded from the database on next use"""
+        with self._lock:
+            self._data = None
+            self._delta = {}
+            self._delta_geoms = None
+            self._tombstones = 0
     
-    # Calculate distance
-    dist = geodesic(point1, point2).meters
+    def _ensure_built(self):
+        if self._data is None:
+            start = time.perf_counter()
+            ids, geoms, categories = self._load()
+            self._data = self._make_data(ids, geoms, categories)
+            self.build_seconds = time.perf_counter() - start
+            self.builds += 1
+        return self._data
     
-    # Calculate bearing (azimuth) using basic spherical trigonometry
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    lon1_rad = math.radians(lon1)
-    lon2_rad = math.radians(lon2)
+    @staticmethod
+    def _make_data(ids, geoms, categories):
+        order = np.argsort(ids, kind='stable')
+        ids = np.asarray(ids, dtype=np.int64)[order]
+        geoms = np.asarray(geoms, dtype=object)[order]
+        categories = np.asarray(categories, dtype=object)[order]
+        return SpatialIndexData(ids, geoms, categories, np.ones(len(ids), dtype=bool), STRtree(geoms))
     
-    dlon = lon2_rad - lon1_rad
+    def _tombstone(self, item_id):
+        data = self._data
+        position = np.searchsorted(data.ids, item_id)
+        if position < len(data.ids) and data.ids[position] == item_id and data.alive[position]:
+            data.alive[position] = False
+            self._tombstones += 1
     
-    y = math.sin(dlon) * math.cos(lat2_rad)
-    x = math.cos(lat1_rad) * math.sin(lat2_rad) - math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(dlon)
+    def upsert(self, item_id, geometry, category=None):
+        with self._lock:
+            if self._data is None:
+                return  # Not built yet; the next build reads the committed row
+            self._tombstone(item_id)
+            self._delta[item_id] = (geometry, category)
+            self._delta_geoms = None
+            self._maybe_compact()
     
-    bearing = math.atan2(y, x)
-    bearing = math.degrees(bearing)
-    bearing = (bearing + 360) % 360  # Normalize to 0-360
+    def upsert_many(self, item_ids, geometries, categories):
+        """Apply many upserts with at most one compaction"""
+        with self._lock:
+            if self._data is None:
+                return
+            for item_id, geometry, category in zip(item_ids, geometries, categories):
+                self._tombstone(item_id)
+                self._delta[item_id] = (geometry, category)
+            self._delta_geoms = None
+            self._maybe_compact()
     
-    return bearing, dist
+    def remove(self, item_id):
+        with self._lock:
+            if self._data is None:
+                return
+            self._tombstone(item_id)
+            if self._delta.pop(item_id, None) is not None:
+                self._delta_geoms = None
+            self._maybe_compact()
+    
+    def refresh(self, item_ids):
+        """Reload rows written by another process: re-index those that exist and drop the rest"""
+        if not item_ids or self._data is None:
+            return
+        ids, geoms, categories = self._load(item_ids)
+        with self._lock:
+            self.upsert_many(ids.tolist(), geoms, categories)
+            self.remove_many(sorted(set(item_ids) - set(ids.tolist())))
+    
+    def remove_many(self, item_ids):
+        """Apply many removals with at most one compaction"""
+        with self._lock:
+            if self._data is None:
+                return
+            for item_id in item_ids:
+                self._tombstone(item_id)
+                if self._delta.pop(item_id, None) is not None:
+                    self._delta_geoms = None
+            self._maybe_compact()
+    
+    def _maybe_compact(self):
+        overlay = len(self._delta) + self._tombstones
+        if overlay > max(self.min_compact, self.compact_ratio * len(self._data.ids)):
+            data = self._data
+            delta_ids = list(self._delta)
+            self._data = self._make_data(
+                np.concatenate([data.ids[data.alive], np.array(delta_ids, dtype=np.int64)]),
+                np.concatenate([data.geoms[data.alive], np.array([self._delta[i][0] for i in delta_ids], dtype=object)]),
+                np.concatenate([data.categories[data.alive], np.array([self._delta[i][1] for i in delta_ids], dtype=object)])
+            )
+            self._delta = {}
+            self._delta_geoms = None
+            self._tombstones = 0
+            self.compactions += 1
+    
+    def query_entries(self, geometry, category=None):
+        """Return (ids, geometries) of indexed rows intersecting a lon/lat geometry"""
+        with self._lock:
+            data = self._ensure_built()
+            positions = data.tree.query(geometry, predicate='intersects')
+            positions = positions[data.alive[positions]]
+            if category is not None:
+                positions = positions[data.categories[positions] == category]
+            ids, geoms = data.ids[positions], data.geoms[positions]
+            
+            if self._delta:
+                if self._delta_geoms is None:
+                    self._delta_geoms = (
+                        np.array(list(self._delta), dtype=np.int64),
+                        np.array([entry[0] for entry in self._delta.values()], dtype=object),
+                        np.array([entry[1] for entry in self._delta.values()], dtype=object)
+                    )
+                delta_ids, delta_geoms, delta_categories = self._delta_geoms
+                matches = shapely.intersects(delta_geoms, geometry)
+                if category is not None:
+                    matches &= delta_categories == category
+                ids = np.concatenate([ids, delta_ids[matches]])
+                geoms = np.concatenate([geoms, delta_geoms[matches]])
+            return ids, geoms
+    
+    def query(self, geometry, category=None):
+        """Return the sorted IDs of indexed rows intersecting a lon/lat geometry"""
+        return np.sort(self.query_entries(geometry, category)[0])
+    
+    def query_bbox(self, min_lon, min_lat, max_lon, max_lat, category=None):
+        """Return IDs inside a lon/lat box; boxes may extend past the antimeridian"""
+        return self.query(bbox_geometry(min_lon, min_lat, max_lon, max_lat), category)
+    
+    def stats(self):
+        with self._lock:
+            data = self._data
+            if data is None:
+                return {'name': self.name, 'built': False, 'builds': self.builds}
+            geoms = np.concatenate([data.geoms[data.alive], np.array([entry[0] for entry in self._delta.values()], dtype=object)])
+            coordinate_bytes = int(shapely.get_num_coordinates(geoms).sum()) * 16 if len(geoms) else 0
+            return {
+                'name': self.name,
+                'built': True,
+                'size': int(data.alive.sum()) + len(self._delta),
+                'tree_size': len(data.ids),
+                'delta_size': len(self._delta),
+                'tombstones': self._tombstones,
+                'builds': self.builds,
+                'compactions': self.compactions,
+                'build_seconds': self.build_seconds,
+                'estimated_memory_bytes': (
+                    data.ids.nbytes + data.geoms.nbytes + data.categories.nbytes + data.alive.nbytes
+                    + coordinate_bytes + len(geoms) * GEOMETRY_OVERHEAD_BYTES
+                )
+            }
+
+class ReferencePointIndex(SpatialIndex):
+    """Spatial index of ReferencePoint locations with geodesic nearest-neighbour search"""
+    
+    def __init__(self):
+        super().__init__('reference_points', self._load_points)
+    
+    @staticmethod
+    def _load_points(item_ids=None):
+        query = db.session.query(
+            ReferencePoint.id, ReferencePoint.longitude, ReferencePoint.latitude, ReferencePoint.point_type
+        )
+        rows = query.all() if item_ids is None else [
+            row for start in range(0, len(item_ids), 500)
+            for row in query.filter(ReferencePoint.id.in_(item_ids[start:start + 500]))
+        ]
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        coords = np.array([(row[1], row[2]) for row in rows], dtype=float).reshape(-1, 2)
+        return ids, shapely.points(coords), [row[3] for row in rows]
+    
+    def query_radius(self, lat, lon, radius_m, point_type=None):
+        """Return (ids, geometries) of every point that may lie within radius_m of (lat, lon)
+        
+        The search box encloses the spherical cap of the given radius on a sphere
+        of the Earth's polar radius, with a small margin for ellipsoid flattening.
+        """
+        angle = min(radius_m / EARTH_MIN_RADIUS_M * 1.01, math.pi)
+        dlat = math.degrees(angle)
+        if abs(lat) + dlat >= 90 or math.sin(angle) >= math.cos(math.radians(lat)):
+            # The cap reaches a pole, so every longitude is in range
+            bounds = (-180, max(lat - dlat, -90), 180, min(lat + dlat, 90))
+        else:
+            dlon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+            bounds = (lon - dlon, lat - dlat, lon + dlon, lat + dlat)
+        boxes = split_antimeridian_bbox(*bounds)
+        return self.query_entries(shapely.multipolygons([shapely.box(*box) for box in boxes]), point_type)
+    
+    def nearest(self, lat, lon, k, point_type=None):
+        """Return (ids, distances in meters) of the k nearest points by geodesic distance"""
+        def distances_to(geoms):
+            coords = shapely.get_coordinates(geoms)
+            _, _, distances = WGS84_GEOD.inv(
+                np.full(len(coords), lon), np.full(len(coords), lat), coords[:, 0], coords[:, 1]
+            )
+            return distances
+        
+        # Grow the search window until it holds k candidates or covers the globe
+        radius_m = 100.0
+        ids, geoms = self.query_radius(lat, lon, radius_m, point_type)
+        while len(ids) < k and radius_m < math.pi * EARTH_MIN_RADIUS_M:
+            radius_m *= 8
+            ids, geoms = self.query_radius(lat, lon, radius_m, point_type)
+        if not len(ids):
+            return ids, np.array([])
+        
+        # The k-th candidate bounds the answer; re-query that radius so nearer
+        # points outside the first window are not missed
+        k = min(k, len(ids))
+        kth_distance = np.partition(distances_to(geoms), k - 1)[k - 1]
+        ids, geoms = self.query_radius(lat, lon, kth_distance, point_type)
+        distances = distances_to(geoms)
+        order = np.lexsort((ids, distances))[:k]
+        return ids[order], distances[order]
+
+class SurveyPolygonIndex(SpatialIndex):
+    """Spatial index of SurveyPolygon outlines"""
+    
+    def __init__(self):
+        super().__init__('survey_polygons', self._load_polygons)
+    
+    @staticmethod
+    def _load_polygons(item_ids=None):
+        query = db.session.query(SurveyPolygon.id, SurveyPolygon.vertices, SurveyPolygon.polygon_type)
+        rows = query.all() if item_ids is None else [
+            row for start in range(0, len(item_ids), 500)
+            for row in query.filter(SurveyPolygon.id.in_(item_ids[start:start + 500]))
+        ]
+        geoms = np.array([polygon_geometry(unpack_vertices(row[1])) for row in rows], dtype=object)
+        return np.array([row[0] for row in rows], dtype=np.int64), geoms, [row[2] for row in rows]
+
+point_index = ReferencePointIndex()
+polygon_index = SurveyPolygonIndex()
+
+@event.listens_for(db.session, 'before_flush')
+def _set_point_utm(session, flush_context, instances):
+    # Projected once per flush, so imports that add many points make one call per UTM zone
+    points = [obj for obj in chain(session.new, session.dirty) if isinstance(obj, ReferencePoint) and (
+        obj in session.new or any(sa.inspect(obj).attrs[name].history.has_changes() for name in ('latitude', 'longitude')))]
+    if not points:
+        return
+    for point, values in zip(points, point_utm_values([point.latitude for point in points],
+                                                      [point.longitude for point in points])):
+        for name, value in values.items():
+            setattr(point, name, value)
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_spatial_changes(session, flush_context):
+    # Capture values now: objects are expired after commit and must not be reloaded there
+    changes = session.info.setdefault('spatial_changes', [])
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, ReferencePoint):
+            changes.append((point_index, obj.id, (obj.longitude, obj.latitude), obj.point_type))
+        elif isinstance(obj, SurveyPolygon):
+            changes.append((polygon_index, obj.id, obj.vertices, obj.polygon_type))
+    for obj in session.deleted:
+        if isinstance(obj, ReferencePoint):
+            changes.append((point_index, obj.id, None, None))
+        elif isinstance(obj, SurveyPolygon):
+            changes.append((polygon_index, obj.id, None, None))
+    
+    log_rows = [
+        {'kind': 'point' if isinstance(obj, ReferencePoint) else 'polygon', 'item_id': obj.id, 'action': action}
+        for objects, action in ((session.new, 'created'), (session.dirty, 'updated'), (session.deleted, 'deleted'))
+        for obj in objects if isinstance(obj, (ReferencePoint, SurveyPolygon))
+    ]
+    note_own_changes(session, log_changes(session.connection(), log_rows))
+
+def log_changes(connection, rows):
+    """Append change log rows in the current transaction and trim the log to CHANGE_LOG_MAX_ENTRIES
+    
+    Returns the (first, last) versions given to the rows, or None if there were none.
+    SQLite holds the write lock for the whole insert, so the versions are consecutive.
+    """
+    if not rows:
+        return None
+    table = DatasetChange.__table__
+    connection.execute(table.insert(), rows)
+    newest = connection.execute(sa.select(sa.func.max(table.c.version))).scalar()
+    connection.execute(table.delete().where(table.c.version <= newest - app.config['CHANGE_LOG_MAX_ENTRIES']))
+    return newest - len(rows) + 1, newest
+
+def record_changes(kind, action, item_ids):
+    """Log a Core bulk write, which the session flush events do not see"""
+    rows = [{'kind': kind, 'item_id': item_id, 'action': action} for item_id in item_ids]
+    note_own_changes(db.session, log_changes(db.session.connection(), rows))
+
+def note_own_changes(session, versions):
+    """Remember versions logged in this transaction; once committed, sync_dataset_changes skips them"""
+    if versions is not None:
+        session.info.setdefault('change_versions', []).append(versions)
+
+def current_dataset_version():
+    """The persisted dataset version, shared by every process using the database"""
+    return db.session.execute(sa.select(sa.func.max(DatasetChange.version))).scalar() or 0
+
+def dataset_conditional(view):
+    """Serve a GET view with a strong ETag built from the dataset version and the request URL
+    
+    A matching If-None-Match gets 304 without running the view. The version is
+    read before the body is built, so a concurrent write can leave the ETag
+    older than the body but never newer.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # The version the caches were synced to, so a body from them is never older than its ETag
+        version = g.synced_dataset_version if 'synced_dataset_version' in g else current_dataset_version()
+        etag = f'{version}-{zlib.crc32(request.full_path.encode()):08x}'
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        # Let browsers keep the body but revalidate it on every use
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+# Dataset version: bumped on every committed point or polygon write seen by this process.
+# Caches are keyed on it; sync_dataset_changes brings in writes made by other processes.
+dataset_version = 0
+dataset_version_lock = threading.Lock()
+dataset_change_listeners = []
+synced_change_version = None  # newest dataset_change version reflected in this process's caches
+own_change_versions = []  # (first, last) versions committed by this process and not yet synced
+dataset_sync_lock = threading.Lock()
+
+def on_dataset_change(listener):
+    """Register listener(point_ids, polygon_ids) to run after point or polygon writes"""
+    dataset_change_listeners.append(listener)
+    return listener
+
+def notify_dataset_changed(point_ids=(), polygon_ids=()):
+    """Bump the dataset version and tell listeners which rows changed
+    
+    Called automatically for ORM commits; bulk SQL writes must call it themselves.
+    Passing ``None`` for either argument means every row of that kind may have changed.
+    """
+    global dataset_version
+    with dataset_version_lock:
+        dataset_version += 1
+    for listener in dataset_change_listeners:
+        listener(point_ids, polygon_ids)
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_spatial_changes(session):
+    changes = session.info.pop('spatial_changes', [])
+    if not changes:
+        return
+    
+    point_ids, polygon_ids = set(), set()
+    for index, item_id, geometry, category in changes:
+        (point_ids if index is point_index else polygon_ids).add(item_id)
+        if geometry is None:
+            index.remove(item_id)
+        elif not index.built:
+            continue
+        elif index is point_index:
+            index.upsert(item_id, Point(*geometry), category)
+        else:
+            index.upsert(item_id, polygon_geometry(unpack_vertices(geometry)), category)
+    notify_dataset_changed(point_ids, polygon_ids)
+
+@event.listens_for(db.session, 'after_commit')
+def _remember_own_changes(session):
+    versions = session.info.pop('change_versions', [])
+    if versions:
+        with dataset_version_lock:
+            own_change_versions.extend(versions)
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_spatial_changes(session):
+    session.info.pop('spatial_changes', None)
+    session.info.pop('change_versions', None)
+
+def sync_dataset_changes():
+    """Apply point and polygon writes committed by other processes to this process's indexes and caches
+    
+    Each worker process keeps its own spatial indexes and caches, so before
+    serving a request it compares the stored dataset version with the one they
+    reflect. Rows other processes changed in between are reloaded into the
+    indexes and passed to the change listeners. If the change log has been
+    trimmed past that point, the indexes are rebuilt and every cached row is dropped.
+    Returns the stored version the caches now reflect.
+    """
+    global synced_change_version
+    newest = current_dataset_version()
+    if newest == synced_change_version:
+        return newest
+    with dataset_sync_lock:
+        since = synced_change_version
+        if since is None:
+            # First request in this process: nothing has been cached yet
+            synced_change_version = newest
+            return newest
+        if newest <= since:
+            return since if newest == since else reset_dataset_caches(newest)
+        entries = db.session.execute(
+            sa.select(DatasetChange.version, DatasetChange.kind, DatasetChange.item_id)
+            .where(DatasetChange.version > since, DatasetChange.version <= newest)
+            .order_by(DatasetChange.version)
+        ).all()
+        with dataset_version_lock:
+            own = [(first, last) for first, last in own_change_versions if last > since]
+            own_change_versions[:] = [(first, last) for first, last in own if last > newest]
+        if not entries or entries[0][0] != since + 1:
+            return reset_dataset_caches(newest)
+        
+        foreign = [(kind, item_id) for version, kind, item_id in entries
+                   if not any(first <= version <= last for first, last in own)]
+        if foreign:
+            point_ids = sorted({item_id for kind, item_id in foreign if kind == 'point'})
+            polygon_ids = sorted({item_id for kind, item_id in foreign if kind == 'polygon'})
+            point_index.refresh(point_ids)
+            polygon_index.refresh(polygon_ids)
+            notify_dataset_changed(point_ids, polygon_ids)
+        synced_change_version = newest
+        return newest
+
+def reset_dataset_caches(version):
+    """Drop every cached row after the change log lost track of what changed; call with dataset_sync_lock held"""
+    global synced_change_version
+    point_index.invalidate()
+    polygon_index.invalidate()
+    notify_dataset_changed(None, None)
+    synced_change_version = version
+    return version
+
+def parse_bbox(value):
+    """Parse a minLon,minLat,maxLon,maxLat string; minLon > maxLon means the box crosses the antimeridian"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError('bbox must be minLon,minLat,maxLon,maxLat')
+    if min_lat > max_lat:
+        raise ValueError('bbox minLat must not exceed maxLat')
+    if min_lon > max_lon:
+        max_lon += 360
+    return min_lon, min_lat, max_lon, max_lat
+
+WEB_MERCATOR_METRES_PER_PIXEL = 156543.03392804097  # 256 px tiles at zoom 0, at the equator
+
+def parse_lod_tolerance(args=None):
+    """Read ?tolerance= (metres) or ?zoom= into a simplification tolerance; None means full resolution"""
+    args = request.args if args is None else args
+    if args.get('tolerance') not in (None, ''):
+        tolerance_m = float(args['tolerance'])
+        if not tolerance_m >= 0:
+            raise ValueError('tolerance must be a non-negative number of metres')
+        return tolerance_m
+    if args.get('zoom') not in (None, ''):
+        zoom = int(args['zoom'])
+        if not 0 <= zoom <= 30:
+            raise ValueError('zoom must be between 0 and 30')
+        # Half a screen pixel at that zoom is invisible
+        return WEB_MERCATOR_METRES_PER_PIXEL / 2 ** zoom / 2
+    return None
+
+def parse_geojson_geometry(value):
+    """Parse a GeoJSON geometry or Feature string into a shapely geometry"""
+    data = json.loads(value)
+    if data.get('type') == 'Feature':
+        data = data['geometry']
+    return shape(data)
+
+def rtree_bbox_ids(rtree, boxes):
+    """Select IDs whose R*Tree bounding box overlaps any of the lon/lat boxes"""
+    return sa.select(rtree.c.id).where(sa.or_(*[
+        sa.and_(rtree.c.max_lon >= min_lon, rtree.c.min_lon <= max_lon,
+                rtree.c.max_lat >= min_lat, rtree.c.min_lat <= max_lat)
+        for min_lon, min_lat, max_lon, max_lat in boxes
+    ]))
+
+def spatial_filter(model, index, rtree):
+    """Translate ?bbox= or ?intersects= into a SQL condition or a sorted ID array
+    
+    Returns (condition, ids); both are None when no spatial filter is given.
+    With the SQLite R*Tree enabled, bbox filters become a SQL condition (polygons
+    match on bounding-box overlap); otherwise the in-memory index supplies IDs.
+    """
+    if request.args.get('bbox'):
+        bounds = parse_bbox(request.args['bbox'])
+        if not rtree_enabled:
+            return None, index.query_bbox(*bounds)
+        
+        boxes = split_antimeridian_bbox(*bounds)
+        condition = model.id.in_(rtree_bbox_ids(rtree, boxes))
+        if model is ReferencePoint:
+            # R*Tree stores 32-bit floats rounded outwards; recheck the exact columns
+            condition = sa.and_(condition, sa.or_(*[
+                sa.and_(model.longitude.between(min_lon, max_lon), model.latitude.between(min_lat, max_lat))
+                for min_lon, min_lat, max_lon, max_lat in boxes
+            ]))
+        return condition, None
+    if request.args.get('intersects'):
+        return None, index.query(parse_geojson_geometry(request.args['intersects']))
+    return None, None
+
+def iter_row_batches(model, columns, condition=None, ids=None, after_id=None, limit=None, batch_size=1000):
+    """Yield batches of column rows ordered by ID, straight from a server-side cursor
+    
+    An ID array from the in-memory index is walked in chunks instead, so the IN
+    list never exceeds SQLite's bound parameter limit; ``condition`` still applies.
+    """
+    if ids is not None:
+        if after_id is not None:
+            ids = ids[ids > after_id]
+        for start in range(0, len(ids), 500):
+            statement = sa.select(*columns).where(model.id.in_(ids[start:start + 500].tolist())).order_by(model.id)
+            if condition is not None:
+                statement = statement.where(condition)
+            rows = db.session.execute(statement).all()
+            if limit is not None:
+                rows = rows[:limit]
+                limit -= len(rows)
+            if rows:
+                yield rows
+            if limit == 0:
+                return
+        return
+    
+    statement = sa.select(*columns).order_by(model.id)
+    if condition is not None:
+        statement = statement.where(condition)
+    if after_id is not None:
+        statement = statement.where(model.id > after_id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+def point_row_to_dict(row):
+    return row._asdict()
+
+def point_row_to_json(row):
+    return json.dumps(row._asdict())
+
+def polygon_row_to_dict(row):
+    data = row._asdict()
+    data['coordinates'] = unpack_vertices(data.pop('vertices')).tolist()
+    data['bbox'] = [data.pop('min_lon'), data.pop('min_lat'), data.pop('max_lon'), data.pop('max_lat')]
+    data['created_at'] = data['created_at'].isoformat() if data['created_at'] else None
+    return data
+
+def polygon_row_to_json(row):
+    data = row._asdict()
+    coordinates = vertices_json(data.pop('vertices'))
+    data['bbox'] = [data.pop('min_lon'), data.pop('min_lat'), data.pop('max_lon'), data.pop('max_lat')]
+    data['created_at'] = data['created_at'].isoformat() if data['created_at'] else None
+    # Coordinates go from the packed buffer straight into the text, after the other fields
+    return json.dumps(data)[:-1] + ', "coordinates": ' + coordinates + '}'
+
+def list_response(model, index, rtree, columns, row_to_dict, row_to_json):
+    """Serve a list endpoint as a full array, a keyset-paginated page or an NDJSON stream
+    
+    ``?after_id=&limit=`` returns {"items", "next_after_id", "limit"}; ``?format=ndjson``
+    streams one JSON object per line. Spatial filters apply to every mode.
+    """
+    try:
+        condition, ids = spatial_filter(model, index, rtree)
+    except Exception as e:
+        return jsonify({'error': f'Invalid spatial filter: {str(e)}'}), 400
+    if model is ReferencePoint:
+        try:
+            condition = and_present(condition, utm_zone_filter())
+        except ValueError as e:
+            return jsonify({'error': f'Invalid filter: {str(e)}'}), 400
+    
+    try:
+        after_id = int(request.args['after_id']) if request.args.get('after_id') else None
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+        if limit is not None and limit < 1:
+            raise ValueError('limit must be at least 1')
+    except ValueError as e:
+        return jsonify({'error': f'Invalid pagination: {str(e)}'}), 400
+    paginated = after_id is not None or limit is not None
+    if paginated:
+        limit = min(limit or app.config['LIST_PAGE_DEFAULT_LIMIT'], app.config['LIST_PAGE_MAX_LIMIT'])
+    
+    if request.args.get('format') == 'ndjson':
+        def generate():
+            for rows in iter_row_batches(model, columns, condition, ids, after_id, limit):
+                yield ''.join(row_to_json(row) + '\n' for row in rows)
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    items = [row_to_dict(row) for rows in iter_row_batches(model, columns, condition, ids, after_id, limit) for row in rows]
+    if not paginated:
+        return jsonify(items)
+    return jsonify({
+        'items': items,
+        'next_after_id': items[-1]['id'] if len(items) == limit else None,
+        'limit': limit
+    })
+
+# Instrumentation
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SQL_STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+class Metrics:
+    """Process-wide counters, gauges and histograms rendered in the Prometheus text format
+    
+    Families are declared once with describe(); samples are keyed by their label
+    values. Histogram buckets are cumulative on output, as Prometheus expects.
+    """
+    
+    def __init__(self):
+        self._families = OrderedDict()
+        self._samples = {}
+        self._lock = threading.Lock()
+    
+    def describe(self, name, kind, help_text, buckets=None):
+        self._families[name] = (kind, help_text, buckets)
+        self._samples[name] = {}
+    
+    def inc(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            samples = self._samples[name]
+            samples[key] = samples.get(key, 0) + value
+    
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._samples[name][tuple(sorted(labels.items()))] = value
+    
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        buckets = self._families[name][2]
+        with self._lock:
+            samples = self._samples[name]
+            if key not in samples:
+                samples[key] = [[0] * (len(buckets) + 1), 0.0]
+            counts, _ = samples[key]
+            counts[bisect.bisect_left(buckets, value)] += 1
+            samples[key][1] += value
+    
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in self._families.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for key, value in sorted(self._samples[name].items()):
+                    if kind != 'histogram':
+                        lines.append(f'{name}{format_labels(key)} {value}')
+                        continue
+                    counts, total = value
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{format_labels(key + (("le", bound),))} {cumulative}')
+                    lines.append(f'{name}_sum{format_labels(key)} {total}')
+                    lines.append(f'{name}_count{format_labels(key)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+def format_labels(pairs):
+    """Prometheus label set, e.g. {method="GET",status="200"}"""
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+metrics = Metrics()
+metrics.describe('topography_http_requests_total', 'counter', 'HTTP requests by endpoint, method and status')
+metrics.describe('topography_http_request_duration_seconds', 'histogram',
+                 'Request latency by endpoint, including streamed response bodies', LATENCY_BUCKETS)
+metrics.describe('topography_request_sql_statements', 'histogram', 'SQL statements executed per request',
+                 SQL_STATEMENT_BUCKETS)
+metrics.describe('topography_sql_statements_total', 'counter',
+                 'SQL statements by endpoint; background for import, export and CLI work')
+metrics.describe('topography_sql_seconds_total', 'counter', 'Time spent executing SQL statements by endpoint')
+metrics.describe('topography_cache_hits_total', 'counter', 'Cache hits by cache')
+metrics.describe('topography_cache_misses_total', 'counter', 'Cache misses by cache')
+metrics.describe('topography_cache_entries', 'gauge', 'Entries currently held by each cache')
+metrics.describe('topography_imports_total', 'counter', 'Finished imports by format and status')
+metrics.describe('topography_import_rows_total', 'counter', 'Import input rows by format and outcome')
+metrics.describe('topography_import_seconds_total', 'counter', 'Time spent running imports by format')
+metrics.describe('topography_exports_total', 'counter', 'Exports built by format and status; cached artifacts excluded')
+metrics.describe('topography_export_rows_total', 'counter', 'Points and polygons written by exports by format')
+metrics.describe('topography_export_seconds_total', 'counter', 'Time spent building exports by format')
+metrics.describe('topography_dataset_version', 'gauge', 'Dataset version seen by this process')
+metrics.describe('topography_profiles_written_total', 'counter', 'Slow request profiles written by the sampling profiler')
+
+def observe_import(job):
+    """Record a finished import's rows and duration"""
+    metrics.inc('topography_imports_total', format=job.format, status=job.status)
+    for outcome, count in (('imported', job.imported_points + job.imported_polygons),
+                           ('failed', job.failed), ('skipped', job.skipped)):
+        metrics.inc('topography_import_rows_total', count, format=job.format, outcome=outcome)
+    metrics.inc('topography_import_seconds_total', job.finished_at - (job.started_at or job.created_at), format=job.format)
+
+def observe_export(export_format, status, rows, seconds):
+    metrics.inc('topography_exports_total', format=export_format, status=status)
+    metrics.inc('topography_export_rows_total', rows, format=export_format)
+    metrics.inc('topography_export_seconds_total', seconds, format=export_format)
+
+def observe_export_batches(export_format, batches, size=len):
+    """Pass batches through to a streamed export, recording its rows and duration when it ends"""
+    started = time.perf_counter()
+    rows = 0
+    status = 'failed'
+    try:
+        for batch in batches:
+            rows += size(batch)
+            yield batch
+        status = 'completed'
+    except GeneratorExit:
+        # The client went away before the end of the stream
+        status = 'aborted'
+        raise
+    finally:
+        observe_export(export_format, status, rows, time.perf_counter() - started)
+
+@event.listens_for(sa.engine.Engine, 'before_cursor_execute')
+def _start_sql_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info['sql_started'] = time.perf_counter()
+
+@event.listens_for(sa.engine.Engine, 'after_cursor_execute')
+def _record_sql_statement(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop('sql_started', time.perf_counter())
+    if has_request_context() and 'sql_statements' in g:
+        # Summed per request and recorded once in teardown, keeping the lock off the query path
+        g.sql_statements += 1
+        g.sql_seconds += elapsed
+    else:
+        metrics.inc('topography_sql_statements_total', endpoint='background')
+        metrics.inc('topography_sql_seconds_total', elapsed, endpoint='background')
+
+class SlowRequestProfiler:
+    """Samples the stacks of in-flight requests and keeps those of slow ones
+    
+    While PROFILER_ENABLED is set, a daemon thread reads the Python stack of each
+    request thread every PROFILER_SAMPLE_INTERVAL seconds. When a request takes
+    longer than PROFILER_SLOW_REQUEST_SECONDS its samples are written to
+    PROFILER_DIR in the folded-stack format read by flamegraph.pl and speedscope;
+    only the newest PROFILER_MAX_PROFILES files are kept.
+    """
+    
+    def __init__(self):
+        self.profiles_written = 0
+        self._requests = {}
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def begin(self):
+        if not app.config['PROFILER_ENABLED']:
+            return
+        with self._lock:
+            self._requests[threading.get_ident()] = Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample, name='request-profiler', daemon=True)
+                self._thread.start()
+    
+    def end(self, endpoint, method, seconds):
+        """Stop sampling this thread's request; return the profile path if one was written"""
+        with self._lock:
+            samples = self._requests.pop(threading.get_ident(), None)
+        if not samples or seconds < app.config['PROFILER_SLOW_REQUEST_SECONDS']:
+            return None
+        
+        directory = app.config['PROFILER_DIR']
+        os.makedirs(directory, exist_ok=True)
+        slug = ''.join(c if c.isalnum() else '_' for c in f'{method}{endpoint}').strip('_')
+        name = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}-{slug}-{seconds * 1000:.0f}ms.folded"
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            f.writelines(f'{stack} {count}\n' for stack, count in samples.most_common())
+        self.profiles_written += 1
+        metrics.inc('topography_profiles_written_total')
+        for old in self.profiles()[app.config['PROFILER_MAX_PROFILES']:]:
+            os.remove(os.path.join(directory, old['name']))
+        return path
+    
+    def profiles(self):
+        """Written profiles, newest first"""
+        directory = app.config['PROFILER_DIR']
+        if not os.path.isdir(directory):
+            return []
+        entries = [(entry.name, entry.stat()) for entry in os.scandir(directory) if entry.name.endswith('.folded')]
+        return [{'name': name, 'size_bytes': stat.st_size, 'created_at': datetime.utcfromtimestamp(stat.st_mtime).isoformat()}
+                for name, stat in sorted(entries, key=lambda entry: entry[1].st_mtime, reverse=True)]
+    
+    def _sample(self):
+        while app.config['PROFILER_ENABLED']:
+            time.sleep(app.config['PROFILER_SAMPLE_INTERVAL'])
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, samples in self._requests.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[folded_stack(frame)] += 1
+
+def folded_stack(frame):
+    """Semicolon-separated stack from the outermost call down to ``frame``"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+profiler = SlowRequestProfiler()
+
+@app.before_request
+def _start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.sql_statements = 0
+    g.sql_seconds = 0.0
+    profiler.begin()
+
+@app.after_request
+def _note_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+@app.teardown_request
+def _record_request_metrics(error=None):
+    # Runs once the response body has been sent, so streamed exports are timed in full
+    if 'request_started' not in g:
+        return
+    seconds = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    status = 500 if error is not None else g.get('response_status', 500)
+    metrics.inc('topography_http_requests_total', endpoint=endpoint, method=request.method, status=status)
+    metrics.observe('topography_http_request_duration_seconds', seconds, endpoint=endpoint, method=request.method)
+    metrics.observe('topography_request_sql_statements', g.sql_statements, endpoint=endpoint)
+    metrics.inc('topography_sql_statements_total', g.sql_statements, endpoint=endpoint)
+    metrics.inc('topography_sql_seconds_total', g.sql_seconds, endpoint=endpoint)
+    profiler.end(endpoint, request.method, seconds)
+
+@app.before_request
+def _sync_dataset_changes():
+    # Registered after the metrics hooks, so its query counts against the request
+    g.synced_dataset_version = sync_dataset_changes()
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/map')
-def show_map():
-    # Get all reference points and polygons
-    points = ReferencePoint.query.all()
-    polygons = SurveyPolygon.query.all()
-    
-    # Create folium map centered on first point or default location
-    if points:
-        center_lat = sum(p.latitude for p in points) / len(points)
-        center_lon = sum(p.longitude for p in points) / len(points)
-    else:
-        center_lat, center_lon = 40.7128, -74.0060  # Default to NYC
+# Map rendering
+MAP_FEATURES_PLACEHOLDER = '/*__SURVEY_FEATURES__*/'
+DEFAULT_MAP_CENTER = (40.7128, -74.0060)  # NYC
+
+def js_value(value):
+    """Encode a value as a JavaScript literal that is safe inside a <script> block"""
+    return json.dumps(value).replace('</', '<\\/')
+
+def build_base_map():
+    """Build the Folium map shell (tile layers and tools) without any survey features
+    
+    Features are injected as plain Leaflet calls at the placeholder so the shell
+    can be rendered once and reused for every dataset version.
+    """
+    import folium
+    from folium import plugins
+    from folium.elements import JSCSSMixin
+    from jinja2 import Template
+    
+    class SurveyFeatures(JSCSSMixin, folium.MacroElement):
+        """Placeholder for the survey feature script; also loads the clustering and vector tile assets"""
+        
+        _template = Template('{% macro script(this, kwargs) %}' + MAP_FEATURES_PLACEHOLDER + '{% endmacro %}')
+        default_js = plugins.MarkerCluster.default_js + [
+            ('leaflet_vectorgrid', 'https://unpkg.com/leaflet.vectorgrid@1.3.0/dist/Leaflet.VectorGrid.bundled.js')
+        ]
+        default_css = plugins.MarkerCluster.default_css
+        
+        def __init__(self):
+            super().__init__()
+            self._name = 'SurveyFeatures'
     
     m = folium.Map(
-        location=[center_lat, center_lon],
+        location=list(DEFAULT_MAP_CENTER),
         zoom_start=12,
         tiles='OpenStreetMap'
     )
@@ -242,56 +1955,6 @@ def show_map():
         control=True
     ).add_to(m)
     
-    # Add reference points to map
-    for point in points:
-        popup_text = f"""
-        <b>{point.name}</b><br>
-        {point.description or 'No description'}<br>
-        Lat: {point.latitude:.6f}<br>
-        Lon: {point.longitude:.6f}<br>
-        Elevation: {point.elevation or 'N/A'} m<br>
-        UTM: {lat_lon_to_utm(point.latitude, point.longitude)}
-        """
-        
-        folium.Marker(
-            [point.latitude, point.longitude],
-            popup=folium.Popup(popup_text, max_width=300),
-            tooltip=point.name,
-            icon=folium.Icon(color='blue', icon='info-sign')
-        ).add_to(m)
-    
-    # Add polygons to map
-    for polygon in polygons:
-        coords = json.loads(polygon.coordinates)
-        popup_text = f"""
-        <b>{polygon.name}</b><br>
-        {polygon.description or 'No description'}<br>
-        Area: {polygon.area_sqm:.2f} m²<br>
-        Perimeter: {polygon.perimeter_m:.2f} m<br>
-        Vertices: {len(coords)}
-        """
-        
-        folium.Polygon(
-            locations=coords,
-            popup=folium.Popup(popup_text, max_width=300),
-            tooltip=polygon.name,
-            color='red',
-            weight=2,
-            fillColor='red',
-            fillOpacity=0.2
-        ).add_to(m)
-        
-        # Add vertex markers
-        for i, coord in enumerate(coords):
-            folium.CircleMarker(
-                coord,
-                radius=3,
-                popup=f"Vertex {i+1}: {coord[0]:.6f}, {coord[1]:.6f}",
-                color='red',
-                fillColor='red',
-                fillOpacity=0.8
-            ).add_to(m)
-    
     # Add drawing tools
     draw = plugins.Draw(
         export=True,
@@ -312,21 +1975,546 @@ def show_map():
     # Add measurement tools
     plugins.MeasureControl().add_to(m)
     
-    # Add coordinate grid
-    # Note: Folium doesn't have built-in coordinate grid, so we'll add it via JavaScript
-    
     # Add layer control
     folium.LayerControl().add_to(m)
     
-    # Convert map to HTML
-    map_html = m._repr_html_()
+    # Survey features are spliced in here after the map and its controls exist
+    SurveyFeatures().add_to(m)
+    return m
+
+def point_map_fragment(map_name, point, utm_label):
+    """Leaflet JS for one reference point marker"""
+    popup_text = f"""
+        <b>{point.name}</b><br>
+        {point.description or 'No description'}<br>
+        Lat: {point.latitude:.6f}<br>
+        Lon: {point.longitude:.6f}<br>
+        Elevation: {point.elevation or 'N/A'} m<br>
+        UTM: {utm_label}
+        """
+    return (
+        f"L.marker({js_value([point.latitude, point.longitude])}, {{icon: L.AwesomeMarkers.icon("
+        f"{{icon: 'info-sign', iconColor: 'white', markerColor: 'blue', prefix: 'glyphicon', extraClasses: 'fa-rotate-0'}})}})"
+        f".bindPopup({js_value(popup_text)}, {{maxWidth: 300}})"
+        f".bindTooltip({js_value(point.name)}, {{sticky: true}}).addTo({map_name});\n"
+    )
+
+def polygon_map_fragment(map_name, polygon, coordinates):
+    """Leaflet JS for one survey polygon and its vertex markers, drawn from the given [lat, lon] ring"""
+    coords = coordinates.tolist()
+    popup_text = f"""
+        <b>{polygon.name}</b><br>
+        {polygon.description or 'No description'}<br>
+        Area: {polygon.area_sqm:.2f} m²<br>
+        Perimeter: {polygon.perimeter_m:.2f} m<br>
+        Vertices: {polygon.vertex_count}
+        """
+    return (
+        f"(function (coords) {{"
+        f"L.polygon(coords, {{color: 'red', weight: 2, fill: true, fillColor: 'red', fillOpacity: 0.2}})"
+        f".bindPopup({js_value(popup_text)}, {{maxWidth: 300}})"
+        f".bindTooltip({js_value(polygon.name)}, {{sticky: true}}).addTo({map_name});"
+        f"coords.forEach(function (c, i) {{"
+        f"L.circleMarker(c, {{radius: 3, color: 'red', fillColor: 'red', fillOpacity: 0.8}})"
+        f".bindPopup('Vertex ' + (i + 1) + ': ' + c[0].toFixed(6) + ', ' + c[1].toFixed(6)).addTo({map_name});"
+        f"}});}})({js_value(coords)});\n"
+    )
+
+def point_cluster_row(point, utm_label):
+    """Compact [lat, lon, name, description, elevation, utm] row for the clustered point layer"""
+    return js_value([point.latitude, point.longitude, point.name, point.description or '', point.elevation, utm_label])
+
+def polygon_geojson_feature(polygon, coordinates):
+    """Compact GeoJSON feature for the polygon layer, flagged for vertex markers if small enough"""
+    ring = np.round(coordinates[:, ::-1], 7).tolist()
+    return js_value({
+        'type': 'Feature',
+        'id': polygon.id,
+        'properties': {
+            'name': polygon.name,
+            'description': polygon.description or '',
+            'area_sqm': polygon.area_sqm,
+            'perimeter_m': polygon.perimeter_m,
+            'vertex_count': polygon.vertex_count,
+            'vertex_markers': len(ring) <= app.config['MAP_VERTEX_MARKER_MAX_VERTICES']
+        },
+        'geometry': {'type': 'Polygon', 'coordinates': [ring]}
+    })
+
+LARGE_MAP_PREFIX = "(function (map) {\nvar pointRows = ["
+
+LARGE_MAP_MIDDLE = """];
+var cluster = L.markerClusterGroup({chunkedLoading: true});
+pointRows.forEach(function (r) {
+    var popup = '<b>' + r[2] + '</b><br>' + (r[3] || 'No description') + '<br>Lat: ' + r[0].toFixed(6) +
+        '<br>Lon: ' + r[1].toFixed(6) + '<br>Elevation: ' + (r[4] === null ? 'N/A' : r[4]) + ' m<br>UTM: ' + r[5];
+    cluster.addLayer(L.marker([r[0], r[1]]).bindPopup(popup, {maxWidth: 300}).bindTooltip(r[2], {sticky: true}));
+});
+map.addLayer(cluster);
+var polygonFeatures = ["""
+
+LARGE_MAP_SUFFIX = """];
+L.geoJSON({type: 'FeatureCollection', features: polygonFeatures}, {
+    style: function () { return {color: 'red', weight: 2, fillColor: 'red', fillOpacity: 0.2}; },
+    onEachFeature: function (feature, layer) {
+        var p = feature.properties;
+        layer.bindPopup('<b>' + p.name + '</b><br>' + (p.description || 'No description') +
+            '<br>Area: ' + (p.area_sqm || 0).toFixed(2) + ' m²<br>Perimeter: ' + (p.perimeter_m || 0).toFixed(2) +
+            ' m<br>Vertices: ' + p.vertex_count, {maxWidth: 300});
+        layer.bindTooltip(p.name, {sticky: true});
+        if (p.vertex_markers) {
+            feature.geometry.coordinates[0].forEach(function (c, i) {
+                L.circleMarker([c[1], c[0]], {radius: 3, color: 'red', fillColor: 'red', fillOpacity: 0.8})
+                    .bindPopup('Vertex ' + (i + 1) + ': ' + c[1].toFixed(6) + ', ' + c[0].toFixed(6)).addTo(map);
+            });
+        }
+    }
+}).addTo(map);
+})(%s);
+"""
+
+TILES_MAP_SCRIPT = """(function (map) {
+L.vectorGrid.protobuf('/tiles/{z}/{x}/{y}.mvt', {
+    maxNativeZoom: %d,
+    interactive: true,
+    getFeatureId: function (f) { return f.properties.kind + f.properties.id; },
+    vectorTileLayerStyles: {
+        reference_points: {radius: 5, weight: 1, color: 'blue', fill: true, fillColor: 'blue', fillOpacity: 0.8},
+        survey_polygons: {weight: 2, color: 'red', fill: true, fillColor: 'red', fillOpacity: 0.2}
+    }
+}).on('click', function (e) {
+    var p = e.layer.properties;
+    var details = p.kind === 'point'
+        ? 'Type: ' + p.point_type + '<br>Elevation: ' + (p.elevation === undefined ? 'N/A' : p.elevation) + ' m'
+        : 'Area: ' + (p.area_sqm || 0).toFixed(2) + ' m²<br>Perimeter: ' + (p.perimeter_m || 0).toFixed(2) + ' m';
+    L.popup({maxWidth: 300}).setLatLng(e.latlng)
+        .setContent('<b>' + p.name + '</b><br>' + (p.description || 'No description') + '<br>' + details)
+        .openOn(map);
+}).addTo(map);
+})(%s);
+"""
+
+MAP_MODES = ('detailed', 'large', 'tiles')
+
+class MapRenderCache:
+    """Caches the rendered /map iframe per dataset version plus per-feature JS fragments
+    
+    Fragments are stored HTML-escaped, ready to be spliced into the iframe's
+    srcdoc, and are dropped individually when their row changes, so a single
+    edit only re-renders the features it touched. Pages and fragments are kept
+    per rendering mode: 'detailed' emits one Leaflet object per feature and
+    vertex, 'large' ships a clustered point array and one compact GeoJSON layer.
+    Polygon fragments are also keyed by the simplification level they were drawn at.
+    """
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.fragments_rendered = 0
+        self._lock = threading.Lock()
+        self._shell = None
+        self._pages = {}
+        self._auto_mode = (None, None)
+        self._fragments = {}
+        self._epoch = 0
+    
+    def invalidate(self, point_ids, polygon_ids):
+        with self._lock:
+            self._epoch += 1
+            kinds = {kind for kind, ids in (('point', point_ids), ('polygon', polygon_ids)) if ids is None}
+            changed = {('point', point_id) for point_id in point_ids or ()}
+            changed |= {('polygon', polygon_id) for polygon_id in polygon_ids or ()}
+            # Keys are (mode, kind, id) for points and (mode, kind, id, tolerance) for polygons
+            self._fragments = {
+                key: value for key, value in self._fragments.items()
+                if key[1] not in kinds and key[1:3] not in changed
+            }
+    
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._shell = None
+            self._pages = {}
+            self._fragments = {}
+    
+    def shell(self):
+        """Return (map variable name, escaped iframe HTML containing the features placeholder)"""
+        with self._lock:
+            if self._shell is None:
+                m = build_base_map()
+                self._shell = (m.get_name(), m._repr_html_())
+            return self._shell
+    
+    def choose_mode(self, requested=None):
+        """Use the requested mode, or pick 'large' once the dataset passes the configured sizes"""
+        if requested in MAP_MODES:
+            return requested
+        version = dataset_version
+        with self._lock:
+            if self._auto_mode[0] == version:
+                return self._auto_mode[1]
+        
+        point_count = db.session.query(sa.func.count(ReferencePoint.id)).scalar()
+        polygon_count, vertex_count = db.session.query(
+            sa.func.count(SurveyPolygon.id), sa.func.coalesce(sa.func.sum(SurveyPolygon.vertex_count), 0)
+        ).one()
+        large = (point_count + polygon_count > app.config['MAP_LARGE_DATASET_FEATURES']
+                 or vertex_count > app.config['MAP_LARGE_DATASET_VERTICES'])
+        mode = app.config['MAP_LARGE_DATASET_MODE'] if large else 'detailed'
+        with self._lock:
+            self._auto_mode = (version, mode)
+        return mode
+    
+    def render(self, mode='detailed', tolerance_m=None):
+        """Return the map iframe HTML; polygons are drawn at the stored level for tolerance_m"""
+        tolerance_m = lod_level(tolerance_m) if mode != 'tiles' else None
+        version = dataset_version
+        with self._lock:
+            cached_version, page = self._pages.get((mode, tolerance_m), (None, None))
+            if cached_version == version:
+                self.hits += 1
+                return page
+            self.misses += 1
+            epoch = self._epoch
+        
+        map_name, shell_html = self.shell()
+        parts = []
+        center = db.session.query(sa.func.avg(ReferencePoint.latitude), sa.func.avg(ReferencePoint.longitude)).one()
+        if center[0] is not None:
+            parts.append(escape_html(f"{map_name}.setView({js_value(list(center))}, 12);\n"))
+        
+        if mode == 'tiles':
+            # Features are fetched per visible tile, so the page does not grow with the dataset
+            parts.append(escape_html(TILES_MAP_SCRIPT % (app.config['TILE_MAX_ZOOM'], map_name)))
+        else:
+            point_fragments, polygon_fragments = self._render_fragments(map_name, epoch, mode, tolerance_m)
+        if mode == 'large':
+            parts += [escape_html(LARGE_MAP_PREFIX), escape_html(',').join(point_fragments),
+                      escape_html(LARGE_MAP_MIDDLE), escape_html(',').join(polygon_fragments),
+                      escape_html(LARGE_MAP_SUFFIX % map_name)]
+        elif mode == 'detailed':
+            parts += point_fragments + polygon_fragments
+        
+        page = shell_html.replace(MAP_FEATURES_PLACEHOLDER, ''.join(parts))
+        with self._lock:
+            if self._epoch == epoch:
+                self._pages[(mode, tolerance_m)] = (version, page)
+        return page
+    
+    def _render_fragments(self, map_name, epoch, mode, tolerance_m):
+        point_ids = [row[0] for row in db.session.query(ReferencePoint.id).order_by(ReferencePoint.id)]
+        polygon_ids = [row[0] for row in db.session.query(SurveyPolygon.id).order_by(SurveyPolygon.id)]
+        with self._lock:
+            cached = dict(self._fragments)
+        
+        rendered = {}
+        missing_points = [point_id for point_id in point_ids if (mode, 'point', point_id) not in cached]
+        for start in range(0, len(missing_points), 500):
+            for point in ReferencePoint.query.filter(ReferencePoint.id.in_(missing_points[start:start + 500])):
+                utm_label = stored_utm_label(point)
+                fragment = (point_cluster_row(point, utm_label) if mode == 'large'
+                            else point_map_fragment(map_name, point, utm_label))
+                rendered[(mode, 'point', point.id)] = escape_html(fragment)
+        
+        missing_polygons = [polygon_id for polygon_id in polygon_ids if (mode, 'polygon', polygon_id, tolerance_m) not in cached]
+        for start in range(0, len(missing_polygons), 500):
+            rows = db.session.query(SurveyPolygon, polygon_lod_vertices(tolerance_m)).options(
+                sa.orm.defer(SurveyPolygon.vertices)).filter(SurveyPolygon.id.in_(missing_polygons[start:start + 500]))
+            for polygon, vertices in rows:
+                coordinates = unpack_vertices(vertices)
+                fragment = (polygon_geojson_feature(polygon, coordinates) if mode == 'large'
+                            else polygon_map_fragment(map_name, polygon, coordinates))
+                rendered[(mode, 'polygon', polygon.id, tolerance_m)] = escape_html(fragment)
+        
+        with self._lock:
+            self.fragments_rendered += len(rendered)
+            # Rows changed while rendering must not be cached with stale content
+            if self._epoch == epoch:
+                self._fragments.update(rendered)
+        cached.update(rendered)
+        return ([cached[(mode, 'point', point_id)] for point_id in point_ids if (mode, 'point', point_id) in cached],
+                [cached[(mode, 'polygon', polygon_id, tolerance_m)] for polygon_id in polygon_ids
+                 if (mode, 'polygon', polygon_id, tolerance_m) in cached])
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'dataset_version': dataset_version,
+                'cached_pages': [
+                    {'mode': mode, 'tolerance_m': tolerance_m, 'dataset_version': page[0]}
+                    for (mode, tolerance_m), page in self._pages.items()
+                ],
+                'hits': self.hits,
+                'misses': self.misses,
+                'fragments_cached': len(self._fragments),
+                'fragments_rendered': self.fragments_rendered
+            }
+
+map_cache = MapRenderCache()
+on_dataset_change(map_cache.invalidate)
+
+# Vector tiles
+WEB_MERCATOR_EPSG = 3857
+WEB_MERCATOR_HALF_WORLD = 20037508.342789244
+WEB_MERCATOR_MAX_LAT = 85.0511287798066
+TILE_FORMATS = {'mvt': 'application/vnd.mapbox-vector-tile', 'geojson': 'application/geo+json'}
+
+def tile_mercator_bounds(z, x, y):
+    """Return (min_x, min_y, max_x, max_y) of an XYZ tile in Web Mercator metres"""
+    size = 2 * WEB_MERCATOR_HALF_WORLD / 2 ** z
+    min_x = -WEB_MERCATOR_HALF_WORLD + x * size
+    max_y = WEB_MERCATOR_HALF_WORLD - y * size
+    return min_x, max_y - size, min_x + size, max_y
+
+def mercator_to_lon_lat(xs, ys):
+    """Invert the spherical Web Mercator projection; longitudes may run past +/-180"""
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    return xs / WEB_MERCATOR_HALF_WORLD * 180, np.degrees(np.arctan(np.sinh(ys / WEB_MERCATOR_HALF_WORLD * np.pi)))
+
+def render_tile(z, x, y, tile_format):
+    """Render one tile from the spatial indexes
+    
+    Geometries are projected into tile coordinates (0..TILE_EXTENT, y down),
+    simplified by a fixed tolerance in those units, so detail follows the zoom
+    level, and clipped to the tile plus TILE_BUFFER. GeoJSON tiles carry the same
+    geometry converted back to lon/lat. Returns (payload, feature keys, lon/lat
+    boxes covered), the last two being what the tile cache invalidates on.
+    """
+    import mapbox_vector_tile
+    extent = app.config['TILE_EXTENT']
+    buffer = app.config['TILE_BUFFER']
+    min_x, min_y, max_x, max_y = tile_mercator_bounds(z, x, y)
+    scale = extent / (max_x - min_x)
+    margin = buffer / scale
+    lons, lats = mercator_to_lon_lat([min_x - margin, max_x + margin], [min_y - margin, max_y + margin])
+    query_bounds = (lons[0], lats[0], lons[1], lats[1])
+    query_geometry = bbox_geometry(*query_bounds)
+    transformer = transformer_registry.get(WGS84_EPSG, WEB_MERCATOR_EPSG)
     
-    return render_template('map.html', map_html=map_html, points=points, polygons=polygons)
+    def to_tile(coordinates):
+        xs, ys = transformer.transform(coordinates[:, 0], np.clip(coordinates[:, 1], -WEB_MERCATOR_MAX_LAT, WEB_MERCATOR_MAX_LAT))
+        return np.column_stack([(xs - min_x) * scale, (max_y - ys) * scale])
+    
+    def to_lon_lat(coordinates):
+        tile_lons, tile_lats = mercator_to_lon_lat(coordinates[:, 0] / scale + min_x, max_y - coordinates[:, 1] / scale)
+        return np.round(np.column_stack([tile_lons, tile_lats]), 7)
+    
+    def tile_geometries(index, simplify):
+        ids, geoms = index.query_entries(query_geometry)
+        if not len(ids):
+            return {}
+        geoms = shapely.transform(geoms, to_tile)
+        if simplify:
+            geoms = shapely.simplify(geoms, app.config['TILE_SIMPLIFY_TOLERANCE'])
+        geoms = shapely.clip_by_rect(geoms, -buffer, -buffer, extent + buffer, extent + buffer)
+        keep = ~shapely.is_empty(geoms)
+        return dict(zip(ids[keep].tolist(), geoms[keep]))
+    
+    point_geoms = tile_geometries(point_index, simplify=False)
+    polygon_geoms = tile_geometries(polygon_index, simplify=True)
+    
+    point_features, polygon_features = [], []
+    point_ids = list(point_geoms)
+    for start in range(0, len(point_ids), 500):
+        rows = db.session.query(ReferencePoint.id, ReferencePoint.name, ReferencePoint.description,
+                                ReferencePoint.elevation, ReferencePoint.point_type).filter(
+            ReferencePoint.id.in_(point_ids[start:start + 500]))
+        for row in rows:
+            properties = {'kind': 'point', **row._asdict()}
+            point_features.append((row.id, point_geoms[row.id], properties))
+    polygon_ids = list(polygon_geoms)
+    for start in range(0, len(polygon_ids), 500):
+        rows = db.session.query(SurveyPolygon.id, SurveyPolygon.name, SurveyPolygon.description, SurveyPolygon.polygon_type,
+                                SurveyPolygon.area_sqm, SurveyPolygon.perimeter_m).filter(
+            SurveyPolygon.id.in_(polygon_ids[start:start + 500]))
+        for row in rows:
+            properties = {'kind': 'polygon', **row._asdict()}
+            polygon_features.append((row.id, polygon_geoms[row.id], properties))
+    
+    features = {('point', item_id) for item_id, _, _ in point_features}
+    features |= {('polygon', item_id) for item_id, _, _ in polygon_features}
+    boxes = split_antimeridian_bbox(*query_bounds)
+    
+    def layer_features(rows):
+        for item_id, geometry, properties in rows:
+            properties = {key: value for key, value in properties.items() if value not in (None, '')}
+            # Repaired polygons can come back as collections; MVT needs one geometry type per feature
+            for part in shapely.get_parts(geometry) if geometry.geom_type == 'GeometryCollection' else [geometry]:
+                yield item_id, part, properties
+    
+    if tile_format == 'mvt':
+        layers = [
+            {'name': name, 'features': [
+                {'id': item_id, 'geometry': geometry, 'properties': properties}
+                for item_id, geometry, properties in layer_features(rows)
+            ]}
+            for name, rows in (('survey_polygons', polygon_features), ('reference_points', point_features))
+        ]
+        payload = mapbox_vector_tile.encode(
+            layers, default_options={'extents': extent, 'y_coord_down': True, 'quantize_bounds': None}
+        )
+        return payload, frozenset(features), boxes
+    
+    collection = {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'id': item_id, 'properties': properties,
+         'geometry': json.loads(shapely.to_geojson(shapely.transform(geometry, to_lon_lat)))}
+        for rows in (polygon_features, point_features)
+        for item_id, geometry, properties in layer_features(rows)
+    ]}
+    return json.dumps(collection), frozenset(features), boxes
+
+TileCacheEntry = namedtuple('TileCacheEntry', 'payload features boxes')
+
+class TileCache:
+    """LRU cache of rendered tiles that only drops the tiles a write touched
+    
+    Each entry remembers the features it contains and the lon/lat area it covers.
+    A write immediately drops the tiles that hold a changed row (its old
+    location); the tiles covering the row's new location are found on the next
+    lookup, when the committed row can be read back.
+    """
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._tiles = OrderedDict()
+        self._pending_points = set()
+        self._pending_polygons = set()
+        self._epoch = 0
+        self._lock = threading.Lock()
+    
+    def invalidate(self, point_ids, polygon_ids):
+        with self._lock:
+            self._epoch += 1
+            if point_ids is None or polygon_ids is None:
+                self.invalidations += len(self._tiles)
+                self._tiles.clear()
+                self._pending_points.clear()
+                self._pending_polygons.clear()
+                return
+            
+            changed = {('point', item_id) for item_id in point_ids} | {('polygon', item_id) for item_id in polygon_ids}
+            self._drop(key for key, entry in self._tiles.items() if not entry.features.isdisjoint(changed))
+            self._pending_points.update(point_ids)
+            self._pending_polygons.update(polygon_ids)
+    
+    def clear(self):
+        self.invalidate(None, None)
+    
+    def _drop(self, keys):
+        for key in list(keys):
+            del self._tiles[key]
+            self.invalidations += 1
+    
+    def _resolve_pending(self):
+        with self._lock:
+            point_ids, polygon_ids = list(self._pending_points), list(self._pending_polygons)
+        if not point_ids and not polygon_ids:
+            return
+        
+        boxes = []
+        for start in range(0, len(point_ids), 500):
+            boxes += [(lon, lat, lon, lat) for lon, lat in db.session.query(
+                ReferencePoint.longitude, ReferencePoint.latitude).filter(ReferencePoint.id.in_(point_ids[start:start + 500]))]
+        for start in range(0, len(polygon_ids), 500):
+            boxes += db.session.query(
+                SurveyPolygon.min_lon, SurveyPolygon.min_lat, SurveyPolygon.max_lon, SurveyPolygon.max_lat
+            ).filter(SurveyPolygon.id.in_(polygon_ids[start:start + 500]), SurveyPolygon.vertex_count > 0).all()
+        
+        with self._lock:
+            if boxes:
+                changed = np.array(boxes, dtype=float)
+                self._drop(key for key, entry in self._tiles.items() if any(
+                    np.any((changed[:, 0] <= max_lon) & (changed[:, 2] >= min_lon)
+                           & (changed[:, 1] <= max_lat) & (changed[:, 3] >= min_lat))
+                    for min_lon, min_lat, max_lon, max_lat in entry.boxes
+                ))
+            self._pending_points.difference_update(point_ids)
+            self._pending_polygons.difference_update(polygon_ids)
+    
+    def get(self, z, x, y, tile_format):
+        self._resolve_pending()
+        key = (z, x, y, tile_format)
+        with self._lock:
+            entry = self._tiles.get(key)
+            if entry is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return entry.payload
+            self.misses += 1
+            epoch = self._epoch
+        
+        payload, features, boxes = render_tile(z, x, y, tile_format)
+        with self._lock:
+            # A write during rendering may not be reflected; serve the tile but don't cache it
+            if self._epoch == epoch:
+                self._tiles[key] = TileCacheEntry(payload, features, boxes)
+                while len(self._tiles) > app.config['TILE_CACHE_MAX_TILES']:
+                    self._tiles.popitem(last=False)
+                    self.evictions += 1
+        return payload
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._tiles),
+                'maxsize': app.config['TILE_CACHE_MAX_TILES'],
+                'bytes': sum(len(entry.payload) for entry in self._tiles.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'pending_points': len(self._pending_points),
+                'pending_polygons': len(self._pending_polygons)
+            }
+
+tile_cache = TileCache()
+on_dataset_change(tile_cache.invalidate)
+
+@app.route('/map')
+def show_map():
+    mode = map_cache.choose_mode(request.args.get('mode'))
+    try:
+        tolerance_m = parse_lod_tolerance()
+    except ValueError as e:
+        return jsonify({'error': f'Invalid simplification level: {str(e)}'}), 400
+    if tolerance_m is None and mode == 'large':
+        tolerance_m = app.config['MAP_LARGE_POLYGON_TOLERANCE_M']
+    return render_template('map.html', map_html=map_cache.render(mode, tolerance_m))
+
+@app.route('/tiles/<int:z>/<int(signed=True):x>/<int:y>.<tile_format>')
+def vector_tile(z, x, y, tile_format):
+    """Serve a Mapbox Vector Tile (.mvt) or GeoJSON tile (.geojson) of points and polygons"""
+    if tile_format not in TILE_FORMATS:
+        return jsonify({'error': f'Unsupported tile format: {tile_format}'}), 404
+    if z > app.config['TILE_MAX_ZOOM'] or y >= 2 ** z:
+        return jsonify({'error': f'Tile {z}/{x}/{y} is out of range'}), 404
+    
+    try:
+        # Wrapped world copies share the same tiles
+        payload = tile_cache.get(z, x % 2 ** z, y, tile_format)
+        return Response(payload, mimetype=TILE_FORMATS[tile_format])
+    except Exception as e:
+        return jsonify({'error': f'Tile rendering failed: {str(e)}'}), 400
+
+def point_list_columns():
+    return [ReferencePoint.id, ReferencePoint.name, ReferencePoint.description, ReferencePoint.latitude,
+            ReferencePoint.longitude, ReferencePoint.elevation, ReferencePoint.point_type, *POINT_UTM_ATTRIBUTES]
+
+def polygon_list_columns(tolerance_m=None):
+    return [SurveyPolygon.id, SurveyPolygon.name, SurveyPolygon.description, *polygon_lod_columns(tolerance_m),
+            SurveyPolygon.min_lat, SurveyPolygon.min_lon, SurveyPolygon.max_lat,
+            SurveyPolygon.max_lon, SurveyPolygon.area_sqm, SurveyPolygon.perimeter_m, SurveyPolygon.created_at,
+            SurveyPolygon.polygon_type]
 
 @app.route('/api/points', methods=['GET'])
+@dataset_conditional
 def get_points():
-    points = ReferencePoint.query.all()
-    return jsonify([point.to_dict() for point in points])
+    return list_response(ReferencePoint, point_index, point_rtree, point_list_columns(), point_row_to_dict, point_row_to_json)
 
 @app.route('/api/points', methods=['POST'])
 def add_point():
@@ -346,6 +2534,30 @@ def add_point():
     
     return jsonify(point.to_dict()), 201
 
+@app.route('/api/points/nearest')
+def nearest_points():
+    """Return the k reference points nearest to a location by geodesic distance"""
+    try:
+        lat = float(request.args['lat'])
+        lon = float(request.args['lon'])
+        k = int(request.args.get('k', 5))
+        validate_lat_lon_arrays(np.array([lat]), np.array([lon]))
+        if k < 1:
+            raise ValueError('k must be at least 1')
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': f'Invalid query: {str(e)}'}), 400
+    
+    ids, distances = point_index.nearest(lat, lon, k, request.args.get('point_type'))
+    points = {point.id: point for point in ReferencePoint.query.filter(ReferencePoint.id.in_(ids.tolist()))}
+    
+    results = []
+    for point_id, distance in zip(ids.tolist(), distances.tolist()):
+        if point_id in points:
+            result = points[point_id].to_dict()
+            result['distance_meters'] = distance
+            results.append(result)
+    return jsonify(results)
+
 @app.route('/api/points/<int:point_id>', methods=['PUT'])
 def update_point(point_id):
     point = ReferencePoint.query.get_or_404(point_id)
@@ -401,6 +2613,59 @@ def calculate_distance():
         'point2': point2.to_dict()
     })
 
+@app.route('/api/calculate/distance_matrix', methods=['GET', 'POST'])
+def calculate_distance_matrix_api():
+    """Geodesic distance and elevation difference matrices for selected reference points
+    
+    Points are selected by ``point_ids`` (query string or JSON body) or by ``point_type``.
+    """
+    data = (request.get_json(silent=True) or {}) if request.method == 'POST' else {}
+    point_ids = request.args.getlist('point_ids') or data.get('point_ids') or []
+    point_type = request.args.get('point_type') or data.get('point_type')
+    
+    try:
+        point_ids = [int(point_id) for point_id in point_ids]
+    except (TypeError, ValueError):
+        return jsonify({'error': 'point_ids must be integers'}), 400
+    
+    max_points = app.config['DISTANCE_MATRIX_MAX_POINTS']
+    query = db.session.query(
+        ReferencePoint.id, ReferencePoint.latitude, ReferencePoint.longitude, ReferencePoint.elevation
+    )
+    if point_ids:
+        point_ids = list(dict.fromkeys(point_ids))
+        if len(point_ids) > max_points:
+            return jsonify({'error': f'Too many points: {len(point_ids)} (limit {max_points})'}), 400
+        rows_by_id = {row[0]: row for row in query.filter(ReferencePoint.id.in_(point_ids))}
+        missing = [point_id for point_id in point_ids if point_id not in rows_by_id]
+        if missing:
+            return jsonify({'error': f'Points not found: {missing}'}), 404
+        rows = [rows_by_id[point_id] for point_id in point_ids]
+    elif point_type:
+        rows = query.filter(ReferencePoint.point_type == point_type).order_by(ReferencePoint.id).limit(max_points + 1).all()
+        if len(rows) > max_points:
+            return jsonify({'error': f'Too many points (limit {max_points})'}), 400
+    else:
+        return jsonify({'error': 'Either point_ids or point_type is required'}), 400
+    
+    ids = [row[0] for row in rows]
+    lats = np.array([row[1] for row in rows], dtype=float)
+    lons = np.array([row[2] for row in rows], dtype=float)
+    elevations = np.array([np.nan if row[3] is None else row[3] for row in rows], dtype=float)
+    
+    distances = calculate_distance_matrix(lats, lons)
+    # elevation_difference[i][j] is the rise from point i to point j
+    elevation_diff = elevations[np.newaxis, :] - elevations[:, np.newaxis]
+    elevation_rows = elevation_diff.tolist()
+    if np.isnan(elevations).any():
+        elevation_rows = [[None if math.isnan(value) else value for value in row] for row in elevation_rows]
+    
+    return jsonify({
+        'point_ids': ids,
+        'distance_meters': np.round(distances, 3).tolist(),
+        'elevation_difference': elevation_rows
+    })
+
 @app.route('/api/calculate/area')
 def calculate_area():
     point_ids = request.args.getlist('point_ids')
@@ -453,6 +2718,121 @@ def calculate_point_from_distance_azimuth_api():
     except Exception as e:
         return jsonify({'error': f'Calculation failed: {str(e)}'}), 400
 
+def parse_traverse_legs(legs):
+    """Return (distances, azimuths) arrays from [{distance_m, azimuth_degrees}] or [[distance, azimuth]] legs"""
+    if not legs:
+        raise ValueError('At least one leg is required')
+    if isinstance(legs[0], dict):
+        return (np.array([leg['distance_m'] for leg in legs], dtype=float),
+                np.array([leg['azimuth_degrees'] for leg in legs], dtype=float))
+    table = np.asarray(legs, dtype=float).reshape(-1, 2)
+    return table[:, 0], table[:, 1]
+
+def save_traverse_results(data, vertex_groups):
+    """Persist traverse vertices as ReferencePoints or SurveyPolygons in one transaction"""
+    save_as = data.get('save_as')
+    name = data.get('name', 'Traverse')
+    saved = []
+    
+    if save_as == 'points':
+        point_type = data.get('point_type', 'survey_point')
+        for group_index, vertices in enumerate(vertex_groups):
+            prefix = name if len(vertex_groups) == 1 else f"{name} {group_index + 1}"
+            for vertex in vertices:
+                saved.append(ReferencePoint(
+                    name=f"{prefix}-{vertex['index']}",
+                    description=data.get('description', ''),
+                    latitude=vertex['latitude'],
+                    longitude=vertex['longitude'],
+                    point_type=point_type
+                ))
+    elif save_as == 'polygon':
+        for group_index, vertices in enumerate(vertex_groups):
+            coordinates = [[vertex['latitude'], vertex['longitude']] for vertex in vertices]
+            # A closed traverse ends on its start point; the ring is closed implicitly
+            if len(coordinates) > 3 and np.allclose(coordinates[0], coordinates[-1], rtol=0, atol=1e-7):
+                coordinates = coordinates[:-1]
+            if len(coordinates) < 3:
+                raise ValueError('At least 3 vertices are required to save a polygon')
+            area_sqm, perimeter_m = calculate_polygon_metrics(coordinates)
+            saved.append(SurveyPolygon(
+                name=name if len(vertex_groups) == 1 else f"{name} {group_index + 1}",
+                description=data.get('description', ''),
+                coordinates=coordinates,
+                area_sqm=area_sqm,
+                perimeter_m=perimeter_m,
+                polygon_type=data.get('polygon_type', 'survey_area')
+            ))
+    else:
+        raise ValueError("save_as must be 'points' or 'polygon'")
+    
+    try:
+        db.session.add_all(saved)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return [item.to_dict() for item in saved]
+
+@app.route('/api/calculate/traverse', methods=['POST'])
+def calculate_traverse_api():
+    """Calculate traverse vertices from chained or independent distance/azimuth legs
+    
+    Chained: {"start_lat", "start_lon", "legs": [...]} or {"traverses": [{...}, ...]}.
+    Independent: start_lat/start_lon/distance_m/azimuth_degrees columns, a ``rows``
+    list or a CSV upload. Pass ``save_as`` ("points" or "polygon") to store the result.
+    """
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        if 'legs' in data or 'traverses' in data:
+            traverses = data['traverses'] if 'traverses' in data else [data]
+            leg_arrays = [parse_traverse_legs(traverse['legs']) for traverse in traverses]
+            leg_counts = [len(distances) for distances, _ in leg_arrays]
+            
+            # Ragged traverses are padded with zero-length legs and trimmed afterwards
+            distances = np.zeros((len(traverses), max(leg_counts)))
+            azimuths = np.zeros((len(traverses), max(leg_counts)))
+            for i, (leg_distances, leg_azimuths) in enumerate(leg_arrays):
+                distances[i, :len(leg_distances)] = leg_distances
+                azimuths[i, :len(leg_azimuths)] = leg_azimuths
+            start_lats = np.array([float(traverse['start_lat']) for traverse in traverses])
+            start_lons = np.array([float(traverse['start_lon']) for traverse in traverses])
+            validate_lat_lon_arrays(start_lats, start_lons, 'start ')
+            
+            lats, lons = calculate_chained_traverse(start_lats, start_lons, distances, azimuths)
+            vertex_groups = [
+                vertex_records(lats[i, :count + 1], lons[i, :count + 1])
+                for i, count in enumerate(leg_counts)
+            ]
+            result = {'mode': 'chained'}
+            if 'traverses' in data:
+                result['traverses'] = [{'vertices': vertices} for vertices in vertex_groups]
+            else:
+                result['vertices'] = vertex_groups[0]
+        else:
+            columns = read_batch_columns(['start_lat', 'start_lon', 'distance_m', 'azimuth_degrees'])
+            validate_lat_lon_arrays(columns['start_lat'], columns['start_lon'], 'start ')
+            lats, lons = calculate_points_from_distance_azimuth_arrays(
+                columns['start_lat'], columns['start_lon'], columns['distance_m'], columns['azimuth_degrees']
+            )
+            vertex_groups = [vertex_records(lats, lons)]
+            result = {'mode': 'independent', 'vertices': vertex_groups[0]}
+    except Exception as e:
+        return jsonify({'error': f'Calculation failed: {str(e)}'}), 400
+    
+    if data.get('save_as'):
+        if result['mode'] == 'chained' and data['save_as'] == 'points':
+            # The start vertex is an existing station; only store the new ones
+            vertex_groups = [vertices[1:] for vertices in vertex_groups]
+        try:
+            result['saved'] = save_traverse_results(data, vertex_groups)
+        except Exception as e:
+            return jsonify({'error': f'Save failed: {str(e)}'}), 400
+        return jsonify(result), 201
+    
+    return jsonify(result)
+
 @app.route('/api/calculate/azimuth_distance', methods=['POST'])
 def calculate_azimuth_distance_api():
     """Calculate azimuth and distance between two points"""
@@ -484,11 +2864,151 @@ def calculate_azimuth_distance_api():
     except Exception as e:
         return jsonify({'error': f'Calculation failed: {str(e)}'}), 400
 
+@app.route('/api/stats/transformers')
+def transformer_stats():
+    """Report CRS transformer cache usage"""
+    return jsonify(transformer_registry.stats())
+
+@app.route('/api/stats/spatial_index')
+def spatial_index_stats():
+    """Report spatial index size, build time and estimated memory"""
+    if request.args.get('build'):
+        point_index.query_bbox(-180, -90, 180, 90)
+        polygon_index.query_bbox(-180, -90, 180, 90)
+    stats = {'points': point_index.stats(), 'polygons': polygon_index.stats(), 'sqlite_rtree': {'enabled': rtree_enabled}}
+    if rtree_enabled:
+        stats['sqlite_rtree']['points'] = db.session.query(sa.func.count()).select_from(point_rtree).scalar()
+        stats['sqlite_rtree']['polygons'] = db.session.query(sa.func.count()).select_from(polygon_rtree).scalar()
+    return jsonify(stats)
+
+@app.route('/api/stats/map_cache')
+def map_cache_stats():
+    """Report /map render cache hits, misses and cached feature fragments"""
+    return jsonify(map_cache.stats())
+
+@app.route('/api/stats/tile_cache')
+def tile_cache_stats():
+    """Report vector tile cache size, hit rate and invalidations"""
+    return jsonify(tile_cache.stats())
+
+@app.route('/api/stats/exports')
+def export_stats():
+    """Report export artifact cache size, hit rate, evictions and running jobs"""
+    return jsonify(export_manager.stats())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Expose request, SQL, cache, import and export metrics in the Prometheus text format"""
+    caches = {
+        'transformer': transformer_registry.stats(),
+        'map': map_cache.stats(),
+        'tile': tile_cache.stats(),
+        'export': export_manager.stats()
+    }
+    entries = {'transformer': 'size', 'map': 'fragments_cached', 'tile': 'size', 'export': 'artifacts'}
+    for cache, stats in caches.items():
+        metrics.set('topography_cache_hits_total', stats['hits'], cache=cache)
+        metrics.set('topography_cache_misses_total', stats['misses'], cache=cache)
+        metrics.set('topography_cache_entries', stats[entries[cache]], cache=cache)
+    metrics.set('topography_dataset_version', dataset_version)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/profiler', methods=['GET', 'POST'])
+def profiler_settings():
+    """Report or change the slow request profiler settings and list written profiles
+    
+    POST a JSON object with ``enabled``, ``slow_request_seconds`` and/or
+    ``sample_interval`` to change them at runtime.
+    """
+    if request.method == 'POST':
+        try:
+            data = request.get_json() or {}
+            settings = {}
+            if 'enabled' in data:
+                if not isinstance(data['enabled'], bool):
+                    raise ValueError('enabled must be true or false')
+                settings['PROFILER_ENABLED'] = data['enabled']
+            for field, key in (('slow_request_seconds', 'PROFILER_SLOW_REQUEST_SECONDS'),
+                               ('sample_interval', 'PROFILER_SAMPLE_INTERVAL')):
+                if field in data:
+                    value = float(data[field])
+                    if not value > 0:
+                        raise ValueError(f'{field} must be positive')
+                    settings[key] = value
+        except Exception as e:
+            return jsonify({'error': f'Invalid profiler settings: {str(e)}'}), 400
+        app.config.update(settings)
+    
+    return jsonify({
+        'enabled': app.config['PROFILER_ENABLED'],
+        'slow_request_seconds': app.config['PROFILER_SLOW_REQUEST_SECONDS'],
+        'sample_interval': app.config['PROFILER_SAMPLE_INTERVAL'],
+        'profiles_written': profiler.profiles_written,
+        'profiles': [dict(profile, url=url_for('download_profile', name=profile['name'])) for profile in profiler.profiles()]
+    })
+
+@app.route('/api/profiler/profiles/<name>')
+def download_profile(name):
+    """Download a slow request profile in the folded-stack format"""
+    if name not in {profile['name'] for profile in profiler.profiles()}:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(os.path.join(app.config['PROFILER_DIR'], name), mimetype='text/plain', as_attachment=True)
+
+@app.route('/api/calculate/azimuth_distance/batch', methods=['POST'])
+def calculate_azimuth_distance_batch_api():
+    """Calculate azimuths and distances for many point pairs (JSON arrays or CSV upload)"""
+    try:
+        columns = read_batch_columns(['lat1', 'lon1', 'lat2', 'lon2'], rows_key='pairs')
+        validate_lat_lon_arrays(columns['lat1'], columns['lon1'], 'start ')
+        validate_lat_lon_arrays(columns['lat2'], columns['lon2'], 'end ')
+        
+        azimuths, distances = calculate_azimuth_distance_arrays(
+            columns['lat1'], columns['lon1'], columns['lat2'], columns['lon2']
+        )
+        degrees, minutes, seconds = decimal_to_dms_arrays(azimuths)
+    except Exception as e:
+        return jsonify({'error': f'Calculation failed: {str(e)}'}), 400
+    
+    if request.args.get('format') == 'csv':
+        import pandas as pd
+        frame = pd.DataFrame({
+            **columns,
+            'azimuth_decimal': azimuths,
+            'azimuth_degrees': degrees,
+            'azimuth_minutes': minutes,
+            'azimuth_seconds': seconds,
+            'distance_meters': distances,
+        })
+        return send_file(
+            io.BytesIO(frame.to_csv(index=False).encode()),
+            mimetype='text/csv',
+            as_attachment=True,
+            download_name=f'azimuth_distance_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+        )
+    
+    return jsonify({
+        'count': len(azimuths),
+        'azimuth_decimal': azimuths.tolist(),
+        'azimuth_dms': {
+            'degrees': degrees.tolist(),
+            'minutes': minutes.tolist(),
+            'seconds': seconds.tolist()
+        },
+        'distance_meters': distances.tolist(),
+        'distance_km': (distances / 1000).tolist()
+    })
+
 # Polygon API endpoints
 @app.route('/api/polygons', methods=['GET'])
+@dataset_conditional
 def get_polygons():
-    polygons = SurveyPolygon.query.all()
-    return jsonify([polygon.to_dict() for polygon in polygons])
+    try:
+        tolerance_m = parse_lod_tolerance()
+    except ValueError as e:
+        return jsonify({'error': f'Invalid simplification level: {str(e)}'}), 400
+    
+    return list_response(SurveyPolygon, polygon_index, polygon_rtree, polygon_list_columns(tolerance_m),
+                         polygon_row_to_dict, polygon_row_to_json)
 
 @app.route('/api/polygons', methods=['POST'])
 def add_polygon():
@@ -500,7 +3020,7 @@ def add_polygon():
     polygon = SurveyPolygon(
         name=data['name'],
         description=data.get('description', ''),
-        coordinates=json.dumps(coordinates),
+        coordinates=coordinates,
         area_sqm=area_sqm,
         perimeter_m=perimeter_m,
         polygon_type=data.get('polygon_type', 'survey_area')
@@ -519,7 +3039,7 @@ def update_polygon(polygon_id):
     if 'coordinates' in data:
         coordinates = data['coordinates']
         area_sqm, perimeter_m = calculate_polygon_metrics(coordinates)
-        polygon.coordinates = json.dumps(coordinates)
+        polygon.coordinates = coordinates
         polygon.area_sqm = area_sqm
         polygon.perimeter_m = perimeter_m
     
@@ -537,343 +3057,1754 @@ def delete_polygon(polygon_id):
     db.session.commit()
     return '', 204
 
+# Batch mutations
+BATCH_MODES = ('atomic', 'partial')
+
+def parse_batch_request(data):
+    """Return (mode, creates, updates, deletes) from a batch request body"""
+    if not isinstance(data, dict):
+        raise ValueError('body must be a JSON object')
+    mode = data.get('mode', 'atomic')
+    if mode not in BATCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(BATCH_MODES)}")
+    operations = [data.get(name) or [] for name in ('create', 'update', 'delete')]
+    if not all(isinstance(items, list) for items in operations):
+        raise ValueError('create, update and delete must be arrays')
+    total = sum(len(items) for items in operations)
+    if total > app.config['BATCH_MAX_ITEMS']:
+        raise ValueError(f"{total} items exceed the limit of {app.config['BATCH_MAX_ITEMS']}")
+    return (mode, *operations)
+
+def fetch_rows_by_id(model, columns, ids):
+    """{id: row mapping} for the existing rows among ``ids``, queried in chunks of 500"""
+    rows = {}
+    for start in range(0, len(ids), 500):
+        statement = sa.select(model.id, *columns).where(model.id.in_(ids[start:start + 500]))
+        rows.update((row.id, dict(row._mapping)) for row in db.session.execute(statement))
+    return rows
+
+def text_field(data, field, values):
+    if field in data:
+        if data[field] is not None and not isinstance(data[field], str):
+            raise ValueError(f'{field} must be a string')
+        values[field] = data[field]
+
+def parse_point_fields(data, current=None):
+    """reference_point values for a create (``current`` is None) or an update merged over ``current``"""
+    values = dict(current) if current else {'description': '', 'elevation': None, 'point_type': 'waypoint'}
+    for field in ('name', 'description', 'point_type'):
+        text_field(data, field, values)
+    for field in ('latitude', 'longitude'):
+        if field in data:
+            values[field] = float(data[field])
+    if 'elevation' in data:
+        values['elevation'] = None if data['elevation'] in (None, '') else float(data['elevation'])
+    
+    if not (values.get('name') or '').strip():
+        raise ValueError('name is required')
+    if values.get('latitude') is None or values.get('longitude') is None:
+        raise ValueError('latitude and longitude are required')
+    if not (abs(values['latitude']) <= 90 and abs(values['longitude']) <= 180):
+        raise ValueError('latitude must be within ±90 and longitude within ±180')
+    return values, None
+
+def parse_polygon_fields(data, current=None):
+    """survey_polygon values and the new [lat, lon] ring (None if unchanged) for a create or update"""
+    values = dict(current) if current else {'description': '', 'polygon_type': 'survey_area'}
+    for field in ('name', 'description', 'polygon_type'):
+        text_field(data, field, values)
+    if not (values.get('name') or '').strip():
+        raise ValueError('name is required')
+    
+    ring = None
+    if 'coordinates' in data:
+        ring = np.asarray(data['coordinates'], dtype=float)
+        if ring.ndim != 2 or ring.shape[1] < 2:
+            raise ValueError('coordinates must be a list of [lat, lon] pairs')
+        ring = np.ascontiguousarray(ring[:, :2])
+        if len(ring) < 3:
+            raise ValueError('A polygon needs at least 3 vertices')
+        validate_lat_lon_arrays(ring[:, 0], ring[:, 1])
+        values.update(polygon_vertex_values(ring))
+    elif current is None:
+        raise ValueError('coordinates are required')
+    return values, ring
+
+def write_point_batch(creates, updates, delete_ids):
+    """Bulk SQL for a point batch; returns the new IDs and a callback for after the commit"""
+    table = ReferencePoint.__table__
+    set_point_utm([values for values, _ in creates + updates])
+    created_ids = bulk_insert(table, [values for values, _ in creates])
+    if updates:
+        db.session.execute(table.update().where(table.c.id == sa.bindparam('point_id')),
+                           [{'point_id': values.pop('id'), **values} for values in (dict(values) for values, _ in updates)])
+    for start in range(0, len(delete_ids), 500):
+        db.session.execute(table.delete().where(table.c.id.in_(delete_ids[start:start + 500])))
+    record_changes('point', 'created', created_ids)
+    record_changes('point', 'updated', [values['id'] for values, _ in updates])
+    record_changes('point', 'deleted', delete_ids)
+    
+    def after_commit():
+        written = [values for values, _ in creates] + [values for values, _ in updates]
+        ids = created_ids + [values['id'] for values, _ in updates]
+        point_index.upsert_many(ids, shapely.points([values['longitude'] for values in written],
+                                                    [values['latitude'] for values in written]),
+                                [values['point_type'] for values in written])
+        point_index.remove_many(delete_ids)
+        notify_dataset_changed(ids + delete_ids, [])
+    return created_ids, after_commit
+
+def write_polygon_batch(creates, updates, delete_ids):
+    """Bulk SQL for a polygon batch, including metrics and simplification levels of new rings"""
+    table = SurveyPolygon.__table__
+    level_table = SurveyPolygonLevel.__table__
+    reshaped = [(values, ring) for values, ring in creates + updates if ring is not None]
+    measure_polygon_inserts([values for values, _ in reshaped], [ring for _, ring in reshaped])
+    
+    created_ids = bulk_insert(table, [values for values, _ in creates])
+    if updates:
+        db.session.execute(table.update().where(table.c.id == sa.bindparam('polygon_id')),
+                           [{'polygon_id': values.pop('id'), **values} for values in (dict(values) for values, _ in updates)])
+    # Levels of reshaped and deleted polygons are rebuilt or dropped here, as SQLite does not cascade
+    stale_ids = [values['id'] for values, ring in updates if ring is not None] + delete_ids
+    for start in range(0, len(stale_ids), 500):
+        db.session.execute(level_table.delete().where(level_table.c.polygon_id.in_(stale_ids[start:start + 500])))
+    for start in range(0, len(delete_ids), 500):
+        db.session.execute(table.delete().where(table.c.id.in_(delete_ids[start:start + 500])))
+    insert_polygon_levels(created_ids, [ring for _, ring in creates])
+    insert_polygon_levels([values['id'] for values, ring in updates if ring is not None],
+                          [ring for _, ring in updates if ring is not None])
+    record_changes('polygon', 'created', created_ids)
+    record_changes('polygon', 'updated', [values['id'] for values, _ in updates])
+    record_changes('polygon', 'deleted', delete_ids)
+    
+    def after_commit():
+        written = creates + updates
+        ids = created_ids + [values['id'] for values, _ in updates]
+        if polygon_index.built:
+            polygon_index.upsert_many(ids, [polygon_geometry(ring if ring is not None else unpack_vertices(values['vertices']))
+                                            for values, ring in written],
+                                      [values['polygon_type'] for values, _ in written])
+        polygon_index.remove_many(delete_ids)
+        notify_dataset_changed([], ids + delete_ids)
+    return created_ids, after_commit
+
+def apply_batch(model, columns, parse_fields, write):
+    """Validate a batch request and apply it in one transaction
+    
+    Every item is checked before anything is written. In ``atomic`` mode (the
+    default) any invalid item rejects the whole batch with 400; in ``partial``
+    mode the valid items are applied and the invalid ones reported. Either way
+    the response lists a result per item, by operation and index.
+    """
+    try:
+        mode, creates, updates, deletes = parse_batch_request(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid batch: {str(e)}'}), 400
+    
+    results = {'create': {}, 'update': {}, 'delete': {}}
+    delete_ids = {}
+    for index, item_id in enumerate(deletes):
+        if not isinstance(item_id, int) or isinstance(item_id, bool):
+            results['delete'][index] = 'id must be an integer'
+        elif item_id in delete_ids.values():
+            results['delete'][index] = 'id is deleted more than once'
+        else:
+            delete_ids[index] = item_id
+    update_ids = {}
+    for index, item in enumerate(updates):
+        item_id = item.get('id') if isinstance(item, dict) else None
+        if not isinstance(item_id, int) or isinstance(item_id, bool):
+            results['update'][index] = 'each update must be an object with an integer id'
+        elif item_id in update_ids.values():
+            results['update'][index] = 'id is updated more than once'
+        elif item_id in delete_ids.values():
+            results['update'][index] = 'id is also deleted in this batch'
+        else:
+            update_ids[index] = item_id
+    
+    current = fetch_rows_by_id(model, columns, list(update_ids.values()) + list(delete_ids.values()))
+    for operation, ids in (('update', update_ids), ('delete', delete_ids)):
+        for index, item_id in list(ids.items()):
+            if item_id not in current:
+                results[operation][index] = f'{item_id} not found'
+                del ids[index]
+    
+    valid = {'create': {}, 'update': {}}
+    for operation, items in (('create', enumerate(creates)), ('update', ((i, updates[i]) for i in update_ids))):
+        for index, item in items:
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError('each item must be an object')
+                valid[operation][index] = parse_fields(item, current[item['id']] if operation == 'update' else None)
+            except (TypeError, ValueError) as e:
+                results[operation][index] = str(e)
+    
+    failed = sum(len(errors) for errors in results.values())
+    applied = not failed or mode == 'partial'
+    created_ids = []
+    if applied:
+        try:
+            created_ids, after_commit = write(list(valid['create'].values()), list(valid['update'].values()),
+                                              list(delete_ids.values()))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': f'Batch failed: {str(e)}'}), 400
+        after_commit()
+    
+    item_ids = {'create': dict(zip(valid['create'], created_ids)), 'update': update_ids, 'delete': delete_ids}
+    body = {'mode': mode, 'applied': applied, 'failed': failed, 'results': {}}
+    for operation, items, done in (('create', creates, 'created'), ('update', updates, 'updated'), ('delete', deletes, 'deleted')):
+        entries = [
+            {'index': index, 'status': 'error', 'error': results[operation][index]} if index in results[operation]
+            else {'index': index, 'status': done if applied else 'not_applied', 'id': item_ids[operation].get(index)}
+            for index in range(len(items))
+        ]
+        body['results'][operation] = entries
+        body[done] = sum(entry['status'] == done for entry in entries)
+    return jsonify(body), 200 if applied else 400
+
+@app.route('/api/points/batch', methods=['POST'])
+def batch_points():
+    """Create, update and delete many points in one transaction"""
+    columns = [ReferencePoint.name, ReferencePoint.description, ReferencePoint.latitude,
+               ReferencePoint.longitude, ReferencePoint.elevation, ReferencePoint.point_type]
+    return apply_batch(ReferencePoint, columns, parse_point_fields, write_point_batch)
+
+@app.route('/api/polygons/batch', methods=['POST'])
+def batch_polygons():
+    """Create, update and delete many polygons in one transaction"""
+    columns = [SurveyPolygon.name, SurveyPolygon.description, SurveyPolygon.polygon_type, SurveyPolygon.vertices,
+               SurveyPolygon.vertex_count, SurveyPolygon.min_lat, SurveyPolygon.min_lon, SurveyPolygon.max_lat,
+               SurveyPolygon.max_lon, SurveyPolygon.area_sqm, SurveyPolygon.perimeter_m]
+    return apply_batch(SurveyPolygon, columns, parse_polygon_fields, write_polygon_batch)
+
+# Change feed
+def collapse_changes(entries):
+    """Reduce ordered (kind, item_id, action) log entries to each item's net change
+    
+    Items created and deleted within the window are dropped; an ID deleted and
+    then reused by a new row counts as updated.
+    """
+    first, last = {}, {}
+    for kind, item_id, action in entries:
+        first.setdefault((kind, item_id), action)
+        last[(kind, item_id)] = action
+    net = {}
+    for key, action in last.items():
+        if action == 'deleted':
+            if first[key] != 'created':
+                net[key] = 'deleted'
+        else:
+            net[key] = 'created' if first[key] == 'created' else 'updated'
+    return net
+
+@app.route('/api/changes')
+def get_changes():
+    """Points and polygons created, updated or deleted after dataset version ``since``
+    
+    Returns current rows for created and updated items and IDs for deleted ones.
+    At most CHANGES_PAGE_MAX_ENTRIES log entries are read per request; when
+    ``more`` is true, ask again with ``since`` set to the returned ``version``.
+    """
+    try:
+        since = int(request.args['since'])
+        if since < 0:
+            raise ValueError('since must not be negative')
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': f'Invalid query: {str(e)}'}), 400
+    
+    oldest = db.session.execute(sa.select(sa.func.min(DatasetChange.version))).scalar()
+    if oldest is not None and since < oldest - 1:
+        return jsonify({'error': f'Changes up to version {oldest - 1} have been discarded; reload the full lists',
+                        'version': current_dataset_version()}), 410
+    
+    page_size = app.config['CHANGES_PAGE_MAX_ENTRIES']
+    entries = db.session.execute(
+        sa.select(DatasetChange.version, DatasetChange.kind, DatasetChange.item_id, DatasetChange.action)
+        .where(DatasetChange.version > since).order_by(DatasetChange.version).limit(page_size + 1)
+    ).all()
+    more = len(entries) > page_size
+    entries = entries[:page_size]
+    version = entries[-1].version if entries else max(since, current_dataset_version())
+    
+    net = collapse_changes((entry.kind, entry.item_id, entry.action) for entry in entries)
+    body = {'since': since, 'version': version, 'more': more}
+    for kind, model, columns, row_to_dict in (('point', ReferencePoint, point_list_columns(), point_row_to_dict),
+                                              ('polygon', SurveyPolygon, polygon_list_columns(), polygon_row_to_dict)):
+        changed = sorted(item_id for (item_kind, item_id), action in net.items() if item_kind == kind and action != 'deleted')
+        rows = {}
+        for start in range(0, len(changed), 500):
+            statement = sa.select(*columns).where(model.id.in_(changed[start:start + 500]))
+            rows.update((row.id, row_to_dict(row)) for row in db.session.execute(statement))
+        body[f'{kind}s'] = {
+            'created': [rows[item_id] for item_id in changed if net[(kind, item_id)] == 'created' and item_id in rows],
+            'updated': [rows[item_id] for item_id in changed if net[(kind, item_id)] == 'updated' and item_id in rows],
+            # Rows deleted after the last entry read show up in a later page
+            'deleted': sorted(item_id for (item_kind, item_id), action in net.items() if item_kind == kind and action == 'deleted')
+        }
+    return jsonify(body)
+
 # Import/Export endpoints
+CSV_EXPORT_COLUMNS = ['Type', 'Name', 'Description', 'Latitude', 'Longitude', 'Elevation', 'Point_Type', 'Area_SqM', 'Perimeter_M',
+                      'UTM_Zone', 'UTM_Hemisphere', 'UTM_Easting', 'UTM_Northing']
+
+def encode_csv_rows(rows):
+    """Encode a batch of rows as UTF-8 CSV bytes"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
 @app.route('/api/export/csv')
+@dataset_conditional
 def export_csv():
-    """Export points and polygons to CSV"""
-    points = ReferencePoint.query.all()
-    polygons = SurveyPolygon.query.all()
+    """Stream points and polygons as CSV
     
-    output = io.StringIO()
-    writer = csv.writer(output)
+    Rows are read from the database in batches and encoded as they go, so memory
+    does not grow with the export. Optional filters: ``?columns=Name,Latitude,...``,
+    ``?point_type=`` (matched against the Point_Type column), ``?bbox=`` or
+    ``?intersects=``, and ``?utm_zone=33N``, which leaves out polygons.
+    ``?compression=gzip`` compresses the stream on the fly.
+    """
+    try:
+        columns = request.args['columns'].split(',') if request.args.get('columns') else CSV_EXPORT_COLUMNS
+        unknown = [column for column in columns if column not in CSV_EXPORT_COLUMNS]
+        if unknown:
+            raise ValueError(f"unknown columns {', '.join(unknown)}; choose from {', '.join(CSV_EXPORT_COLUMNS)}")
+        compression = request.args.get('compression')
+        if compression not in (None, 'gzip'):
+            raise ValueError('compression must be gzip')
+        point_condition, point_ids = spatial_filter(ReferencePoint, point_index, point_rtree)
+        polygon_condition, polygon_ids = spatial_filter(SurveyPolygon, polygon_index, polygon_rtree)
+        zone_condition = utm_zone_filter()
+    except Exception as e:
+        return jsonify({'error': f'Invalid export options: {str(e)}'}), 400
     
-    # Write points
-    writer.writerow(['Type', 'Name', 'Description', 'Latitude', 'Longitude', 'Elevation', 'Point_Type', 'Area_SqM', 'Perimeter_M'])
+    point_type = request.args.get('point_type')
+    if point_type:
+        point_condition = and_present(point_condition, ReferencePoint.point_type == point_type)
+        polygon_condition = and_present(polygon_condition, SurveyPolygon.polygon_type == point_type)
+    if zone_condition is not None:
+        # Polygons have no UTM zone of their own
+        point_condition = and_present(point_condition, zone_condition)
+        polygon_condition, polygon_ids = sa.false(), None
+    positions = [CSV_EXPORT_COLUMNS.index(column) for column in columns]
     
-    for point in points:
-        writer.writerow([
-            'Point', point.name, point.description or '', point.latitude, point.longitude,
-            point.elevation or '', point.point_type, '', ''
-        ])
+    def point_rows(rows):
+        for name, description, latitude, longitude, elevation, point_type, zone, hemisphere, easting, northing in rows:
+            row = ['Point', name, description or '', latitude, longitude, elevation or '', point_type, '', '',
+                   zone or '', hemisphere or '', '' if easting is None else easting, '' if northing is None else northing]
+            yield [row[position] for position in positions]
     
-    for polygon in polygons:
-        coords = json.loads(polygon.coordinates)
-        coord_str = '; '.join([f"{coord[0]},{coord[1]}" for coord in coords])
-        writer.writerow([
-            'Polygon', polygon.name, polygon.description or '', coord_str, '',
-            '', polygon.polygon_type, polygon.area_sqm, polygon.perimeter_m
-        ])
+    def polygon_rows(rows):
+        for name, description, vertices, polygon_type, area_sqm, perimeter_m in rows:
+            coord_str = '; '.join([f"{lat},{lon}" for lat, lon in unpack_vertices(vertices).tolist()])
+            row = ['Polygon', name, description or '', coord_str, '', '', polygon_type, area_sqm, perimeter_m, '', '', '', '']
+            yield [row[position] for position in positions]
     
-    output.seek(0)
+    def generate():
+        compressor = zlib.compressobj(wbits=31) if compression == 'gzip' else None
+        encode = compressor.compress if compressor else bytes
+        yield encode(encode_csv_rows([columns]))
+        point_columns = [ReferencePoint.name, ReferencePoint.description, ReferencePoint.latitude,
+                         ReferencePoint.longitude, ReferencePoint.elevation, ReferencePoint.point_type,
+                         *POINT_UTM_ATTRIBUTES]
+        polygon_columns = [SurveyPolygon.name, SurveyPolygon.description, SurveyPolygon.vertices,
+                           SurveyPolygon.polygon_type, SurveyPolygon.area_sqm, SurveyPolygon.perimeter_m]
+        batches = chain(
+            ((point_rows, rows) for rows in iter_row_batches(ReferencePoint, point_columns, point_condition, point_ids)),
+            ((polygon_rows, rows) for rows in iter_row_batches(SurveyPolygon, polygon_columns, polygon_condition,
+                                                               polygon_ids, batch_size=200)))
+        for to_csv_rows, rows in observe_export_batches('csv', batches, size=lambda batch: len(batch[1])):
+            yield encode(encode_csv_rows(to_csv_rows(rows)))
+        if compressor:
+            yield compressor.flush()
     
-    return send_file(
-        io.BytesIO(output.getvalue().encode()),
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'survey_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    filename = f'survey_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    if compression == 'gzip':
+        filename += '.gz'
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/gzip' if compression == 'gzip' else 'text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
     )
 
+GEOJSON_SEQ_EXTENSIONS = ('.geojsons', '.geojsonl', '.geojsonseq', '.ndjson', '.jsonl')
+RECORD_SEPARATOR = '\x1e'
+
+def point_feature(row):
+    """GeoJSON feature dict for a (name, description, latitude, longitude, elevation, point_type, *UTM columns) row"""
+    name, description, latitude, longitude, elevation, point_type, zone, hemisphere, easting, northing = row
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [longitude, latitude]},
+        'properties': {'name': name, 'description': description, 'elevation': elevation,
+                       'point_type': point_type, 'utm_zone': zone, 'utm_hemisphere': hemisphere,
+                       'utm_easting': easting, 'utm_northing': northing, 'type': 'point'}
+    }
+
+def polygon_feature(row):
+    """GeoJSON feature dict for a (name, description, vertices, polygon_type, area_sqm, perimeter_m) row"""
+    name, description, vertices, polygon_type, area_sqm, perimeter_m = row
+    return {
+        'type': 'Feature',
+        # Convert to [lon, lat] format for GeoJSON
+        'geometry': {'type': 'Polygon', 'coordinates': [unpack_vertices(vertices)[:, ::-1].tolist()]},
+        'properties': {'name': name, 'description': description, 'polygon_type': polygon_type,
+                       'area_sqm': area_sqm, 'perimeter_m': perimeter_m, 'type': 'polygon'}
+    }
+
+def iter_export_features():
+    """Yield batches of GeoJSON feature dicts for all points, then all polygons"""
+    point_columns = [ReferencePoint.name, ReferencePoint.description, ReferencePoint.latitude,
+                     ReferencePoint.longitude, ReferencePoint.elevation, ReferencePoint.point_type,
+                     *POINT_UTM_ATTRIBUTES]
+    for rows in iter_row_batches(ReferencePoint, point_columns):
+        yield [point_feature(row) for row in rows]
+    polygon_columns = [SurveyPolygon.name, SurveyPolygon.description, SurveyPolygon.vertices,
+                       SurveyPolygon.polygon_type, SurveyPolygon.area_sqm, SurveyPolygon.perimeter_m]
+    for rows in iter_row_batches(SurveyPolygon, polygon_columns, batch_size=200):
+        yield [polygon_feature(row) for row in rows]
+
 @app.route('/api/export/geojson')
+@dataset_conditional
 def export_geojson():
-    """Export points and polygons to GeoJSON"""
-    points = ReferencePoint.query.all()
-    polygons = SurveyPolygon.query.all()
-    
-    features = []
-    
-    # Add points
-    for point in points:
-        feature = geojson.Feature(
-            geometry=geojson.Point((point.longitude, point.latitude)),
-            properties={
-                'name': point.name,
-                'description': point.description,
-                'elevation': point.elevation,
-                'point_type': point.point_type,
-                'type': 'point'
-            }
-        )
-        features.append(feature)
+    """Stream points and polygons as a GeoJSON FeatureCollection, or ?format=geojsonseq for RFC 8142"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Add polygons
-    for polygon in polygons:
-        coords = json.loads(polygon.coordinates)
-        # Convert to [lon, lat] format for GeoJSON
-        geojson_coords = [[[coord[1], coord[0]] for coord in coords]]
-        
-        feature = geojson.Feature(
-            geometry=geojson.Polygon(geojson_coords),
-            properties={
-                'name': polygon.name,
-                'description': polygon.description,
-                'polygon_type': polygon.polygon_type,
-                'area_sqm': polygon.area_sqm,
-                'perimeter_m': polygon.perimeter_m,
-                'type': 'polygon'
-            }
+    if request.args.get('format') == 'geojsonseq':
+        def generate_sequence():
+            for features in observe_export_batches('geojsonseq', iter_export_features()):
+                yield ''.join(f'{RECORD_SEPARATOR}{json.dumps(feature)}\n' for feature in features)
+        return Response(
+            stream_with_context(generate_sequence()),
+            mimetype='application/geo+json-seq',
+            headers={'Content-Disposition': f'attachment; filename=survey_data_{timestamp}.geojsons'}
         )
-        features.append(feature)
-    
-    feature_collection = geojson.FeatureCollection(features)
     
-    return send_file(
-        io.BytesIO(json.dumps(feature_collection).encode()),
+    def generate_collection():
+        yield '{"type": "FeatureCollection", "features": ['
+        separator = ''
+        for features in observe_export_batches('geojson', iter_export_features()):
+            yield separator + ', '.join(json.dumps(feature) for feature in features)
+            separator = ', '
+        yield ']}'
+    return Response(
+        stream_with_context(generate_collection()),
         mimetype='application/geo+json',
-        as_attachment=True,
-        download_name=f'survey_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.geojson'
+        headers={'Content-Disposition': f'attachment; filename=survey_data_{timestamp}.geojson'}
     )
 
-@app.route('/api/export/kml')
-def export_kml():
-    """Export points and polygons to KML"""
-    points = ReferencePoint.query.all()
-    polygons = SurveyPolygon.query.all()
-    
+# Export jobs
+def write_kml(path, tolerance_m=None, progress=None):
+    """Write points and polygons to a KML file, reading the database in batches"""
+    import simplekml
     kml = simplekml.Kml()
     
     # Add points
     points_folder = kml.newfolder(name="Reference Points")
-    for point in points:
-        pnt = points_folder.newpoint(name=point.name)
-        pnt.coords = [(point.longitude, point.latitude, point.elevation or 0)]
-        pnt.description = f"""
+    point_columns = [ReferencePoint.name, ReferencePoint.description, ReferencePoint.latitude,
+                     ReferencePoint.longitude, ReferencePoint.elevation, ReferencePoint.point_type,
+                     *POINT_UTM_ATTRIBUTES]
+    for points in iter_row_batches(ReferencePoint, point_columns):
+        for point in points:
+            pnt = points_folder.newpoint(name=point.name)
+            pnt.coords = [(point.longitude, point.latitude, point.elevation or 0)]
+            pnt.description = f"""
         Description: {point.description or 'No description'}
         Point Type: {point.point_type}
         Elevation: {point.elevation or 'N/A'} m
         Coordinates: {point.latitude:.6f}, {point.longitude:.6f}
-        UTM: {lat_lon_to_utm(point.latitude, point.longitude)}
+        UTM: {stored_utm_label(point)}
         """
+        if progress:
+            progress(len(points))
     
     # Add polygons
     polygons_folder = kml.newfolder(name="Survey Polygons")
-    for polygon in polygons:
-        coords = json.loads(polygon.coordinates)
-        pol = polygons_folder.newpolygon(name=polygon.name)
-        # Convert to (lon, lat, elevation) format for KML
-        kml_coords = [(coord[1], coord[0], 0) for coord in coords]
-        pol.outerboundaryis = kml_coords
-        pol.description = f"""
+    polygon_columns = [SurveyPolygon.name, SurveyPolygon.description, polygon_lod_vertices(tolerance_m),
+                       SurveyPolygon.vertex_count, SurveyPolygon.polygon_type, SurveyPolygon.area_sqm,
+                       SurveyPolygon.perimeter_m]
+    for polygons in iter_row_batches(SurveyPolygon, polygon_columns, batch_size=200):
+        for polygon in polygons:
+            pol = polygons_folder.newpolygon(name=polygon.name)
+            # Convert to (lon, lat, elevation) format for KML
+            pol.outerboundaryis = [(lon, lat, 0) for lat, lon in unpack_vertices(polygon.vertices).tolist()]
+            pol.description = f"""
         Description: {polygon.description or 'No description'}
         Polygon Type: {polygon.polygon_type}
         Area: {polygon.area_sqm:.2f} m²
         Perimeter: {polygon.perimeter_m:.2f} m
-        Vertices: {len(coords)}
+        Vertices: {polygon.vertex_count}
         """
-        pol.style.polystyle.color = simplekml.Color.red
-        pol.style.polystyle.fill = 1
-        pol.style.polystyle.outline = 1
-    
-    # Save to temporary file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.kml')
-    kml.save(temp_file.name)
+            pol.style.polystyle.color = simplekml.Color.red
+            pol.style.polystyle.fill = 1
+            pol.style.polystyle.outline = 1
+        if progress:
+            progress(len(polygons))
     
-    return send_file(
-        temp_file.name,
-        mimetype='application/vnd.google-earth.kml+xml',
-        as_attachment=True,
-        download_name=f'survey_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.kml'
-    )
+    kml.save(path)
 
-@app.route('/api/export/dxf')
-def export_dxf():
-    """Export points and polygons to DXF format"""
-    points = ReferencePoint.query.all()
-    polygons = SurveyPolygon.query.all()
-    
+def write_dxf(path, progress=None):
+    """Write points and polygons to a DXF file, reading the database in batches"""
+    import ezdxf
     # Create new DXF document
     doc = ezdxf.new('R2010')  # Use AutoCAD 2010 version
     msp = doc.modelspace()  # Get the modelspace
     
-    # Add points as point entities
-    for point in points:
-        # Add point entity
-        msp.add_point((point.longitude, point.latitude, point.elevation or 0))
-        
-        # Add text label for the point
-        msp.add_text(
-            point.name,
-            dxfattribs={
-                'insert': (point.longitude, point.latitude + 0.0001, point.elevation or 0),
-                'height': 0.0005,
-                'style': 'Standard'
-            }
-        )
-    
-    # Add polygons as polylines/lwpolylines
-    for polygon in polygons:
-        coords = json.loads(polygon.coordinates)
-        
-        # Convert coordinates to proper format (lon, lat, elevation)
-        dxf_coords = []
-        for coord in coords:
-            dxf_coords.append((coord[1], coord[0], 0))  # Convert lat,lon to lon,lat
-        
-        # Close the polygon by adding the first point at the end
-        if len(dxf_coords) > 0 and dxf_coords[0] != dxf_coords[-1]:
-            dxf_coords.append(dxf_coords[0])
-        
-        # Add as polyline
-        polyline = msp.add_lwpolyline(
-            dxf_coords,
-            dxfattribs={'layer': 'SURVEY_POLYGONS', 'color': 1}  # Red color
-        )
-        
-        # Add polygon label at centroid
-        if len(coords) >= 3:
-            # Calculate centroid
-            centroid_lat = sum(coord[0] for coord in coords) / len(coords)
-            centroid_lon = sum(coord[1] for coord in coords) / len(coords)
-            
-            # Add text at centroid
+    # Add points as point entities with a text label
+    point_columns = [ReferencePoint.name, ReferencePoint.latitude, ReferencePoint.longitude, ReferencePoint.elevation]
+    for points in iter_row_batches(ReferencePoint, point_columns):
+        for point in points:
+            msp.add_point((point.longitude, point.latitude, point.elevation or 0))
             msp.add_text(
-                f"{polygon.name}\nArea: {polygon.area_sqm:.2f} m²",
+                point.name,
                 dxfattribs={
-                    'insert': (centroid_lon, centroid_lat, 0),
-                    'height': 0.001,
-                    'style': 'Standard',
-                    'layer': 'SURVEY_LABELS'
+                    'insert': (point.longitude, point.latitude + 0.0001, point.elevation or 0),
+                    'height': 0.0005,
+                    'style': 'Standard'
                 }
             )
+        if progress:
+            progress(len(points))
+    
+    # Add polygons as closed lwpolylines, labelled at the vertex centroid
+    polygon_columns = [SurveyPolygon.name, SurveyPolygon.vertices, SurveyPolygon.area_sqm]
+    for polygons in iter_row_batches(SurveyPolygon, polygon_columns, batch_size=200):
+        for polygon in polygons:
+            coords = unpack_vertices(polygon.vertices)
+            # Convert coordinates to (lon, lat, elevation)
+            dxf_coords = [(lon, lat, 0) for lat, lon in coords.tolist()]
+            if len(dxf_coords) > 0 and dxf_coords[0] != dxf_coords[-1]:
+                dxf_coords.append(dxf_coords[0])
+            msp.add_lwpolyline(dxf_coords, dxfattribs={'layer': 'SURVEY_POLYGONS', 'color': 1})  # Red color
+            
+            if len(coords) >= 3:
+                centroid_lat, centroid_lon = coords.mean(axis=0).tolist()
+                msp.add_text(
+                    f"{polygon.name}\nArea: {polygon.area_sqm:.2f} m²",
+                    dxfattribs={
+                        'insert': (centroid_lon, centroid_lat, 0),
+                        'height': 0.001,
+                        'style': 'Standard',
+                        'layer': 'SURVEY_LABELS'
+                    }
+                )
+        if progress:
+            progress(len(polygons))
     
     # Create layers
     doc.layers.new(name='SURVEY_POINTS', dxfattribs={'color': 3})  # Green
     doc.layers.new(name='SURVEY_POLYGONS', dxfattribs={'color': 1})  # Red
     doc.layers.new(name='SURVEY_LABELS', dxfattribs={'color': 7})  # White/Black
     
-    # Save to temporary file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.dxf')
-    doc.saveas(temp_file.name)
+    doc.saveas(path)
+
+# GeoPackage layer names, also used as the feature_type values of a combined GeoParquet table
+GEO_LAYERS = {'points': 'reference_points', 'polygons': 'survey_polygons'}
+
+def polygon_geometries(rings):
+    """Vectorized lon/lat shapely Polygons for [lat, lon] vertex arrays; None where a ring has fewer than 3 vertices"""
+    geometries = np.full(len(rings), None, dtype=object)
+    valid = np.array([i for i, ring in enumerate(rings) if len(ring) >= 3], dtype=int)
+    if len(valid):
+        coords = np.concatenate([rings[i] for i in valid])[:, ::-1]
+        indices = np.repeat(np.arange(len(valid)), [len(rings[i]) for i in valid])
+        geometries[valid] = shapely.polygons(shapely.linearrings(coords, indices=indices))
+    return geometries
+
+def points_geodataframe():
+    """All reference points as a GeoDataFrame in EPSG:4326, read with one query"""
+    import geopandas as gpd
+    import pandas as pd
+    frame = pd.read_sql_query(
+        sa.select(ReferencePoint.id, ReferencePoint.name, ReferencePoint.description, ReferencePoint.elevation,
+                  ReferencePoint.point_type, *POINT_UTM_ATTRIBUTES, ReferencePoint.latitude,
+                  ReferencePoint.longitude).order_by(ReferencePoint.id),
+        db.session.connection()
+    )
+    geometry = gpd.points_from_xy(frame.pop('longitude'), frame.pop('latitude'))
+    return gpd.GeoDataFrame(frame, geometry=geometry, crs=f'EPSG:{WGS84_EPSG}')
+
+def polygons_geodataframe():
+    """All survey polygons as a GeoDataFrame in EPSG:4326, read with one query"""
+    import geopandas as gpd
+    import pandas as pd
+    frame = pd.read_sql_query(
+        sa.select(SurveyPolygon.id, SurveyPolygon.name, SurveyPolygon.description, SurveyPolygon.polygon_type,
+                  SurveyPolygon.area_sqm, SurveyPolygon.perimeter_m, SurveyPolygon.created_at,
+                  SurveyPolygon.vertices).order_by(SurveyPolygon.id),
+        db.session.connection()
+    )
+    geometry = polygon_geometries([unpack_vertices(vertices) for vertices in frame.pop('vertices')])
+    return gpd.GeoDataFrame(frame, geometry=geometry, crs=f'EPSG:{WGS84_EPSG}')
+
+def export_geodataframes(layer):
+    """[(layer name, GeoDataFrame)] for 'points', 'polygons' or 'all'"""
+    builders = {'points': points_geodataframe, 'polygons': polygons_geodataframe}
+    return [(GEO_LAYERS[key], builder()) for key, builder in builders.items() if layer in (key, 'all')]
+
+def write_geoparquet(path, layer='all', progress=None):
+    """Write points and/or polygons to one GeoParquet file
+    
+    Both kinds share a table with a ``feature_type`` column naming the layer;
+    columns that only apply to one kind are null for the other.
+    """
+    import geopandas as gpd
+    import pandas as pd
+    frames = []
+    for name, frame in export_geodataframes(layer):
+        frames.append(frame.assign(feature_type=name))
+        if progress:
+            progress(len(frame))
+    frame = gpd.GeoDataFrame(pd.concat(frames, ignore_index=True), geometry='geometry', crs=f'EPSG:{WGS84_EPSG}')
+    frame.to_parquet(path, index=False)
+
+def write_gpkg(path, layer='all', progress=None):
+    """Write points and polygons to the reference_points and survey_polygons layers of a GeoPackage"""
+    for name, frame in export_geodataframes(layer):
+        frame.to_file(path, layer=name, driver='GPKG', engine='pyogrio')
+        if progress:
+            progress(len(frame))
+
+EXPORT_FORMATS = {
+    'kml': {'extension': 'kml', 'mimetype': 'application/vnd.google-earth.kml+xml', 'writer': write_kml},
+    'dxf': {'extension': 'dxf', 'mimetype': 'application/dxf', 'writer': write_dxf},
+    'geoparquet': {'extension': 'parquet', 'mimetype': 'application/vnd.apache.parquet', 'writer': write_geoparquet},
+    'gpkg': {'extension': 'gpkg', 'mimetype': 'application/geopackage+sqlite3', 'writer': write_gpkg},
+}
+
+def parse_export_options(export_format, args):
+    """Validate an export format and return its options as a hashable, sorted tuple"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'kml':
+        # Snap to a stored level so equivalent tolerances share one artifact
+        return (('tolerance_m', lod_level(parse_lod_tolerance(args))),)
+    if export_format in ('geoparquet', 'gpkg'):
+        layer = args.get('layer', 'all')
+        if layer not in ('all', *GEO_LAYERS):
+            raise ValueError("layer must be all, points or polygons")
+        return (('layer', layer),)
+    return ()
+
+class ExportJob:
+    """State of one export request; finished jobs point at a file in EXPORT_DIR"""
+    
+    def __init__(self, export_format, options, version):
+        self.id = uuid.uuid4().hex
+        self.format = export_format
+        self.options = options
+        self.dataset_version = version
+        self.status = 'queued'
+        self.total = None
+        self.done = 0
+        self.error = None
+        self.path = None
+        self.size_bytes = None
+        self.cached = False
+        self.created_at = time.time()
+        self.finished_at = None
+        self.finished = threading.Event()
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'format': self.format,
+            'options': dict(self.options),
+            'status': self.status,
+            # Rows are all read before the file is written out, so hold back the last percent until then
+            'progress': 1.0 if self.status == 'completed' else min(self.done / self.total, 0.99) if self.total else 0.0,
+            'dataset_version': self.dataset_version,
+            'cached': self.cached,
+            'size_bytes': self.size_bytes,
+            'error': self.error,
+            'created_at': datetime.utcfromtimestamp(self.created_at).isoformat(),
+            'finished_at': datetime.utcfromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            'download_url': url_for('download_export_job', job_id=self.id) if self.status == 'completed' else None
+        }
+
+def process_alive(pid):
+    """Whether a process with this PID is running; always True on Windows, where os.kill would end it"""
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # running under another user
+    return True
+
+class ExportManager:
+    """Runs KML/DXF exports on a worker pool and reuses their files while the dataset is unchanged
+    
+    Artifacts are keyed by (format, options, dataset version). A submit for a key
+    that is already built or building returns that result instead of starting
+    another export. Files are evicted once older than EXPORT_CACHE_MAX_AGE_SECONDS
+    and, least recently used first, while the directory exceeds EXPORT_CACHE_MAX_BYTES.
+    """
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._executor = None
+        self._directory = None
+        self._jobs = {}
+        self._artifacts = {}
+        self._building = {}
+        self._lock = threading.Lock()
+    
+    def _export_dir(self):
+        if self._executor is None:
+            # Each process writes to a directory named after its PID; those of exited processes are removed.
+            # Live processes expire their own files, so an idle worker's directory is never swept
+            root = app.config['EXPORT_DIR']
+            os.makedirs(root, exist_ok=True)
+            for name in os.listdir(root):
+                path = os.path.join(root, name)
+                owner = name.split('-')[1] if name.count('-') >= 2 else ''
+                if owner.isdigit():
+                    stale = not process_alive(int(owner))
+                else:
+                    # Directories from before they were named by PID expire by age
+                    stale = time.time() - os.path.getmtime(path) > app.config['EXPORT_CACHE_MAX_AGE_SECONDS']
+                if stale:
+                    shutil.rmtree(path, ignore_errors=True)
+            self._directory = tempfile.mkdtemp(prefix=f'exports-{os.getpid()}-', dir=root)
+            self._executor = ThreadPoolExecutor(max_workers=app.config['EXPORT_WORKERS'], thread_name_prefix='export')
+        return self._directory
+    
+    def submit(self, export_format, options):
+        """Queue an export, or return a finished or in-flight job for the same artifact"""
+        version = dataset_version
+        key = (export_format, options, version)
+        with self._lock:
+            directory = self._export_dir()
+            self._evict()
+            job = ExportJob(export_format, options, version)
+            artifact = self._artifacts.get(key)
+            if artifact is not None and not os.path.exists(artifact['path']):
+                # Removed from outside (e.g. a /tmp cleaner); build it again
+                del self._artifacts[key]
+                artifact = None
+            if artifact is not None:
+                self.hits += 1
+                artifact['last_used'] = time.time()
+                job.status, job.cached, job.path, job.size_bytes = 'completed', True, artifact['path'], artifact['size']
+                job.finished_at = job.created_at
+                job.finished.set()
+            elif key in self._building:
+                job = self._jobs[self._building[key]]
+            else:
+                self.misses += 1
+                self._building[key] = job.id
+                path = os.path.join(directory, f"{job.id}.{EXPORT_FORMATS[export_format]['extension']}")
+                self._executor.submit(self._run, job, key, path)
+            self._jobs[job.id] = job
+            return job
+    
+    def _run(self, job, key, path):
+        # Keep the extension on the partial file; GDAL checks it when writing GeoPackages
+        root, extension = os.path.splitext(path)
+        partial_path = f'{root}.part{extension}'
+        with app.app_context():
+            try:
+                job.status = 'running'
+                job.total = db.session.query(sa.func.count(ReferencePoint.id)).scalar() + \
+                    db.session.query(sa.func.count(SurveyPolygon.id)).scalar()
+                
+                def progress(count):
+                    job.done += count
+                
+                EXPORT_FORMATS[job.format]['writer'](partial_path, progress=progress, **dict(job.options))
+                os.replace(partial_path, path)
+                size = os.path.getsize(path)
+                with self._lock:
+                    job.path, job.size_bytes = path, size
+                    # Rows changed mid-export may be half reflected; keep the file for this job only
+                    if dataset_version == job.dataset_version:
+                        self._artifacts[key] = {'path': path, 'size': size, 'created': time.time(), 'last_used': time.time()}
+                    else:
+                        self._artifacts[(job.id,)] = {'path': path, 'size': size, 'created': time.time(), 'last_used': time.time()}
+                    job.status = 'completed'
+            except Exception as e:
+                job.status = 'failed'
+                job.error = str(e)
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+            finally:
+                job.finished_at = time.time()
+                observe_export(job.format, job.status, job.done, job.finished_at - job.created_at)
+                with self._lock:
+                    self._building.pop(key, None)
+                    self._evict()
+                job.finished.set()
+    
+    def _evict(self):
+        """Drop expired artifacts, then least recently used ones until under the size limit (lock held)"""
+        now = time.time()
+        max_age = app.config['EXPORT_CACHE_MAX_AGE_SECONDS']
+        by_use = sorted(self._artifacts.items(), key=lambda item: item[1]['last_used'])
+        total = sum(artifact['size'] for artifact in self._artifacts.values())
+        for key, artifact in by_use:
+            if now - artifact['created'] <= max_age and total <= app.config['EXPORT_CACHE_MAX_BYTES']:
+                continue
+            del self._artifacts[key]
+            total -= artifact['size']
+            self.evictions += 1
+            if os.path.exists(artifact['path']):
+                os.remove(artifact['path'])
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at and now - job.finished_at > max_age:
+                del self._jobs[job_id]
+    
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def jobs(self):
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+    
+    def artifact_path(self, job):
+        """Path of a completed job's file, or None once it has been evicted or deleted"""
+        with self._lock:
+            for key, artifact in self._artifacts.items():
+                if artifact['path'] == job.path:
+                    if not os.path.exists(job.path):
+                        del self._artifacts[key]
+                        return None
+                    artifact['last_used'] = time.time()
+                    return job.path
+            return None
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'artifacts': len(self._artifacts),
+                'bytes': sum(artifact['size'] for artifact in self._artifacts.values()),
+                'max_bytes': app.config['EXPORT_CACHE_MAX_BYTES'],
+                'max_age_seconds': app.config['EXPORT_CACHE_MAX_AGE_SECONDS'],
+                'jobs': len(self._jobs),
+                'running': len(self._building),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions
+            }
+
+export_manager = ExportManager()
+
+def send_export(export_format):
+    """Build (or reuse) an export and send it as a download
+    
+    Waits up to EXPORT_SYNC_WAIT_SECONDS for the file; a longer export is
+    answered with 202 and the job's Location, like POST /api/export/jobs.
+    """
+    try:
+        options = parse_export_options(export_format, request.args)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid export options: {str(e)}'}), 400
     
+    deadline = time.monotonic() + app.config['EXPORT_SYNC_WAIT_SECONDS']
+    # A cached file deleted from outside is dropped by artifact_path, so the second submit rebuilds it
+    for attempt in range(2):
+        job = export_manager.submit(export_format, options)
+        if not job.finished.wait(timeout=max(deadline - time.monotonic(), 0)):
+            return jsonify(job.to_dict()), 202, {'Location': url_for('get_export_job', job_id=job.id)}
+        path = export_manager.artifact_path(job) if job.status == 'completed' else None
+        if path is not None or job.status != 'completed':
+            break
+    if path is None:
+        return jsonify({'error': f'Export failed: {job.error or "file was evicted"}'}), 500
     return send_file(
-        temp_file.name,
-        mimetype='application/dxf',
+        path,
+        mimetype=EXPORT_FORMATS[export_format]['mimetype'],
         as_attachment=True,
-        download_name=f'survey_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.dxf'
+        etag=False,  # dataset_conditional sets the ETag
+        download_name=f'survey_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{EXPORT_FORMATS[export_format]["extension"]}'
     )
 
-@app.route('/api/import/csv', methods=['POST'])
-def import_csv():
-    """Import points from CSV file"""
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
+@app.route('/api/export/kml')
+@dataset_conditional
+def export_kml():
+    """Export points and polygons to KML; ?tolerance= or ?zoom= exports simplified polygon outlines"""
+    return send_export('kml')
+
+@app.route('/api/export/dxf')
+@dataset_conditional
+def export_dxf():
+    """Export points and polygons to DXF format"""
+    return send_export('dxf')
+
+@app.route('/api/export/geoparquet')
+@dataset_conditional
+def export_geoparquet():
+    """Export points and polygons to one GeoParquet file; ?layer=points or ?layer=polygons exports one kind"""
+    return send_export('geoparquet')
+
+@app.route('/api/export/gpkg')
+@dataset_conditional
+def export_gpkg():
+    """Export points and polygons to the layers of a GeoPackage; ?layer= exports one of them"""
+    return send_export('gpkg')
+
+@app.route('/api/export/jobs', methods=['POST'])
+def create_export_job():
+    """Start a background KML or DXF export; poll the returned job and download it when completed"""
+    data = request.get_json(silent=True) or {}
+    args = {**request.args.to_dict(), **data}
+    try:
+        options = parse_export_options(args.get('format'), args)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid export options: {str(e)}'}), 400
     
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+    job = export_manager.submit(args['format'], options)
+    return jsonify(job.to_dict()), 202, {'Location': url_for('get_export_job', job_id=job.id)}
+
+@app.route('/api/export/jobs', methods=['GET'])
+def list_export_jobs():
+    return jsonify([job.to_dict() for job in export_manager.jobs()])
+
+@app.route('/api/export/jobs/<job_id>', methods=['GET'])
+def get_export_job(job_id):
+    job = export_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Export job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/export/jobs/<job_id>/download')
+def download_export_job(job_id):
+    job = export_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Export job not found'}), 404
+    if job.status != 'completed':
+        return jsonify({'error': f'Export job is {job.status}', 'job': job.to_dict()}), 409
+    path = export_manager.artifact_path(job)
+    if path is None:
+        return jsonify({'error': 'Export file has expired; submit the export again'}), 410
+    return send_file(
+        path,
+        mimetype=EXPORT_FORMATS[job.format]['mimetype'],
+        as_attachment=True,
+        download_name=f'survey_data_{job.id[:8]}.{EXPORT_FORMATS[job.format]["extension"]}'
+    )
+
+def insert_polygon_levels(polygon_ids, rings):
+    """Bulk insert the simplification levels of newly written polygon rings"""
+    levels = [
+        {'polygon_id': polygon_id, 'tolerance_m': tolerance_m, 'vertices': pack_vertices(level), 'vertex_count': len(level)}
+        for polygon_id, ring in zip(polygon_ids, rings)
+        for tolerance_m, level in polygon_lod_levels(ring)
+    ]
+    if levels:
+        db.session.execute(SurveyPolygonLevel.__table__.insert(), levels)
+
+def bulk_insert(table, rows):
+    """INSERT many rows with one executemany and return their new IDs in order"""
+    if not rows:
+        return []
+    result = db.session.execute(sa.insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)
+    return [row[0] for row in result]
+
+def first_errors(checks, size):
+    """Per row, the message of the first failed check in [(failed mask, message), ...], or None"""
+    errors = np.full(size, None, dtype=object)
+    failed = np.zeros(size, dtype=bool)
+    for mask, message in checks:
+        mask = np.asarray(mask, dtype=bool) & ~failed
+        errors[mask] = message
+        failed |= mask
+    return errors
+
+def csv_column(chunk, name):
+    import pandas as pd
+    return chunk[name] if name in chunk else pd.Series('', index=chunk.index)
+
+def parse_csv_points(chunk):
+    """Validate the Point rows of a CSV chunk; returns (insert rows, [(row number, error), ...])"""
+    import pandas as pd
+    rows = chunk[chunk['Type'] == 'Point']
+    names = rows['Name'].str.strip()
+    lats = pd.to_numeric(csv_column(rows, 'Latitude'), errors='coerce').to_numpy(dtype=float)
+    lons = pd.to_numeric(csv_column(rows, 'Longitude'), errors='coerce').to_numpy(dtype=float)
+    elevation_text = csv_column(rows, 'Elevation').str.strip()
+    elevations = pd.to_numeric(elevation_text, errors='coerce').to_numpy(dtype=float)
+    errors = first_errors([
+        (names == '', 'Name is required'),
+        (~np.isfinite(lats), 'Latitude is not a number'),
+        (~np.isfinite(lons), 'Longitude is not a number'),
+        (np.abs(lats) > 90, 'Latitude must be between -90 and 90'),
+        (np.abs(lons) > 180, 'Longitude must be between -180 and 180'),
+        ((elevation_text != '').to_numpy() & ~np.isfinite(elevations), 'Elevation is not a number'),
+    ], len(rows))
+    
+    valid = np.array([error is None for error in errors], dtype=bool)
+    point_types = csv_column(rows, 'Point_Type').replace('', 'waypoint')
+    inserts = [
+        {'name': name, 'description': description, 'latitude': lat, 'longitude': lon,
+         'elevation': None if math.isnan(elevation) else elevation, 'point_type': point_type}
+        for name, description, lat, lon, elevation, point_type in zip(
+            rows['Name'][valid], csv_column(rows, 'Description')[valid], lats[valid].tolist(), lons[valid].tolist(),
+            elevations[valid].tolist(), point_types[valid])
+    ]
+    row_numbers = rows.index.to_numpy() + 1
+    return inserts, list(zip(row_numbers[~valid].tolist(), errors[~valid]))
+
+def parse_csv_polygons(chunk):
+    """Validate the Polygon rows of a CSV chunk; returns (insert rows, vertex arrays, errors)"""
+    rows = chunk[chunk['Type'] == 'Polygon']
+    inserts, rings, errors = [], [], []
+    # Coordinates are stored in the Latitude field as "lat,lon; lat,lon; ..."
+    for row_number, name, description, coord_str, polygon_type in zip(
+            (rows.index + 1).tolist(), rows['Name'], csv_column(rows, 'Description'),
+            csv_column(rows, 'Latitude'), csv_column(rows, 'Point_Type')):
+        try:
+            ring = np.array(coord_str.replace(';', ',').split(','), dtype=float).reshape(-1, 2)
+        except ValueError:
+            errors.append((row_number, 'Coordinates must be "lat,lon; lat,lon; ..."'))
+            continue
+        if not name.strip():
+            errors.append((row_number, 'Name is required'))
+        elif len(ring) < 3:
+            errors.append((row_number, 'A polygon needs at least 3 vertices'))
+        elif not np.isfinite(ring).all() or (np.abs(ring) > [90, 180]).any():
+            errors.append((row_number, 'Coordinates out of range'))
+        else:
+            rings.append(ring)
+            inserts.append(polygon_insert_row(name, description, ring, polygon_type or 'survey_area'))
+    
+    measure_polygon_inserts(inserts, rings)
+    return inserts, rings, errors
+
+def polygon_vertex_values(ring):
+    """survey_polygon vertex buffer, count and bounding-box values for a [lat, lon] vertex array"""
+    return {
+        'vertices': pack_vertices(ring), 'vertex_count': len(ring),
+        'min_lat': ring[:, 0].min(), 'min_lon': ring[:, 1].min(),
+        'max_lat': ring[:, 0].max(), 'max_lon': ring[:, 1].max()
+    }
+
+def polygon_insert_row(name, description, ring, polygon_type):
+    """survey_polygon insert values for a validated [lat, lon] vertex array, without metrics"""
+    return {'name': name, 'description': description, **polygon_vertex_values(ring), 'polygon_type': polygon_type}
+
+def measure_polygon_inserts(inserts, rings):
+    areas, perimeters = calculate_polygon_metrics_parallel(rings)
+    for insert, area_sqm, perimeter_m in zip(inserts, areas.tolist(), perimeters.tolist()):
+        insert['area_sqm'], insert['perimeter_m'] = area_sqm, perimeter_m
+
+def frame_text(frame, name, default):
+    """A column looked up case-insensitively as strings, with missing values replaced by ``default``"""
+    import pandas as pd
+    columns = {column.lower(): column for column in frame.columns}
+    if name not in columns:
+        return pd.Series(default, index=frame.index, dtype=object)
+    values = frame[columns[name]]
+    return values.astype(str).where(values.notna(), default)
+
+def parse_frame_points(frame):
+    """Validate the Point features of a GeoDataFrame chunk; returns (insert rows, [(row number, error), ...])"""
+    import pandas as pd
+    rows = frame[frame.geom_type == 'Point']
+    lats, lons = rows.geometry.y.to_numpy(dtype=float), rows.geometry.x.to_numpy(dtype=float)
+    columns = {column.lower(): column for column in rows.columns}
+    elevations = (pd.to_numeric(rows[columns['elevation']], errors='coerce').to_numpy(dtype=float)
+                  if 'elevation' in columns else np.full(len(rows), np.nan))
+    errors = first_errors([
+        (~np.isfinite(lats) | ~np.isfinite(lons), 'Point has no coordinates'),
+        (np.abs(lats) > 90, 'Latitude must be between -90 and 90'),
+        (np.abs(lons) > 180, 'Longitude must be between -180 and 180'),
+    ], len(rows))
+    
+    valid = np.array([error is None for error in errors], dtype=bool)
+    inserts = [
+        {'name': name, 'description': description, 'latitude': lat, 'longitude': lon,
+         'elevation': None if math.isnan(elevation) else elevation, 'point_type': point_type}
+        for name, description, lat, lon, elevation, point_type in zip(
+            frame_text(rows, 'name', 'Imported Point')[valid], frame_text(rows, 'description', '')[valid],
+            lats[valid].tolist(), lons[valid].tolist(), elevations[valid].tolist(),
+            frame_text(rows, 'point_type', 'waypoint')[valid])
+    ]
+    row_numbers = rows.index.to_numpy() + 1
+    return inserts, list(zip(row_numbers[~valid].tolist(), errors[~valid]))
+
+def parse_frame_polygons(frame):
+    """Validate the Polygon features of a GeoDataFrame chunk; returns (insert rows, vertex arrays, errors)
     
+    Only the exterior ring is kept, as survey polygons have no holes, and it is
+    stored open like rings created through the API.
+    """
+    rows = frame[frame.geom_type == 'Polygon']
+    coords, ring_index = shapely.get_coordinates(shapely.get_exterior_ring(rows.geometry.values), return_index=True)
+    counts = np.bincount(ring_index, minlength=len(rows))
+    inserts, rings, errors = [], [], []
+    for row_number, name, description, ring, polygon_type in zip(
+            (rows.index + 1).tolist(), frame_text(rows, 'name', 'Imported Polygon'),
+            frame_text(rows, 'description', ''), np.split(coords[:, ::-1], np.cumsum(counts)[:-1]),
+            frame_text(rows, 'polygon_type', 'survey_area')):
+        ring = ring[:-1]
+        if len(ring) < 3:
+            errors.append((row_number, 'A polygon needs at least 3 vertices'))
+        elif not np.isfinite(ring).all() or (np.abs(ring) > [90, 180]).any():
+            errors.append((row_number, 'Coordinates out of range'))
+        else:
+            rings.append(np.ascontiguousarray(ring))
+            inserts.append(polygon_insert_row(name, description, rings[-1], polygon_type))
+    
+    measure_polygon_inserts(inserts, rings)
+    return inserts, rings, errors
+
+def insert_import_rows(job, point_inserts, polygon_inserts, rings, first_row, last_row):
+    """Insert one chunk of validated rows and their polygon levels in a single transaction
+    
+    A failed chunk is rolled back and reported against rows first_row-last_row.
+    """
     try:
-        # Read CSV
-        csv_data = file.read().decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(csv_data))
-        
-        imported_points = 0
-        imported_polygons = 0
-        
-        for row in csv_reader:
-            if row.get('Type') == 'Point':
-                point = ReferencePoint(
-                    name=row['Name'],
-                    description=row.get('Description', ''),
-                    latitude=float(row['Latitude']),
-                    longitude=float(row['Longitude']),
-                    elevation=float(row['Elevation']) if row.get('Elevation') else None,
-                    point_type=row.get('Point_Type', 'waypoint')
-                )
-                db.session.add(point)
-                imported_points += 1
-            
-            elif row.get('Type') == 'Polygon':
-                # Parse coordinates from string format
-                coord_str = row['Latitude']  # Coordinates stored in Latitude field for polygons
-                coords = []
-                for coord_pair in coord_str.split('; '):
-                    lat, lon = map(float, coord_pair.split(','))
-                    coords.append([lat, lon])
-                
-                area_sqm, perimeter_m = calculate_polygon_metrics(coords)
-                
-                polygon = SurveyPolygon(
-                    name=row['Name'],
-                    description=row.get('Description', ''),
-                    coordinates=json.dumps(coords),
-                    area_sqm=area_sqm,
-                    perimeter_m=perimeter_m,
-                    polygon_type=row.get('Point_Type', 'survey_area')
-                )
-                db.session.add(polygon)
-                imported_polygons += 1
-        
+        set_point_utm(point_inserts)
+        point_ids = bulk_insert(ReferencePoint.__table__, point_inserts)
+        polygon_ids = bulk_insert(SurveyPolygon.__table__, polygon_inserts)
+        insert_polygon_levels(polygon_ids, rings)
+        record_changes('point', 'created', point_ids)
+        record_changes('polygon', 'created', polygon_ids)
         db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'imported_points': imported_points,
-            'imported_polygons': imported_polygons
-        })
-    
     except Exception as e:
-        return jsonify({'error': f'Import failed: {str(e)}'}), 400
+        db.session.rollback()
+        job.failed += len(point_inserts) + len(polygon_inserts)
+        job.report([{'row': first_row, 'error': f'Rows {first_row}-{last_row} not imported: {str(e)}'}])
+        return
+    
+    # Core inserts bypass the ORM session events, so update the indexes and listeners here
+    if point_index.built:
+        point_index.upsert_many(point_ids, shapely.points([row['longitude'] for row in point_inserts],
+                                                          [row['latitude'] for row in point_inserts]),
+                                [row['point_type'] for row in point_inserts])
+    if polygon_index.built:
+        polygon_index.upsert_many(polygon_ids, [polygon_geometry(ring) for ring in rings],
+                                  [row['polygon_type'] for row in polygon_inserts])
+    notify_dataset_changed(point_ids, polygon_ids)
+    job.imported_points += len(point_ids)
+    job.imported_polygons += len(polygon_ids)
 
-@app.route('/api/import/geojson', methods=['POST'])
-def import_geojson():
-    """Import data from GeoJSON file"""
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
+class ImportCancelled(Exception):
+    """Raised inside an import once its job has been asked to stop"""
+
+class ImportJob:
+    """Progress and outcome of one import, used by both synchronous requests and background jobs"""
     
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+    def __init__(self, import_format, filename=None):
+        self.id = uuid.uuid4().hex
+        self.format = import_format
+        self.filename = filename
+        self.path = None
+        self.size_bytes = None
+        self.bytes_read = 0
+        self.status = 'queued'
+        self.rows = 0
+        self.imported_points = 0
+        self.imported_polygons = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = threading.Event()
+        self.finished = threading.Event()
     
-    try:
-        geojson_data = json.loads(file.read().decode('utf-8'))
+    def report(self, errors):
+        """Record row errors, keeping at most IMPORT_MAX_ERRORS"""
+        room = app.config['IMPORT_MAX_ERRORS'] - len(self.errors)
+        self.errors.extend(errors[:max(room, 0)])
+    
+    def check_cancelled(self):
+        if self.cancel_requested.is_set():
+            raise ImportCancelled()
+    
+    def result(self):
+        seconds = (self.finished_at or time.time()) - (self.started_at or self.created_at)
+        return {
+            'success': True,
+            'imported_points': self.imported_points,
+            'imported_polygons': self.imported_polygons,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': self.errors,
+            'rows': self.rows,
+            'seconds': seconds,
+            'rows_per_second': self.rows / seconds if seconds else None
+        }
+    
+    def to_dict(self):
+        data = self.result()
+        del data['success']
+        data.update({
+            'id': self.id,
+            'format': self.format,
+            'filename': self.filename,
+            'status': self.status,
+            'progress': 1.0 if self.status == 'completed' else (
+                min(self.bytes_read / self.size_bytes, 1.0) if self.size_bytes else 0.0),
+            'bytes_read': self.bytes_read,
+            'size_bytes': self.size_bytes,
+            'error': self.error,
+            'created_at': datetime.utcfromtimestamp(self.created_at).isoformat(),
+            'finished_at': datetime.utcfromtimestamp(self.finished_at).isoformat() if self.finished_at else None
+        })
+        return data
+
+def import_csv_file(stream, job):
+    """Bulk import points and polygons from a CSV stream in the export layout
+    
+    The file is parsed in chunks of IMPORT_CSV_CHUNK_ROWS with pandas,
+    validated with vectorized checks and inserted with executemany, one
+    transaction per chunk. Invalid rows are reported (1-based data row numbers)
+    and skipped instead of aborting the import.
+    """
+    import pandas as pd
+    chunks = pd.read_csv(stream, dtype=str, keep_default_na=False, encoding='utf-8-sig',
+                         chunksize=app.config['IMPORT_CSV_CHUNK_ROWS'])
+    for chunk in chunks:
+        job.check_cancelled()
+        if 'Type' not in chunk or 'Name' not in chunk:
+            raise ValueError('CSV must have Type and Name columns')
+        job.rows += len(chunk)
+        job.skipped += int((~chunk['Type'].isin(['Point', 'Polygon'])).sum())
         
-        imported_points = 0
-        imported_polygons = 0
+        point_inserts, point_errors = parse_csv_points(chunk)
+        polygon_inserts, rings, polygon_errors = parse_csv_polygons(chunk)
+        job.failed += len(point_errors) + len(polygon_errors)
+        job.report([{'row': row, 'error': message} for row, message in sorted(point_errors + polygon_errors)])
         
-        for feature in geojson_data.get('features', []):
-            geometry = feature['geometry']
-            properties = feature.get('properties', {})
-            
-            if geometry['type'] == 'Point':
-                lon, lat = geometry['coordinates']
-                point = ReferencePoint(
-                    name=properties.get('name', 'Imported Point'),
-                    description=properties.get('description', ''),
-                    latitude=lat,
-                    longitude=lon,
-                    elevation=properties.get('elevation'),
-                    point_type=properties.get('point_type', 'waypoint')
-                )
-                db.session.add(point)
-                imported_points += 1
-            
-            elif geometry['type'] == 'Polygon':
-                # Convert from [lon, lat] to [lat, lon] format
-                coords = [[coord[1], coord[0]] for coord in geometry['coordinates'][0]]
-                
-                area_sqm, perimeter_m = calculate_polygon_metrics(coords)
-                
-                polygon = SurveyPolygon(
-                    name=properties.get('name', 'Imported Polygon'),
-                    description=properties.get('description', ''),
-                    coordinates=json.dumps(coords),
-                    area_sqm=area_sqm,
-                    perimeter_m=perimeter_m,
-                    polygon_type=properties.get('polygon_type', 'survey_area')
-                )
-                db.session.add(polygon)
-                imported_polygons += 1
+        insert_import_rows(job, point_inserts, polygon_inserts, rings,
+                           int(chunk.index[0]) + 1, int(chunk.index[-1]) + 1)
+        job.bytes_read = stream.tell()
+
+def feature_text(properties, field, default):
+    """A feature property as text, with ``default`` for missing, null or blank values"""
+    value = properties.get(field)
+    return default if value is None or not str(value).strip() else str(value)
+
+def feature_to_model(feature, measure=True):
+    """Build a ReferencePoint or SurveyPolygon from a GeoJSON feature; None for other geometry types
+    
+    Raises ValueError for features the database would reject, such as non-numeric
+    or out-of-range coordinates. With ``measure=False`` polygon area and perimeter
+    are left for measure_polygons.
+    """
+    geometry = feature['geometry']
+    properties = feature.get('properties') or {}
+    
+    if geometry['type'] == 'Point':
+        try:
+            lon, lat = (float(value) for value in geometry['coordinates'][:2])
+        except (TypeError, ValueError):
+            raise ValueError('Point coordinates must be a [lon, lat] pair of numbers')
+        if not (abs(lat) <= 90 and abs(lon) <= 180):
+            raise ValueError('latitude must be within ±90 and longitude within ±180')
+        elevation = properties.get('elevation')
+        try:
+            elevation = None if elevation in (None, '') else float(elevation)
+        except (TypeError, ValueError):
+            raise ValueError('elevation must be a number')
+        return ReferencePoint(
+            name=feature_text(properties, 'name', 'Imported Point'),
+            description=feature_text(properties, 'description', ''),
+            latitude=lat,
+            longitude=lon,
+            elevation=elevation,
+            point_type=feature_text(properties, 'point_type', 'waypoint')
+        )
+    
+    if geometry['type'] == 'Polygon':
+        try:
+            ring = np.asarray([coord[:2] for coord in geometry['coordinates'][0]], dtype=float)
+        except (TypeError, ValueError, IndexError):
+            raise ValueError('Polygon coordinates must be [lon, lat] pairs of numbers')
+        if ring.ndim != 2 or ring.shape[1] != 2 or len(ring) < 3:
+            raise ValueError('A polygon needs at least 3 [lon, lat] vertices')
+        if not np.isfinite(ring).all() or (np.abs(ring) > [180, 90]).any():
+            raise ValueError('Coordinates out of range')
+        # Convert from [lon, lat] to [lat, lon] format
+        coords = ring[:, ::-1].tolist()
+        area_sqm, perimeter_m = calculate_polygon_metrics(coords) if measure else (None, None)
+        return SurveyPolygon(
+            name=feature_text(properties, 'name', 'Imported Polygon'),
+            description=feature_text(properties, 'description', ''),
+            coordinates=coords,
+            area_sqm=area_sqm,
+            perimeter_m=perimeter_m,
+            polygon_type=feature_text(properties, 'polygon_type', 'survey_area')
+        )
+    return None
+
+def iter_json_texts(stream, chunk_size=65536):
+    """Yield the JSON texts of an RFC 8142 (record-separator prefixed) or newline-delimited stream
+    
+    The separator is picked from the first non-blank character; only one record
+    is held in memory at a time.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    separator = None
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += decoder.decode(chunk, final=not chunk)
+        if separator is None and buffer.strip():
+            # str.strip() also removes the record separator, so only skip JSON whitespace here
+            separator = RECORD_SEPARATOR if buffer.lstrip(' \t\r\n')[0] == RECORD_SEPARATOR else '\n'
+        if separator is not None:
+            *texts, buffer = buffer.split(separator)
+            for text in texts:
+                if text.strip():
+                    yield text.strip()
+        if not chunk:
+            break
+    if buffer.strip():
+        yield buffer.strip()
+
+def import_geojson_seq(stream, job):
+    """Import a GeoJSON text sequence, committing every IMPORT_BATCH_SIZE features
+    
+    Records that do not parse, convert or validate, or that the database
+    rejects, are skipped and reported by their 1-based position, as RFC 8142
+    parsers are expected to recover from bad texts.
+    """
+    batch_size = app.config['IMPORT_BATCH_SIZE']
+    pending = []
+    
+    for record, text in enumerate(iter_json_texts(stream), start=1):
+        job.rows = record
+        try:
+            model = feature_to_model(json.loads(text), measure=False)
+        except Exception as e:
+            job.failed += 1
+            job.report([{'record': record, 'error': str(e)}])
+            continue
+        if model is None:
+            job.skipped += 1
+            continue
         
+        pending.append((record, model))
+        if len(pending) >= batch_size:
+            job.check_cancelled()
+            commit_import_records(job, pending)
+            job.bytes_read = stream.tell()
+            pending = []
+    job.check_cancelled()
+    commit_import_records(job, pending)
+    job.bytes_read = stream.tell()
+
+def commit_import_records(job, records):
+    """Commit a batch of (record number, model) pairs from a streamed import and count them
+    
+    If the batch fails, it is retried one record per transaction, so only the
+    records the database rejects are dropped and reported.
+    """
+    measure_polygons([model for _, model in records if isinstance(model, SurveyPolygon)])
+    db.session.add_all([model for _, model in records])
+    try:
         db.session.commit()
+        committed = records
+    except sa.exc.SQLAlchemyError:
+        db.session.rollback()
+        committed = []
+        for record, model in records:
+            # Rolled-back inserts keep the IDs they were given; let the database pick again
+            model.id = None
+            db.session.add(model)
+            try:
+                db.session.commit()
+                committed.append((record, model))
+            except sa.exc.SQLAlchemyError as e:
+                db.session.rollback()
+                job.failed += 1
+                job.report([{'record': record, 'error': str(getattr(e, 'orig', None) or e)}])
+    for _, model in committed:
+        if isinstance(model, ReferencePoint):
+            job.imported_points += 1
+        else:
+            job.imported_polygons += 1
+
+def import_geojson_collection(stream, job):
+    """Import a GeoJSON FeatureCollection in a single transaction"""
+    geojson_data = json.loads(stream.read().decode('utf-8'))
+    job.bytes_read = stream.tell()
+    
+    imported_points = 0
+    polygons = []
+    for feature in geojson_data.get('features', []):
+        job.check_cancelled()
+        job.rows += 1
+        model = feature_to_model(feature, measure=False)
+        if isinstance(model, ReferencePoint):
+            imported_points += 1
+        elif isinstance(model, SurveyPolygon):
+            polygons.append(model)
+        else:
+            job.skipped += 1
+            continue
+        db.session.add(model)
+    
+    measure_polygons(polygons)
+    db.session.commit()
+    job.imported_points, job.imported_polygons = imported_points, len(polygons)
+
+def import_geodataframe(frame, job):
+    """Bulk insert the points and polygons of a GeoDataFrame in chunks of IMPORT_FRAME_CHUNK_ROWS
+    
+    Frames in another CRS are reprojected to EPSG:4326 first. Other geometry
+    types are skipped. Row numbers count features across all frames of the job.
+    """
+    import pandas as pd
+    if frame.crs is not None and frame.crs.to_epsg() != WGS84_EPSG:
+        frame = frame.to_crs(epsg=WGS84_EPSG)
+    frame = frame.set_axis(pd.RangeIndex(job.rows, job.rows + len(frame)))
+    chunk_rows = app.config['IMPORT_FRAME_CHUNK_ROWS']
+    for start in range(0, len(frame), chunk_rows):
+        job.check_cancelled()
+        chunk = frame.iloc[start:start + chunk_rows]
+        job.rows += len(chunk)
+        job.skipped += int((~chunk.geom_type.isin(['Point', 'Polygon'])).sum())
         
-        return jsonify({
-            'success': True,
-            'imported_points': imported_points,
-            'imported_polygons': imported_polygons
-        })
+        point_inserts, point_errors = parse_frame_points(chunk)
+        polygon_inserts, rings, polygon_errors = parse_frame_polygons(chunk)
+        job.failed += len(point_errors) + len(polygon_errors)
+        job.report([{'row': row, 'error': message} for row, message in sorted(point_errors + polygon_errors)])
+        insert_import_rows(job, point_inserts, polygon_inserts, rings,
+                           int(chunk.index[0]) + 1, int(chunk.index[-1]) + 1)
+
+def import_geoparquet(stream, job):
+    """Import a GeoParquet file, such as one written by /api/export/geoparquet"""
+    import geopandas as gpd
+    frame = gpd.read_parquet(stream)
+    job.bytes_read = stream.seek(0, io.SEEK_END)
+    import_geodataframe(frame, job)
+
+def import_gpkg(stream, job):
+    """Import every layer of a GeoPackage
     
+    GDAL needs a file path, so uploads that are not already on disk are copied
+    to a temporary file first.
+    """
+    path = getattr(stream, 'name', None)
+    if isinstance(path, str) and os.path.exists(path):
+        return import_gpkg_layers(path, job)
+    with tempfile.NamedTemporaryFile(suffix='.gpkg') as copy:
+        shutil.copyfileobj(stream, copy)
+        copy.flush()
+        import_gpkg_layers(copy.name, job)
+
+def import_gpkg_layers(path, job):
+    import geopandas as gpd
+    import pyogrio
+    layers = [name for name, _ in pyogrio.list_layers(path)]
+    for number, layer in enumerate(layers, start=1):
+        import_geodataframe(gpd.read_file(path, layer=layer, engine='pyogrio', use_arrow=True), job)
+        # Progress is approximated by the share of layers read
+        job.bytes_read = (job.size_bytes or 0) * number // len(layers)
+
+IMPORTERS = {'csv': import_csv_file, 'geojson': import_geojson_collection, 'geojsonseq': import_geojson_seq,
+             'geoparquet': import_geoparquet, 'gpkg': import_gpkg}
+IMPORT_EXTENSIONS = {'csv': ('.csv',), 'geoparquet': ('.parquet', '.geoparquet'), 'gpkg': ('.gpkg',)}
+
+def detect_import_format(file, requested=None):
+    """Resolve an IMPORTERS format from the requested format, file extension or first byte
+    
+    A 'geojson' request is upgraded to 'geojsonseq' for text sequence files.
+    """
+    filename = file.filename.lower()
+    if requested is None:
+        requested = next((name for name, extensions in IMPORT_EXTENSIONS.items() if filename.endswith(extensions)), None)
+    if requested in IMPORT_EXTENSIONS:
+        return requested
+    if requested not in (None, 'geojson', 'geojsonseq'):
+        raise ValueError(f"format must be one of {', '.join(IMPORTERS)}")
+    first_byte = file.stream.read(1)
+    file.stream.seek(0)
+    if requested == 'geojsonseq' or filename.endswith(GEOJSON_SEQ_EXTENSIONS) or first_byte == RECORD_SEPARATOR.encode():
+        return 'geojsonseq'
+    return 'geojson'
+
+class ImportQueueFull(Exception):
+    """Raised when IMPORT_MAX_PENDING imports are already queued or running"""
+
+class ImportManager:
+    """Runs uploaded imports in the background on a bounded worker pool
+    
+    Uploads are saved to a temporary file so the request returns immediately.
+    At most IMPORT_WORKERS imports run at once and at most IMPORT_MAX_PENDING may
+    be queued or running, so a few large uploads cannot tie up the request workers.
+    """
+    
+    def __init__(self):
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, import_format, file):
+        with self._lock:
+            self._prune()
+            active = sum(1 for job in self._jobs.values() if not job.finished.is_set())
+            if active >= app.config['IMPORT_MAX_PENDING']:
+                raise ImportQueueFull(f"{active} imports are already queued or running")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=app.config['IMPORT_WORKERS'], thread_name_prefix='import')
+            job = ImportJob(import_format, file.filename)
+            self._jobs[job.id] = job
+        
+        try:
+            fd, job.path = tempfile.mkstemp(prefix='import-', suffix=os.path.splitext(file.filename)[1])
+            os.close(fd)
+            file.save(job.path)
+            job.size_bytes = os.path.getsize(job.path)
+        except Exception as e:
+            job.status, job.error = 'failed', str(e)
+            self._finish(job)
+            raise
+        self._executor.submit(self._run, job)
+        return job
+    
+    def _run(self, job):
+        with app.app_context():
+            try:
+                job.check_cancelled()
+                job.status = 'running'
+                job.started_at = time.time()
+                with open(job.path, 'rb') as stream:
+                    IMPORTERS[job.format](stream, job)
+                job.status = 'completed'
+            except ImportCancelled:
+                db.session.rollback()
+                job.status = 'cancelled'
+            except Exception as e:
+                db.session.rollback()
+                job.status = 'failed'
+                job.error = str(e)
+            finally:
+                self._finish(job)
+    
+    def _finish(self, job):
+        job.finished_at = time.time()
+        if job.path and os.path.exists(job.path):
+            os.remove(job.path)
+        observe_import(job)
+        job.finished.set()
+    
+    def _prune(self):
+        cutoff = time.time() - app.config['IMPORT_JOB_RETENTION_SECONDS']
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at and job.finished_at < cutoff:
+                del self._jobs[job_id]
+    
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def jobs(self):
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+    
+    def cancel(self, job_id):
+        """Ask a job to stop; CSV and sequence imports keep the batches already committed"""
+        job = self.get(job_id)
+        if job is not None and not job.finished.is_set():
+            job.cancel_requested.set()
+        return job
+
+import_manager = ImportManager()
+
+def uploaded_file():
+    """Return (file, None) for the request's 'file' upload, or (None, error response)"""
+    if 'file' not in request.files:
+        return None, (jsonify({'error': 'No file provided'}), 400)
+    file = request.files['file']
+    if file.filename == '':
+        return None, (jsonify({'error': 'No file selected'}), 400)
+    return file, None
+
+def run_import(import_format, file):
+    """Import an upload in this request, or as a background job with ?async=1"""
+    if request.args.get('async'):
+        try:
+            job = import_manager.submit(import_format, file)
+        except ImportQueueFull as e:
+            return jsonify({'error': f'Import queue is full: {str(e)}'}), 429
+        return jsonify(job.to_dict()), 202, {'Location': url_for('get_import_job', job_id=job.id)}
+    
+    job = ImportJob(import_format, file.filename)
+    job.status = 'running'
+    job.started_at = time.time()
+    try:
+        IMPORTERS[import_format](file.stream, job)
+        job.status = 'completed'
     except Exception as e:
+        db.session.rollback()
+        job.status = 'failed'
+        return jsonify({'error': f'Import failed: {str(e)}'}), 400
+    finally:
+        job.finished_at = time.time()
+        observe_import(job)
+    return jsonify(job.result())
+
+@app.route('/api/import/csv', methods=['POST'])
+def import_csv():
+    """Bulk import points and polygons from a CSV file; ?async=1 runs it as a background job"""
+    file, error = uploaded_file()
+    if error:
+        return error
+    return run_import('csv', file)
+
+@app.route('/api/import/geojson', methods=['POST'])
+def import_geojson():
+    """Import data from a GeoJSON file or, streamed in batches, a GeoJSON text sequence
+    
+    Sequences are recognised by their file extension, ``?format=geojsonseq`` or a
+    leading record separator. ``?async=1`` runs the import as a background job.
+    """
+    file, error = uploaded_file()
+    if error:
+        return error
+    try:
+        import_format = detect_import_format(file, request.args.get('format') or 'geojson')
+    except ValueError as e:
         return jsonify({'error': f'Import failed: {str(e)}'}), 400
+    return run_import(import_format, file)
+
+@app.route('/api/import/geoparquet', methods=['POST'])
+def import_geoparquet_file():
+    """Bulk import points and polygons from a GeoParquet file; ?async=1 runs it as a background job"""
+    file, error = uploaded_file()
+    if error:
+        return error
+    return run_import('geoparquet', file)
+
+@app.route('/api/import/gpkg', methods=['POST'])
+def import_gpkg_file():
+    """Bulk import points and polygons from every layer of a GeoPackage; ?async=1 runs it as a background job"""
+    file, error = uploaded_file()
+    if error:
+        return error
+    return run_import('gpkg', file)
+
+@app.route('/api/import/jobs', methods=['POST'])
+def create_import_job():
+    """Start a background import of an uploaded CSV, GeoJSON, GeoJSON text sequence, GeoParquet or GeoPackage file"""
+    file, error = uploaded_file()
+    if error:
+        return error
+    try:
+        import_format = detect_import_format(file, request.form.get('format') or request.args.get('format'))
+        job = import_manager.submit(import_format, file)
+    except ValueError as e:
+        return jsonify({'error': f'Import failed: {str(e)}'}), 400
+    except ImportQueueFull as e:
+        return jsonify({'error': f'Import queue is full: {str(e)}'}), 429
+    return jsonify(job.to_dict()), 202, {'Location': url_for('get_import_job', job_id=job.id)}
+
+@app.route('/api/import/jobs', methods=['GET'])
+def list_import_jobs():
+    return jsonify([job.to_dict() for job in import_manager.jobs()])
+
+@app.route('/api/import/jobs/<job_id>', methods=['GET'])
+def get_import_job(job_id):
+    job = import_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/import/jobs/<job_id>/events')
+def import_job_events(job_id):
+    """Stream job progress as server-sent events until the job finishes
+    
+    The stream ends after IMPORT_EVENTS_MAX_SECONDS even if the job is still
+    running, so it never holds a sync worker for a whole import; EventSource
+    clients reconnect on their own after the ``retry`` delay. The page polls
+    GET /api/import/jobs/<id> instead.
+    """
+    job = import_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Import job not found'}), 404
+    
+    def generate():
+        deadline = time.monotonic() + app.config['IMPORT_EVENTS_MAX_SECONDS']
+        yield 'retry: 2000\n\n'
+        while True:
+            finished = job.finished.wait(timeout=0.5)
+            yield f"data: {json.dumps(job.to_dict())}\n\n"
+            if finished or time.monotonic() >= deadline:
+                return
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/import/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_import_job(job_id):
+    job = import_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job.to_dict())
+
+def recompute_polygon_metrics(batch_size=5000):
+    """Recompute area and perimeter for every stored polygon; returns the number of polygons
+    
+    Polygons are read by ID in batches, measured on the metrics process pool and
+    written back with one executemany UPDATE and commit per batch.
+    """
+    table = SurveyPolygon.__table__
+    update = (table.update().where(table.c.id == sa.bindparam('polygon_id'))
+              .values(area_sqm=sa.bindparam('area'), perimeter_m=sa.bindparam('perimeter')))
+    last_id = 0
+    updated = 0
+    while True:
+        rows = db.session.execute(
+            sa.select(SurveyPolygon.id, SurveyPolygon.vertices)
+            .where(SurveyPolygon.id > last_id).order_by(SurveyPolygon.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        ids = [row.id for row in rows]
+        areas, perimeters = calculate_polygon_metrics_parallel([unpack_vertices(row.vertices) for row in rows])
+        db.session.execute(update, [
+            {'polygon_id': polygon_id, 'area': area_sqm, 'perimeter': perimeter_m}
+            for polygon_id, area_sqm, perimeter_m in zip(ids, areas.tolist(), perimeters.tolist())
+        ])
+        record_changes('polygon', 'updated', ids)
+        db.session.commit()
+        # Geometry is unchanged, so only the rendered caches need to know
+        notify_dataset_changed([], ids)
+        updated += len(ids)
+        last_id = ids[-1]
+
+@app.cli.command('recompute-metrics')
+@click.option('--batch-size', default=5000, show_default=True, help='Polygons measured and updated per transaction')
+def recompute_metrics_command(batch_size):
+    """Recompute area and perimeter for every stored polygon"""
+    start = time.perf_counter()
+    updated = recompute_polygon_metrics(batch_size)
+    click.echo(f'Recomputed metrics for {updated} polygons in {time.perf_counter() - start:.1f}s')
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create or upgrade the database schema"""
+    start = time.perf_counter()
+    init_db()
+    click.echo(f'Database schema ready in {time.perf_counter() - start:.1f}s')
+
+def create_app():
+    """Return the application with its database ready, e.g. ``gunicorn 'app:create_app()'``
+    
+    Importing this module registers the routes but does not touch the database.
+    Unless INIT_SCHEMA_ON_STARTUP is off, the schema is created or upgraded here.
+    With several workers, run ``flask --app app init-db`` once per deployment and
+    start them with TOPOGRAPHY_INIT_SCHEMA=0 instead.
+    """
+    with app.app_context():
+        prepare_database()
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Export and import times for CSV, GeoJSON, GeoParquet and GeoPackage.
+
+Runs against a scratch SQLite database, never the app's own. Run from the
+repository root:
+
+    python benchmarks/bench_geo_formats.py --points 10000 100000 --polygons 2000
+"""
+import argparse
+import atexit
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCRATCH_DIR = tempfile.mkdtemp(prefix='bench-geo-formats-')
+atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+os.environ['TOPOGRAPHY_DATABASE_URL'] = 'sqlite:///' + os.path.join(SCRATCH_DIR, 'bench.db')
+
+from app import (create_app, db, ReferencePoint, SurveyPolygon, SurveyPolygonLevel,  # noqa: E402
+                 point_index, polygon_index, notify_dataset_changed)
+from synthetic import SurveyDataset  # noqa: E402
+
+app = create_app()
+
+FORMATS = [
+    # (label, export URL, import URL, upload file name)
+    ('csv', '/api/export/csv', '/api/import/csv', 'data.csv'),
+    ('geojson', '/api/export/geojson', '/api/import/geojson', 'data.geojson'),
+    ('geojsonseq', '/api/export/geojson?format=geojsonseq', '/api/import/geojson', 'data.geojsons'),
+    ('geoparquet', '/api/export/geoparquet', '/api/import/geoparquet', 'data.parquet'),
+    ('gpkg', '/api/export/gpkg', '/api/import/gpkg', 'data.gpkg'),
+]
+
+
+def clear_database():
+    SurveyPolygonLevel.query.delete()
+    SurveyPolygon.query.delete()
+    ReferencePoint.query.delete()
+    db.session.commit()
+    # Bulk deletes skip the session events, so reset the indexes and caches by hand
+    point_index.invalidate()
+    polygon_index.invalidate()
+    notify_dataset_changed(None, None)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(client, points, polygons, vertices):
+    results = {'points': points, 'polygons': polygons, 'vertices': vertices, 'formats': {}}
+    clear_database()
+    dataset = SurveyDataset(points, polygons, vertices)
+    response = client.post('/api/import/csv', data={'file': (io.BytesIO(dataset.csv_bytes()), 'seed.csv')})
+    assert response.status_code == 200, response.get_json()
+
+    exported = {}
+    for label, export_url, _, _ in FORMATS:
+        # Streamed exports are only produced as the body is read, so read it inside the timing
+        seconds, exported[label] = timed(lambda: client.get(export_url).get_data())
+        results['formats'][label] = {'export_s': seconds, 'size_bytes': len(exported[label])}
+
+    for label, _, import_url, filename in FORMATS:
+        clear_database()
+        seconds, response = timed(lambda: client.post(import_url, data={'file': (io.BytesIO(exported[label]), filename)}))
+        body = response.get_json()
+        assert response.status_code == 200 and body['imported_points'] == points, body
+        results['formats'][label]['import_s'] = seconds
+        results['formats'][label]['import_rows_per_s'] = (points + polygons) / seconds
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--polygons', type=int, default=2000)
+    parser.add_argument('--vertices', type=int, default=32, help='vertices per synthetic polygon')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    with app.app_context():
+        client = app.test_client()
+        runs = [run(client, points, args.polygons, args.vertices) for points in args.points]
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return
+
+    for r in runs:
+        print(f"{r['points']} points, {r['polygons']} polygons x {r['vertices']} vertices")
+        print(f"  {'format':<11} {'export s':>9} {'size MB':>9} {'import s':>9} {'import rows/s':>14}")
+        for label, f in r['formats'].items():
+            print(f"  {label:<11} {f['export_s']:>9.2f} {f['size_bytes'] / 1e6:>9.2f} {f['import_s']:>9.2f} "
+                  f"{f['import_rows_per_s']:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Throughput of the batch geodesic inverse versus the per-pair path.
+
+Run from the repository root:
+
+    python benchmarks/bench_geodesic_batch.py --pairs 1000 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, calculate_azimuth_distance, calculate_azimuth_distance_arrays  # noqa: E402
+
+
+def random_pairs(count, seed=42):
+    rng = np.random.default_rng(seed)
+    lat1 = rng.uniform(-60, 60, count)
+    lon1 = rng.uniform(-180, 180, count)
+    # Survey legs are short: keep the second point within ~5 km of the first
+    lat2 = lat1 + rng.uniform(-0.05, 0.05, count)
+    lon2 = lon1 + rng.uniform(-0.05, 0.05, count)
+    return lat1, lon1, lat2, lon2
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(count, http_single_limit):
+    lat1, lon1, lat2, lon2 = random_pairs(count)
+    client = app.test_client()
+    results = {'pairs': count}
+
+    results['per_pair_function_s'] = timed(lambda: [
+        calculate_azimuth_distance(a, b, c, d)
+        for a, b, c, d in zip(lat1.tolist(), lon1.tolist(), lat2.tolist(), lon2.tolist())
+    ])
+    results['vectorized_function_s'] = timed(lambda: calculate_azimuth_distance_arrays(lat1, lon1, lat2, lon2))
+
+    # Per-pair HTTP is extrapolated from a sample so large runs finish in reasonable time
+    sample = min(count, http_single_limit)
+    elapsed = timed(lambda: [
+        client.post('/api/calculate/azimuth_distance', json={'lat1': a, 'lon1': b, 'lat2': c, 'lon2': d})
+        for a, b, c, d in zip(lat1[:sample].tolist(), lon1[:sample].tolist(), lat2[:sample].tolist(), lon2[:sample].tolist())
+    ])
+    results['per_pair_http_s'] = elapsed * count / sample
+
+    body = {'lat1': lat1.tolist(), 'lon1': lon1.tolist(), 'lat2': lat2.tolist(), 'lon2': lon2.tolist()}
+    results['batch_http_s'] = timed(lambda: client.post('/api/calculate/azimuth_distance/batch', json=body))
+
+    for key in ('per_pair_function_s', 'vectorized_function_s', 'per_pair_http_s', 'batch_http_s'):
+        results[key.replace('_s', '_pairs_per_s')] = count / results[key] if results[key] else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pairs', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--http-single-limit', type=int, default=2000,
+                        help='maximum per-pair HTTP requests to time before extrapolating')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    runs = [run(count, args.http_single_limit) for count in args.pairs]
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return
+
+    print(f"{'pairs':>8} {'per-pair fn':>14} {'vectorized fn':>14} {'per-pair HTTP':>14} {'batch HTTP':>14}   (pairs/s)")
+    for r in runs:
+        print(f"{r['pairs']:>8} {r['per_pair_function_pairs_per_s']:>14,.0f} {r['vectorized_function_pairs_per_s']:>14,.0f} "
+              f"{r['per_pair_http_pairs_per_s']:>14,.0f} {r['batch_http_pairs_per_s']:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
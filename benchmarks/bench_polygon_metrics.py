@@ -0,0 +1,75 @@
+"""Polygon area/perimeter throughput: per-polygon, batched and across the process pool.
+
+Run from the repository root:
+
+    python benchmarks/bench_polygon_metrics.py --polygons 10000 50000 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+from app import app, calculate_polygon_metrics, calculate_polygon_metrics_batch, calculate_polygon_metrics_parallel  # noqa: E402
+from synthetic import SurveyDataset  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(count, vertices, zones, workers, scalar_limit):
+    rings = SurveyDataset(points=0, polygons=count, vertices=vertices, zones=zones).rings
+    results = {'polygons': count, 'vertices': vertices, 'zones': zones}
+
+    # Per-polygon timing is extrapolated from a sample so large runs finish in reasonable time
+    sample = min(count, scalar_limit)
+    elapsed = timed(lambda: [calculate_polygon_metrics(ring.tolist()) for ring in rings[:sample]])
+    results['per_polygon_s'] = elapsed * count / sample
+    results['batch_s'] = timed(lambda: calculate_polygon_metrics_batch(rings))
+
+    app.config['POLYGON_METRICS_PARALLEL_MIN_VERTICES'] = 0
+    for worker_count in workers:
+        app.config['POLYGON_METRICS_WORKERS'] = worker_count
+        if app_module._metrics_pool is not None:
+            app_module._metrics_pool.shutdown()
+            app_module._metrics_pool = None
+        calculate_polygon_metrics_parallel(rings[:worker_count * 2])  # start the workers outside the timing
+        results[f'parallel_{worker_count}_s'] = timed(lambda: calculate_polygon_metrics_parallel(rings))
+
+    for key in [key for key in results if key.endswith('_s')]:
+        results[key[:-2] + '_polygons_per_s'] = count / results[key] if results[key] else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--polygons', type=int, nargs='+', default=[10000, 50000])
+    parser.add_argument('--vertices', type=int, default=50)
+    parser.add_argument('--zones', type=int, default=8, help='number of UTM zones the polygons are spread over')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument('--scalar-limit', type=int, default=5000,
+                        help='maximum per-polygon calls to time before extrapolating')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    workers = sorted(set(args.workers))
+    runs = [run(count, args.vertices, args.zones, workers, args.scalar_limit) for count in args.polygons]
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return
+
+    header = f"{'polygons':>9} {'per-polygon':>12} {'batch':>12}" + ''.join(f" {f'{w} workers':>12}" for w in workers)
+    print(header + '   (polygons/s)')
+    for r in runs:
+        print(f"{r['polygons']:>9} {r['per_polygon_polygons_per_s']:>12,.0f} {r['batch_polygons_per_s']:>12,.0f}"
+              + ''.join(f" {r[f'parallel_{w}_polygons_per_s']:>12,.0f}" for w in workers))
+
+
+if __name__ == '__main__':
+    main()
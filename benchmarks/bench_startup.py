@@ -0,0 +1,92 @@
+"""Worker startup cost: import time, create_app() time and memory in fresh processes.
+
+Each run starts a new interpreter, imports ``app`` from --app-dir against a
+scratch database and records the time and peak RSS after the import, after
+create_app() and after a first /api/points and /map request. It also lists
+which heavy modules were loaded at each step. Run from the repository root:
+
+    python benchmarks/bench_startup.py --runs 5
+
+To compare with an older commit, check it out elsewhere and point --app-dir at it:
+
+    git worktree add /tmp/topography-old <commit>
+    python benchmarks/bench_startup.py --app-dir /tmp/topography-old
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['pandas', 'geopandas', 'pyogrio', 'pyarrow', 'fiona', 'folium', 'simplekml', 'ezdxf', 'mapbox_vector_tile']
+
+# Runs in the child process; older trees without create_app() set up their database on import
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+heavy = sys.argv[2].split(',')
+
+def snapshot(start):
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'seconds': time.perf_counter() - start,
+            'peak_rss_mb': peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10,
+            'heavy_modules': [name for name in heavy if name in sys.modules]}
+
+steps = {}
+start = time.perf_counter()
+import app as module
+steps['import'] = snapshot(start)
+start = time.perf_counter()
+application = module.create_app() if hasattr(module, 'create_app') else module.app
+steps['create_app'] = snapshot(start)
+client = application.test_client()
+for name, url in (('first /api/points', '/api/points'), ('first /map', '/map')):
+    start = time.perf_counter()
+    assert client.get(url).status_code == 200
+    steps[name] = snapshot(start)
+print(json.dumps(steps))
+"""
+
+
+def run_once(app_dir):
+    scratch = tempfile.mkdtemp(prefix='bench-startup-')
+    try:
+        env = dict(os.environ, TOPOGRAPHY_DATABASE_URL='sqlite:///' + os.path.join(scratch, 'bench.db'))
+        result = subprocess.run([sys.executable, '-c', CHILD, app_dir, ','.join(HEAVY_MODULES)],
+                                cwd=scratch, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'child failed')
+        return json.loads(result.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--app-dir', default=REPO_ROOT, help='directory containing the app.py to measure')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    runs = [run_once(os.path.abspath(args.app_dir)) for _ in range(args.runs)]
+    # Medians per step; the module lists are the same in every run
+    summary = {step: {'seconds': statistics.median(run[step]['seconds'] for run in runs),
+                      'peak_rss_mb': statistics.median(run[step]['peak_rss_mb'] for run in runs),
+                      'heavy_modules': runs[0][step]['heavy_modules']}
+               for step in runs[0]}
+    if args.json:
+        print(json.dumps({'app_dir': args.app_dir, 'runs': args.runs, 'steps': summary}, indent=2))
+        return
+
+    print(f"{'step':<18} {'seconds':>8} {'peak RSS MB':>12}   heavy modules loaded   (median of {args.runs} runs)")
+    for step, values in summary.items():
+        print(f"{step:<18} {values['seconds']:>8.2f} {values['peak_rss_mb']:>12.1f}   "
+              f"{', '.join(values['heavy_modules']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,450 @@
+"""Benchmark suite: every API route and the core calculations on a synthetic survey.
+
+Loads a seeded synthetic dataset (see synthetic.py) into a scratch SQLite
+database, drives each route through the Flask test client and calls the
+calculation functions directly. Each scenario reports throughput, p50/p99
+latency and the process's peak RSS as JSON, together with the commit and
+parameters, so runs can be compared across commits. Run from the repository root:
+
+    python benchmarks/bench_suite.py --points 20000 --polygons 2000 --output before.json
+    python benchmarks/bench_suite.py --points 20000 --polygons 2000 --compare before.json
+
+Routes the suite did not reach are listed under ``uncovered_endpoints``.
+"""
+import argparse
+import atexit
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+SCRATCH_DIR = tempfile.mkdtemp(prefix='bench-suite-')
+atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+os.environ['TOPOGRAPHY_DATABASE_URL'] = 'sqlite:///' + os.path.join(SCRATCH_DIR, 'bench.db')
+
+import app as app_module  # noqa: E402
+from app import (create_app, db, ReferencePoint, SurveyPolygon, SurveyPolygonLevel, DatasetChange,  # noqa: E402
+                 point_index, polygon_index, notify_dataset_changed)
+from synthetic import SurveyDataset  # noqa: E402
+
+app = create_app()
+
+# Slower than this fraction in p50 latency is flagged by --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.stdout.strip(), bool(status.stdout.strip())
+
+
+class Suite:
+    """Runs scenarios and collects their timings
+
+    A scenario is one operation timed ``repeat`` times, after an untimed warm-up
+    call unless ``warmup`` is false. ``setup`` runs untimed before every call,
+    e.g. to drop caches for a cold measurement. ``items`` is the number of
+    points, polygons or pairs one call handles, for an items-per-second figure.
+    """
+
+    def __init__(self, client, repeat, only):
+        self.client = client
+        self.repeat = repeat
+        self.only = only
+        self.results = {}
+        self.endpoints = set()
+        self._adapter = app.url_map.bind('localhost')
+
+    def request(self, method, url, expect=(200,), **kwargs):
+        """Send a request and read the whole body, so streamed responses are timed in full"""
+        response = self.client.open(url, method=method, **kwargs)
+        body = response.get_data()
+        if response.status_code not in expect:
+            raise AssertionError(f'{method} {url} returned {response.status_code}: {body[:300]!r}')
+        self.endpoints.add(self._adapter.match(url.split('?')[0], method=method)[0])
+        return response
+
+    def run(self, name, operation, repeat=None, setup=None, warmup=True, items=None):
+        if self.only and not any(pattern in name for pattern in self.only):
+            return
+        repeat = max(1, repeat or self.repeat)
+        rss_before = peak_rss_mb()
+        if warmup:
+            if setup:
+                setup()
+            operation()
+        latencies = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            operation()
+            latencies.append(time.perf_counter() - start)
+
+        latencies = np.array(latencies)
+        total = latencies.sum()
+        rss_after = peak_rss_mb()
+        result = {
+            'calls': repeat,
+            'total_s': total,
+            'calls_per_s': repeat / total if total else None,
+            'p50_ms': float(np.percentile(latencies, 50)) * 1000,
+            'p99_ms': float(np.percentile(latencies, 99)) * 1000,
+            'max_ms': float(latencies.max()) * 1000,
+            'peak_rss_mb': rss_after,
+            'peak_rss_growth_mb': rss_after - rss_before if rss_after is not None else None
+        }
+        if items:
+            result['items_per_call'] = items
+            result['items_per_s'] = items * repeat / total if total else None
+        self.results[name] = result
+        print(f"  {name:<48} p50 {result['p50_ms']:>9.2f} ms  p99 {result['p99_ms']:>9.2f} ms", file=sys.stderr)
+
+
+def clear_database():
+    SurveyPolygonLevel.query.delete()
+    SurveyPolygon.query.delete()
+    ReferencePoint.query.delete()
+    DatasetChange.query.delete()
+    db.session.commit()
+    # Bulk deletes skip the session events, so reset the indexes and caches by hand
+    point_index.invalidate()
+    polygon_index.invalidate()
+    notify_dataset_changed(None, None)
+
+
+def drop_caches():
+    """Invalidate the map, tile and export caches as a write would"""
+    notify_dataset_changed(None, None)
+
+
+def tile_for(lat, lon, zoom):
+    """Web Mercator tile (x, y) containing a location"""
+    n = 2 ** zoom
+    x = int((lon + 180) / 360 * n)
+    y = int((1 - np.arcsinh(np.tan(np.radians(lat))) / np.pi) / 2 * n)
+    return x, y
+
+
+def wait_for(suite, url):
+    """Poll a job until it leaves the queued and running states"""
+    while True:
+        job = suite.request('GET', url).get_json()
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.005)
+
+
+def run_import_job(suite, data, filename):
+    response = suite.request('POST', '/api/import/jobs', expect=(202,),
+                             data={'file': (io.BytesIO(data), filename)})
+    job = wait_for(suite, response.headers['Location'])
+    assert job['status'] == 'completed', job
+    return job
+
+
+def run_export_job(suite, export_format):
+    response = suite.request('POST', '/api/export/jobs', expect=(202,), json={'format': export_format})
+    job = wait_for(suite, response.headers['Location'])
+    assert job['status'] == 'completed', job
+    suite.request('GET', job['download_url'])
+    return job
+
+
+def read_scenarios(suite, dataset, rng):
+    points = len(dataset.latitudes)
+    polygons = len(dataset.rings)
+    point_ids = [row[0] for row in db.session.query(ReferencePoint.id).order_by(ReferencePoint.id)]
+    site_lat, site_lon = dataset.sites[0].tolist()
+    bbox = f'{site_lon - 0.05},{site_lat - 0.05},{site_lon + 0.05},{site_lat + 0.05}'
+    heavy = max(1, suite.repeat // 10)
+
+    suite.run('GET /', lambda: suite.request('GET', '/'))
+    suite.run('GET /map (cold)', lambda: suite.request('GET', '/map'), repeat=heavy, setup=drop_caches,
+              items=points + polygons)
+    suite.run('GET /map (cached)', lambda: suite.request('GET', '/map'), items=points + polygons)
+    suite.run('GET /map?mode=tiles', lambda: suite.request('GET', '/map?mode=tiles'))
+    tiles = [tile_for(lat, lon, 14) for lat, lon in dataset.sites.tolist()]
+    suite.run('GET /tiles (cold, z14 mvt)',
+              lambda: [suite.request('GET', f'/tiles/14/{x}/{y}.mvt') for x, y in tiles], repeat=heavy,
+              setup=drop_caches, items=len(tiles))
+    suite.run('GET /tiles (cached, z14 geojson)',
+              lambda: [suite.request('GET', f'/tiles/14/{x}/{y}.geojson') for x, y in tiles], items=len(tiles))
+
+    suite.run('GET /api/points', lambda: suite.request('GET', '/api/points'), repeat=heavy, items=points)
+    suite.run('GET /api/points?limit=1000', lambda: suite.request('GET', f'/api/points?limit=1000&after_id={point_ids[0]}'))
+    suite.run('GET /api/points?format=ndjson', lambda: suite.request('GET', '/api/points?format=ndjson'),
+              repeat=heavy, items=points)
+    suite.run('GET /api/points?bbox=', lambda: suite.request('GET', f'/api/points?bbox={bbox}'))
+    suite.run('GET /api/points/nearest', lambda: suite.request(
+        'GET', f'/api/points/nearest?lat={site_lat + rng.normal(0, 0.01)}&lon={site_lon + rng.normal(0, 0.01)}&k=10'))
+    suite.run('GET /api/polygons', lambda: suite.request('GET', '/api/polygons'), repeat=heavy, items=polygons)
+    suite.run('GET /api/polygons?tolerance=10', lambda: suite.request('GET', '/api/polygons?tolerance=10'),
+              repeat=heavy, items=polygons)
+    suite.run('GET /api/polygons?bbox=', lambda: suite.request('GET', f'/api/polygons?bbox={bbox}'))
+    suite.run('GET /api/changes?since=0', lambda: suite.request('GET', '/api/changes?since=0'), repeat=heavy)
+
+    sample = point_ids[:100]
+    suite.run('GET /api/calculate/distance',
+              lambda: suite.request('GET', f'/api/calculate/distance?point1_id={point_ids[0]}&point2_id={point_ids[-1]}'))
+    suite.run('GET /api/calculate/area',
+              lambda: suite.request('GET', '/api/calculate/area?' + '&'.join(f'point_ids={i}' for i in sample[:20])),
+              items=20)
+    suite.run('POST /api/calculate/distance_matrix',
+              lambda: suite.request('POST', '/api/calculate/distance_matrix', json={'point_ids': sample}),
+              items=len(sample) ** 2)
+    suite.run('POST /api/calculate/point_from_distance_azimuth', lambda: suite.request(
+        'POST', '/api/calculate/point_from_distance_azimuth',
+        json={'start_lat': site_lat, 'start_lon': site_lon, 'distance_m': 250.0, 'azimuth_degrees': 37.5}))
+    legs = [[float(d), float(a)] for d, a in zip(rng.uniform(10, 200, 1000), rng.uniform(0, 360, 1000))]
+    suite.run('POST /api/calculate/traverse', lambda: suite.request(
+        'POST', '/api/calculate/traverse', json={'start_lat': site_lat, 'start_lon': site_lon, 'legs': legs}),
+        items=len(legs))
+    suite.run('POST /api/calculate/azimuth_distance', lambda: suite.request(
+        'POST', '/api/calculate/azimuth_distance',
+        json={'lat1': site_lat, 'lon1': site_lon, 'lat2': site_lat + 0.01, 'lon2': site_lon + 0.01}))
+    pairs = {'lat1': dataset.latitudes[:-1].tolist(), 'lon1': dataset.longitudes[:-1].tolist(),
+             'lat2': dataset.latitudes[1:].tolist(), 'lon2': dataset.longitudes[1:].tolist()}
+    suite.run('POST /api/calculate/azimuth_distance/batch',
+              lambda: suite.request('POST', '/api/calculate/azimuth_distance/batch', json=pairs),
+              repeat=heavy, items=points - 1)
+    # Both azimuth endpoints must give the same answer for the same pair
+    batch = suite.request('POST', '/api/calculate/azimuth_distance/batch',
+                          json={key: values[:20] for key, values in pairs.items()}).get_json()
+    for i in range(20):
+        single = suite.request('POST', '/api/calculate/azimuth_distance',
+                               json={key: values[i] for key, values in pairs.items()}).get_json()
+        assert np.isclose(single['azimuth_decimal'], batch['azimuth_decimal'][i], rtol=0, atol=1e-9), (single, i)
+        assert np.isclose(single['distance_meters'], batch['distance_meters'][i], rtol=0, atol=1e-6), (single, i)
+
+    for path in ('/api/stats/transformers', '/api/stats/spatial_index', '/api/stats/map_cache',
+                 '/api/stats/tile_cache', '/api/stats/exports', '/metrics', '/api/profiler',
+                 '/api/export/jobs', '/api/import/jobs'):
+        suite.run(f'GET {path}', lambda path=path: suite.request('GET', path))
+
+
+def export_scenarios(suite, dataset):
+    """Exports, each built from scratch; returns the exported files for the import scenarios"""
+    heavy = max(1, suite.repeat // 10)
+    rows = len(dataset.latitudes) + len(dataset.rings)
+    exports = {}
+    for label, url in (('csv', '/api/export/csv'), ('csv.gz', '/api/export/csv?compression=gzip'),
+                       ('geojson', '/api/export/geojson'), ('geojsonseq', '/api/export/geojson?format=geojsonseq'),
+                       ('kml', '/api/export/kml'), ('dxf', '/api/export/dxf'),
+                       ('geoparquet', '/api/export/geoparquet'), ('gpkg', '/api/export/gpkg')):
+        def export(label=label, url=url):
+            exports[label] = suite.request('GET', url).get_data()
+        suite.run(f'GET {url}', export, repeat=heavy, setup=drop_caches, items=rows)
+    suite.run('export job (kml)', lambda: run_export_job(suite, 'kml'), repeat=heavy, setup=drop_caches, items=rows)
+    return exports
+
+
+def import_scenarios(suite, dataset, exports):
+    """Each import starts from an empty database and loads the whole dataset"""
+    rows = len(dataset.latitudes) + len(dataset.rings)
+    for label, url, filename in (('csv', '/api/import/csv', 'data.csv'),
+                                 ('geojson', '/api/import/geojson', 'data.geojson'),
+                                 ('geojsonseq', '/api/import/geojson', 'data.geojsons'),
+                                 ('geoparquet', '/api/import/geoparquet', 'data.parquet'),
+                                 ('gpkg', '/api/import/gpkg', 'data.gpkg')):
+        if label not in exports:
+            continue
+        suite.run(f'POST {url} ({label})', lambda label=label, url=url, filename=filename: suite.request(
+            'POST', url, data={'file': (io.BytesIO(exports[label]), filename)}),
+            repeat=1, setup=clear_database, warmup=False, items=rows)
+    if 'csv' in exports:
+        suite.run('import job (csv)', lambda: run_import_job(suite, exports['csv'], 'data.csv'),
+                  repeat=1, setup=clear_database, warmup=False, items=rows)
+        # Events and cancel on a finished job answer at once; time the request handling only
+        job = run_import_job(suite, exports['csv'][:1000].rsplit(b'\n', 1)[0] + b'\n', 'head.csv')
+        suite.run('GET /api/import/jobs/<id>', lambda: suite.request('GET', f"/api/import/jobs/{job['id']}"))
+        suite.run('GET /api/import/jobs/<id>/events', lambda: suite.request('GET', f"/api/import/jobs/{job['id']}/events"))
+        suite.run('POST /api/import/jobs/<id>/cancel',
+                  lambda: suite.request('POST', f"/api/import/jobs/{job['id']}/cancel"))
+
+
+def write_scenarios(suite, dataset, rng):
+    """Single and batch writes on top of the loaded dataset"""
+    new_points = dataset.point_dicts(0, min(1000, len(dataset.latitudes)))
+    new_polygons = dataset.polygon_dicts(0, min(100, len(dataset.rings)))
+    created = {'points': [], 'polygons': []}
+
+    def add_point():
+        created['points'].append(suite.request('POST', '/api/points', expect=(201,),
+                                               json=new_points[rng.integers(len(new_points))]).get_json()['id'])
+
+    def add_polygon():
+        created['polygons'].append(suite.request('POST', '/api/polygons', expect=(201,),
+                                                 json=new_polygons[rng.integers(len(new_polygons))]).get_json()['id'])
+
+    suite.run('POST /api/points', add_point, warmup=False)
+    suite.run('PUT /api/points/<id>', lambda: suite.request(
+        'PUT', f"/api/points/{created['points'][rng.integers(len(created['points']))]}",
+        json={'elevation': float(rng.uniform(0, 3000))}))
+    suite.run('DELETE /api/points/<id>',
+              lambda: suite.request('DELETE', f"/api/points/{created['points'].pop()}", expect=(204,)),
+              repeat=min(suite.repeat, len(created['points'])), warmup=False)
+    suite.run('POST /api/polygons', add_polygon, warmup=False)
+    suite.run('PUT /api/polygons/<id>', lambda: suite.request(
+        'PUT', f"/api/polygons/{created['polygons'][rng.integers(len(created['polygons']))]}",
+        json={'coordinates': new_polygons[rng.integers(len(new_polygons))]['coordinates']}))
+    suite.run('DELETE /api/polygons/<id>',
+              lambda: suite.request('DELETE', f"/api/polygons/{created['polygons'].pop()}", expect=(204,)),
+              repeat=min(suite.repeat, len(created['polygons'])), warmup=False)
+
+    heavy = max(1, suite.repeat // 10)
+    suite.run('POST /api/points/batch (create)', lambda: suite.request(
+        'POST', '/api/points/batch', json={'create': new_points}), repeat=heavy, items=len(new_points))
+    suite.run('POST /api/polygons/batch (create)', lambda: suite.request(
+        'POST', '/api/polygons/batch', json={'create': new_polygons}), repeat=heavy, items=len(new_polygons))
+
+
+def profiler_scenarios(suite):
+    """Write one slow request profile with the sampling profiler, then time listing and downloading it"""
+    suite.request('POST', '/api/profiler', json={'enabled': True, 'slow_request_seconds': 1e-6})
+    try:
+        drop_caches()
+        suite.request('GET', '/map')
+    finally:
+        profiles = suite.request('POST', '/api/profiler', json={'enabled': False}).get_json()['profiles']
+    if profiles:
+        suite.run('GET /api/profiler/profiles/<name>', lambda: suite.request('GET', profiles[0]['url']))
+
+
+def function_scenarios(suite, dataset):
+    """The calculation functions called directly, without HTTP or the database"""
+    rings = dataset.rings
+    lats, lons = dataset.latitudes, dataset.longitudes
+    heavy = max(1, suite.repeat // 10)
+    sample = rings[:1000]
+    sample_lists = [ring.tolist() for ring in sample]
+    suite.run('calculate_polygon_metrics', lambda: [app_module.calculate_polygon_metrics(ring) for ring in sample_lists],
+              repeat=heavy, items=len(sample))
+    suite.run('calculate_polygon_metrics_batch', lambda: app_module.calculate_polygon_metrics_batch(rings),
+              repeat=heavy, items=len(rings))
+    pairs = min(len(lats), 1000)
+    suite.run('calculate_azimuth_distance', lambda: [
+        app_module.calculate_azimuth_distance(a, b, c, d)
+        for a, b, c, d in zip(lats[:pairs - 1].tolist(), lons[:pairs - 1].tolist(), lats[1:pairs].tolist(), lons[1:pairs].tolist())
+    ], repeat=heavy, items=pairs - 1)
+    suite.run('calculate_azimuth_distance_arrays',
+              lambda: app_module.calculate_azimuth_distance_arrays(lats[:-1], lons[:-1], lats[1:], lons[1:]),
+              items=len(lats) - 1)
+    distances = np.full(len(lats), 100.0)
+    azimuths = np.linspace(0, 360, len(lats))
+    suite.run('calculate_points_from_distance_azimuth_arrays',
+              lambda: app_module.calculate_points_from_distance_azimuth_arrays(lats, lons, distances, azimuths),
+              items=len(lats))
+    suite.run('lat_lon_to_utm_arrays', lambda: app_module.lat_lon_to_utm_arrays(lats, lons), items=len(lats))
+    matrix = min(len(lats), 1000)
+    suite.run('calculate_distance_matrix', lambda: app_module.calculate_distance_matrix(lats[:matrix], lons[:matrix]),
+              repeat=heavy, items=matrix ** 2)
+
+
+def compare(results, baseline_path):
+    """Print p50 and throughput changes against an earlier run's JSON"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline.get('commit') or baseline_path}", file=sys.stderr)
+    print(f"  {'scenario':<48} {'p50 before':>11} {'p50 after':>11} {'change':>8}", file=sys.stderr)
+    for name, after in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None:
+            continue
+        change = after['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0.0
+        flag = '  slower' if change > REGRESSION_THRESHOLD else ''
+        print(f"  {name:<48} {before['p50_ms']:>9.2f}ms {after['p50_ms']:>9.2f}ms {change:>+8.1%}{flag}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=10000)
+    parser.add_argument('--polygons', type=int, default=1000)
+    parser.add_argument('--vertices', type=int, default=32, help='vertices per synthetic polygon')
+    parser.add_argument('--zones', type=int, default=4, help='number of UTM zones the survey sites are spread over')
+    parser.add_argument('--hemispheres', choices=['N', 'S', 'NS'], default='NS')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='timed calls per scenario; scenarios over the whole dataset use a tenth of this')
+    parser.add_argument('--only', nargs='+', help='run only scenarios whose name contains one of these strings')
+    parser.add_argument('--output', help='write the JSON results to this file instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE', help='print p50 changes against an earlier --output file')
+    args = parser.parse_args()
+    if args.points < 2 or args.polygons < 1:
+        parser.error('at least 2 points and 1 polygon are needed')
+
+    dataset = SurveyDataset(args.points, args.polygons, args.vertices, args.zones, args.hemispheres, args.seed)
+    rng = np.random.default_rng(args.seed)
+    commit, dirty = git_commit()
+    started = time.time()
+    # Slow request profiles from the profiler scenario go to the scratch directory
+    app.config['PROFILER_DIR'] = os.path.join(SCRATCH_DIR, 'profiles')
+
+    with app.app_context():
+        suite = Suite(app.test_client(), args.repeat, args.only)
+        clear_database()
+        csv_data = dataset.csv_bytes()
+        suite.request('POST', '/api/import/csv', data={'file': (io.BytesIO(csv_data), 'seed.csv')})
+        read_scenarios(suite, dataset, rng)
+        function_scenarios(suite, dataset)
+        profiler_scenarios(suite)
+        exports = export_scenarios(suite, dataset)
+        import_scenarios(suite, dataset, exports)
+        write_scenarios(suite, dataset, rng)
+        uncovered = sorted(rule.endpoint for rule in app.url_map.iter_rules()
+                           if rule.endpoint != 'static' and rule.endpoint not in suite.endpoints)
+
+    results = {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.fromtimestamp(started, timezone.utc).isoformat(),
+        'duration_s': time.time() - started,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'dataset': dict(dataset.parameters, csv_bytes=len(csv_data)),
+        'repeat': args.repeat,
+        'peak_rss_mb': peak_rss_mb(),
+        'scenarios': suite.results,
+        'uncovered_endpoints': uncovered if not args.only else None
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
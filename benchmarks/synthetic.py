@@ -0,0 +1,75 @@
+"""Seeded synthetic survey datasets shared by the benchmarks.
+
+Points and polygons are clustered around survey sites. The sites sit in
+``zones`` different UTM zones in each of the chosen hemispheres, so code that
+depends on the zone (transformer lookups, per-zone metric batches) sees the
+same variety as a real multi-site project. The same arguments always produce
+the same dataset.
+"""
+import csv
+import io
+
+import numpy as np
+
+POINT_TYPES = ['waypoint', 'benchmark', 'survey_point', 'control_point']
+POLYGON_TYPES = ['survey_area', 'property_boundary', 'restricted_zone', 'construction_zone']
+CSV_COLUMNS = ['Type', 'Name', 'Description', 'Latitude', 'Longitude', 'Elevation', 'Point_Type', 'Area_SqM', 'Perimeter_M']
+METRES_PER_DEGREE = 111320.0
+
+
+class SurveyDataset:
+    """Points as parallel arrays and polygons as open ``[lat, lon]`` rings"""
+
+    def __init__(self, points=1000, polygons=100, vertices=32, zones=4, hemispheres='NS', seed=42):
+        rng = np.random.default_rng(seed)
+        self.parameters = {'points': points, 'polygons': polygons, 'vertices': vertices,
+                           'zones': zones, 'hemispheres': hemispheres, 'seed': seed}
+
+        # One site per (zone, hemisphere), a degree or so inside the zone so clusters do not straddle its edge
+        zone_numbers = rng.choice(np.arange(1, 61), size=zones, replace=False)
+        site_lons = np.repeat(zone_numbers * 6.0 - 183 + rng.uniform(-1.5, 1.5, zones), len(hemispheres))
+        site_lats = np.array([rng.uniform(10, 60) * (1 if hemisphere == 'N' else -1)
+                              for _ in range(zones) for hemisphere in hemispheres])
+        self.sites = np.column_stack([site_lats, site_lons])
+
+        # Points scatter a few kilometres around their site
+        site = rng.integers(0, len(self.sites), points)
+        self.latitudes = site_lats[site] + rng.normal(0, 0.02, points)
+        self.longitudes = site_lons[site] + rng.normal(0, 0.02, points) / np.cos(np.radians(site_lats[site]))
+        self.elevations = np.round(rng.uniform(0, 3000, points), 2)
+        self.point_types = rng.choice(POINT_TYPES, points).tolist()
+
+        # Star-shaped rings: sorted angles around a centre keep every polygon simple
+        site = rng.integers(0, len(self.sites), polygons)
+        centre_lats = site_lats[site] + rng.normal(0, 0.05, polygons)
+        centre_lons = site_lons[site] + rng.normal(0, 0.05, polygons) / np.cos(np.radians(site_lats[site]))
+        radii = rng.uniform(50, 500, (polygons, 1)) * rng.uniform(0.7, 1.0, (polygons, vertices))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, (polygons, vertices)), axis=1)
+        lats = centre_lats[:, None] + radii * np.sin(angles) / METRES_PER_DEGREE
+        lons = centre_lons[:, None] + radii * np.cos(angles) / (METRES_PER_DEGREE * np.cos(np.radians(centre_lats[:, None])))
+        self.rings = list(np.stack([lats, lons], axis=2))
+        self.polygon_types = rng.choice(POLYGON_TYPES, polygons).tolist()
+
+    def point_dicts(self, start=0, stop=None):
+        """Point bodies for POST /api/points and batch creates"""
+        return [{'name': f'P{i}', 'latitude': float(self.latitudes[i]), 'longitude': float(self.longitudes[i]),
+                 'elevation': float(self.elevations[i]), 'point_type': self.point_types[i]}
+                for i in range(start, len(self.latitudes) if stop is None else stop)]
+
+    def polygon_dicts(self, start=0, stop=None):
+        """Polygon bodies for POST /api/polygons and batch creates"""
+        return [{'name': f'A{i}', 'coordinates': self.rings[i].tolist(), 'polygon_type': self.polygon_types[i]}
+                for i in range(start, len(self.rings) if stop is None else stop)]
+
+    def csv_bytes(self):
+        """The whole dataset in the CSV export layout, as accepted by /api/import/csv"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        writer.writerows(['Point', f'P{i}', '', f'{lat:.7f}', f'{lon:.7f}', elevation, point_type, '', '']
+                         for i, (lat, lon, elevation, point_type) in enumerate(zip(
+                             self.latitudes.tolist(), self.longitudes.tolist(), self.elevations.tolist(), self.point_types)))
+        writer.writerows(['Polygon', f'A{i}', '', '; '.join(f'{lat:.7f},{lon:.7f}' for lat, lon in ring.tolist()),
+                          '', '', polygon_type, '', '']
+                         for i, (ring, polygon_type) in enumerate(zip(self.rings, self.polygon_types)))
+        return buffer.getvalue().encode()
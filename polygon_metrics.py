@@ -0,0 +1,36 @@
+"""UTM area and perimeter of survey polygons, shared by the app and its metrics worker processes
+
+The metrics pool starts its workers with ``spawn``, so they import this module
+rather than ``app``: only NumPy, Shapely and pyproj are loaded, and no Flask,
+database or thread state is copied into them.
+"""
+import functools
+
+import numpy as np
+import shapely
+from pyproj import Transformer
+
+WGS84_EPSG = 4326
+
+
+def zone_metrics(transformer, coords, counts):
+    """Area and perimeter of consecutive [lat, lon] rings projected with one transformer
+
+    ``coords`` holds the vertices of every ring back to back and ``counts`` the
+    vertex count of each; the whole zone goes through one transformer call.
+    """
+    xs, ys = transformer.transform(coords[:, 1], coords[:, 0])
+    polygons = shapely.polygons(shapely.linearrings(
+        np.column_stack([xs, ys]), indices=np.repeat(np.arange(len(counts)), counts)
+    ))
+    return shapely.area(polygons), shapely.length(polygons)
+
+
+@functools.lru_cache(maxsize=64)
+def utm_transformer(epsg_code):
+    return Transformer.from_crs(f"EPSG:{WGS84_EPSG}", f"EPSG:{epsg_code}", always_xy=True)
+
+
+def calculate_zone_metrics(epsg_code, coords, counts):
+    """zone_metrics for rings in the UTM zone ``epsg_code``; the task run by metrics workers"""
+    return zone_metrics(utm_transformer(epsg_code), coords, counts)